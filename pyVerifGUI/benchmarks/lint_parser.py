@@ -0,0 +1,156 @@
+###############################################################################
+# @file benchmarks/lint_parser.py
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Benchmark of the verilator output parser
+#
+# Compares the streaming parser against the previous findall/MD5 parser on a
+# synthetic verilator log. Run from the pyVerifGUI directory:
+#
+#   python benchmarks/lint_parser.py --lines 500000
+##############################################################################
+
+import argparse
+import hashlib
+import io
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pyVerifGUI.db import MessageStore
+from pyVerifGUI.parsers.lint_messages import (parse_verilator_stream,
+                                              verilator_parser)
+
+LINT_TYPES = ["UNUSED", "WIDTH", "UNDRIVEN", "DECLFILENAME", "PINCONNECTEMPTY"]
+
+
+def generate_log(lines: int, files: int = 2000, signals: int = 20000,
+                 seed: int = 0) -> str:
+    """Synthetic verilator stderr, with context lines like the real thing.
+
+    Signal names are drawn from a limited pool, so message texts repeat
+    across files, as they do in real designs.
+    """
+    rng = random.Random(seed)
+    out = []
+    while len(out) < lines:
+        file = f"rtl/block_{rng.randrange(files)}/module.sv"
+        row = rng.randrange(1, 5000)
+        lint_type = rng.choice(LINT_TYPES)
+        out.append(
+            f"%Warning-{lint_type}: {file}:{row}:{rng.randrange(1, 80)}: "
+            f"Signal is not used: 'sig_{rng.randrange(signals)}'")
+        out.append(f"  {row} |   logic sig;")
+        out.append("        |         ^~~")
+    out.append("%Error: Exiting due to 1 warning(s)")
+
+    return "\n".join(out[:lines]) + "\n"
+
+
+def legacy_parse(lint: str):
+    """The findall based parser, building a dict and an MD5 per message"""
+    messages = []
+    errors = []
+    for match in verilator_parser.findall(lint):
+        if match[0] == "Warning":
+            messages.append({
+                "file": match[3],
+                "row": int(match[4]),
+                "column": int(match[6]),
+                "text": match[7],
+                "text_hash": int(hashlib.md5(match[7].encode('utf-8')).hexdigest(), 16),
+                "type": match[1][1:],
+                "waiver": False,
+                "comment": "N/A",
+                "legitimate": False,
+                "error": False,
+            })
+        elif match[0] == "Error" and len(match[2]) == 0:
+            errors.append(match[-1])
+
+    return messages, errors
+
+
+def streaming_parse(lint: str):
+    """The streaming parser, consuming the log in blocks like a pipe"""
+    records = []
+    errors = []
+    stream = io.StringIO(lint)
+    blocks = iter(lambda: stream.read(1 << 16), "")
+    for record in parse_verilator_stream(blocks):
+        if record.file is None:
+            errors.append(record.text)
+        else:
+            records.append(record)
+
+    return records, errors
+
+
+def legacy_store(lint: str, store: MessageStore):
+    """Parses to dicts, then stores them"""
+    messages, errors = legacy_parse(lint)
+    store.replaceMessages(messages)
+    return messages, errors
+
+
+def streaming_store(lint: str, store: MessageStore):
+    """Parses to records, then stores them"""
+    records, errors = streaming_parse(lint)
+    store.replaceRecords(records)
+    return records, errors
+
+
+def measure(name: str, fn, *args):
+    """Times a parser, then measures its peak memory in a second run"""
+    start = time.perf_counter()
+    messages, errors = fn(*args)
+    elapsed = time.perf_counter() - start
+    del messages
+
+    tracemalloc.start()
+    messages, errors = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:>18}: {elapsed:6.2f} s, peak {peak / 1e6:7.1f} MB, "
+          f"{len(messages)} messages, {len(errors)} errors")
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the verilator output parser")
+    parser.add_argument("--lines", type=int, default=500000,
+                        help="Number of lines in the generated log")
+    args = parser.parse_args()
+
+    lint = generate_log(args.lines)
+    print(f"Parsing a {args.lines} line log ({len(lint) / 1e6:.1f} MB)")
+
+    legacy_time, legacy_peak = measure("legacy", legacy_parse, lint)
+    stream_time, stream_peak = measure("streaming", streaming_parse, lint)
+    print(f"Parsing speedup: {legacy_time / stream_time:.2f}x, "
+          f"peak memory: {stream_peak / legacy_peak:.2f}x of legacy\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = MessageStore(Path(directory) / "legacy_messages.db")
+        stream = MessageStore(Path(directory) / "stream_messages.db")
+        legacy_time, legacy_peak = measure("legacy + store", legacy_store,
+                                           lint, legacy)
+        stream_time, stream_peak = measure("streaming + store",
+                                           streaming_store, lint, stream)
+        legacy.close()
+        stream.close()
+    print(f"Parse and store speedup: {legacy_time / stream_time:.2f}x, "
+          f"peak memory: {stream_peak / legacy_peak:.2f}x of legacy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+###############################################################################
+# @file pyVerifGUI/db/__init__.py
+# @package pyVerifGUI.db
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Per-build databases, and caches shared by builds
+##############################################################################
+
+from .design import DesignStore, design_store_path
+from .messages import MessageStore, open_store, store_path
+from .parse_cache import ParseCache, parse_cache_path
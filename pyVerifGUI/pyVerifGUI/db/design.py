@@ -0,0 +1,220 @@
+###############################################################################
+# @file pyVerifGUI/db/design.py
+# @package pyVerifGUI.db.design
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief SQLite database of the modules, ports, parameters and instances of a design
+##############################################################################
+
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+import re
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS modules (
+    name TEXT PRIMARY KEY,
+    path TEXT
+);
+CREATE TABLE IF NOT EXISTS ports (
+    module TEXT NOT NULL REFERENCES modules (name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    direction TEXT,
+    net_type TEXT,
+    dimension TEXT,
+    width INTEGER
+);
+CREATE INDEX IF NOT EXISTS ports_module ON ports (module, position);
+CREATE INDEX IF NOT EXISTS ports_name ON ports (name, direction, module);
+CREATE TABLE IF NOT EXISTS params (
+    module TEXT NOT NULL REFERENCES modules (name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    dimension TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS params_module ON params (module, position);
+CREATE INDEX IF NOT EXISTS params_name ON params (name);
+CREATE TABLE IF NOT EXISTS instances (
+    parent TEXT NOT NULL REFERENCES modules (name) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS instances_module ON instances (module);
+CREATE INDEX IF NOT EXISTS instances_parent ON instances (parent);
+"""
+
+# Name of the database, next to the other parser outputs
+DESIGN_STORE_FILE = "sv_design.db"
+
+# A packed dimension with constant bounds, e.g. [7:0]
+RANGE = re.compile(r"\[\s*(-?\d+)\s*:\s*(-?\d+)\s*\]")
+
+
+class DesignModule(NamedTuple):
+    name: str
+    path: str
+
+
+class DesignPort(NamedTuple):
+    module: str
+    name: str
+    direction: str
+    net_type: str
+    dimension: str
+    # None when the dimension isn't constant, e.g. [WIDTH-1:0]
+    width: Optional[int]
+
+
+class DesignParam(NamedTuple):
+    module: str
+    name: str
+    dimension: str
+    value: str
+
+
+class DesignInstance(NamedTuple):
+    parent: str
+    module: str
+    name: str
+
+
+def port_width(dimension: str) -> Optional[int]:
+    """Bits in a port's packed dimensions, None if they aren't constant"""
+    dimension = (dimension or "").strip()
+    width = 1
+    end = 0
+    for match in RANGE.finditer(dimension):
+        if dimension[end:match.start()].strip():
+            return None
+        width *= abs(int(match.group(1)) - int(match.group(2))) + 1
+        end = match.end()
+
+    if dimension[end:].strip():
+        return None
+
+    return width
+
+
+class DesignStore:
+    """Indexed copy of the parsed modules of a design.
+
+    Rebuilt from sv_modules after each parse. Names are matched with glob
+    patterns (axi_*, *fifo*), which are case sensitive like identifiers.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def replaceDesign(self, sv_modules: dict):
+        """Replaces the stored design with newly parsed modules"""
+        modules = [(name, module or {})
+                   for name, module in (sv_modules or {}).items()]
+        # Most ports share a handful of dimensions
+        widths = {}
+
+        def width(dimension: str) -> Optional[int]:
+            if dimension not in widths:
+                widths[dimension] = port_width(dimension)
+            return widths[dimension]
+
+        with self.db:
+            self.db.execute("DELETE FROM modules")
+            self.db.executemany(
+                "INSERT INTO modules (name, path) VALUES (?, ?)",
+                ((name, module.get("path")) for name, module in modules))
+            self.db.executemany(
+                "INSERT INTO ports (module, position, name, direction, "
+                "net_type, dimension, width) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((name, position, port[4], port[0], port[1], port[3],
+                  width(port[3]))
+                 for name, module in modules
+                 for position, port in enumerate(module.get("ports") or [])))
+            self.db.executemany(
+                "INSERT INTO params (module, position, name, dimension, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((name, position, param[4], param[3], param[6])
+                 for name, module in modules
+                 for position, param in enumerate(module.get("parameters") or [])))
+            self.db.executemany(
+                "INSERT INTO instances (parent, module, name) VALUES (?, ?, ?)",
+                ((name, submodule,
+                  instance if isinstance(instance, str) else None)
+                 for name, module in modules
+                 for submodule, instance in (module.get("submodules") or {}).items()))
+
+    def modules(self, name: str = "*") -> List[DesignModule]:
+        """Modules with names matching a pattern"""
+        return [
+            DesignModule(*row) for row in self.db.execute(
+                "SELECT name, path FROM modules WHERE name GLOB ? "
+                "ORDER BY name", (name, ))
+        ]
+
+    def ports(self,
+              module: str = "*",
+              name: str = "*",
+              direction: Optional[str] = None) -> List[DesignPort]:
+        """Ports with names matching a pattern, of the matching modules"""
+        query = ("SELECT module, name, direction, net_type, dimension, width "
+                 "FROM ports WHERE module GLOB ? AND name GLOB ?")
+        args = [module, name]
+        if direction is not None:
+            query += " AND direction = ?"
+            args.append(direction)
+
+        return [
+            DesignPort(*row)
+            for row in self.db.execute(query + " ORDER BY module, position",
+                                       args)
+        ]
+
+    def modulesWithPort(self, name: str,
+                        direction: Optional[str] = None) -> List[str]:
+        """Modules with a port matching a pattern, e.g. all axi_* inputs"""
+        query = "SELECT DISTINCT module FROM ports WHERE name GLOB ?"
+        args = [name]
+        if direction is not None:
+            query += " AND direction = ?"
+            args.append(direction)
+
+        return [row[0] for row in self.db.execute(query + " ORDER BY module",
+                                                  args)]
+
+    def params(self, module: str = "*", name: str = "*") -> List[DesignParam]:
+        """Parameters with names matching a pattern, of the matching modules"""
+        return [
+            DesignParam(*row) for row in self.db.execute(
+                "SELECT module, name, dimension, value FROM params "
+                "WHERE module GLOB ? AND name GLOB ? ORDER BY module, position",
+                (module, name))
+        ]
+
+    def instances(self,
+                  module: str = "*",
+                  parent: str = "*",
+                  name: str = "*") -> List[DesignInstance]:
+        """Instantiations of the matching modules, in the matching parents"""
+        return [
+            DesignInstance(*row) for row in self.db.execute(
+                "SELECT parent, module, name FROM instances "
+                "WHERE module GLOB ? AND parent GLOB ? AND IFNULL(name, '') GLOB ? "
+                "ORDER BY parent, module", (module, parent, name))
+        ]
+
+
+def design_store_path(parse_path: Path) -> Path:
+    """Where the design database of a parse lives"""
+    return Path(parse_path) / DESIGN_STORE_FILE
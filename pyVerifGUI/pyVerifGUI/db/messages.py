@@ -0,0 +1,451 @@
+###############################################################################
+# @file pyVerifGUI/db/messages.py
+# @package pyVerifGUI.db.messages
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief SQLite storage for messages, waivers and comments of a build
+##############################################################################
+
+from oyaml import safe_load, dump
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+import json
+import os
+import sqlite3
+import tempfile
+import uuid
+
+from pyVerifGUI.gui.models import MessageType, MessageListType
+from pyVerifGUI.gui.models.table import MessageTable
+from pyVerifGUI.parsers.lint_messages import (LintRecord, legacy_hashes,
+                                              migrate_waiver_hash,
+                                              text_hash)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    "row" INTEGER NOT NULL,
+    "column" INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    text TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    legitimate INTEGER NOT NULL DEFAULT 0,
+    error INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_file ON messages (file);
+CREATE INDEX IF NOT EXISTS messages_type ON messages (type);
+CREATE TABLE IF NOT EXISTS waivers (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    "row" INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    author TEXT,
+    date TEXT,
+    reason TEXT,
+    text TEXT,
+    text_hash TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS waivers_file ON waivers (file);
+CREATE TABLE IF NOT EXISTS comments (
+    message_id INTEGER PRIMARY KEY REFERENCES messages (id) ON DELETE CASCADE,
+    comment TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lint_units (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    returncode INTEGER NOT NULL,
+    errors TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lint_unit_messages (
+    unit TEXT NOT NULL REFERENCES lint_units (name) ON DELETE CASCADE,
+    file TEXT NOT NULL,
+    "row" INTEGER NOT NULL,
+    "column" INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    text TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    error INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS lint_unit_messages_unit ON lint_unit_messages (unit);
+"""
+
+# Columns stored for each table, anything else goes in "extra" as JSON.
+# text_hash is stored as text, as it does not fit in an SQLite integer.
+MESSAGE_COLUMNS = ("file", "row", "column", "type", "text", "text_hash",
+                   "legitimate", "error")
+WAIVER_COLUMNS = ("file", "row", "type", "author", "date", "reason", "text",
+                  "text_hash")
+# Fields implied by which table a row is in
+IMPLIED_FIELDS = ("id", "waiver", "comment")
+IMPLIED_WAIVER_FIELDS = ("id", "waiver", "legitimate")
+
+# Comment given to messages without one
+DEFAULT_COMMENT = "N/A"
+
+# Hash that text_hash is computed with, stores are migrated when it changes
+TEXT_HASH_VERSION = "blake2b-64"
+
+
+def _quote(columns: Iterable[str]) -> str:
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+def _extra(item: MessageType, columns: Iterable[str],
+           implied: Iterable[str]) -> Optional[str]:
+    """JSON of the fields without a dedicated column, if there are any"""
+    extra = {
+        key: value
+        for key, value in item.items()
+        if key not in columns and key not in implied
+    }
+    if extra:
+        return json.dumps(extra)
+
+    return None
+
+
+class MessageStore:
+    """Indexed storage of the messages, waivers and comments of a build.
+
+    Messages are loaded with only the fields needed to display and waive
+    them, comments are fetched on demand. Every message and waiver loaded
+    from the store carries its row "id", which is how it is written back.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def getMeta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?",
+                              (key, )).fetchone()
+        return row[0] if row is not None else None
+
+    def setMeta(self, key: str, value: str):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, value))
+
+    #### Messages
+
+    def replaceMessages(self, messages: MessageListType):
+        """Replaces every message (and comment) with a new set of messages"""
+        with self.db:
+            self.db.execute("DELETE FROM messages")
+            self.db.executemany(
+                f"INSERT INTO messages (id, {_quote(MESSAGE_COLUMNS)}, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((i, message["file"], message["row"], message["column"],
+                  message["type"], message["text"], str(message["text_hash"]),
+                  message.get("legitimate", False),
+                  message.get("error", False),
+                  _extra(message, MESSAGE_COLUMNS, IMPLIED_FIELDS))
+                 for i, message in enumerate(messages, 1)))
+            self.db.executemany(
+                "INSERT INTO comments (message_id, comment) VALUES (?, ?)",
+                ((i, message["comment"])
+                 for i, message in enumerate(messages, 1)
+                 if message.get("comment", DEFAULT_COMMENT) != DEFAULT_COMMENT))
+            self._newGeneration()
+
+    def replaceRecords(self, records: Iterable[LintRecord]):
+        """Replaces every message with freshly parsed records.
+
+        Records are written as they are consumed, so they can be streamed
+        straight from a parser without holding them all in memory.
+        """
+        with self.db:
+            self.db.execute("DELETE FROM messages")
+            self.db.executemany(
+                f"INSERT INTO messages (id, {_quote(MESSAGE_COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((i, record.file, record.row, record.column, record.type,
+                  record.text, str(record.text_hash), False, record.error)
+                 for i, record in enumerate(records, 1)))
+            self._newGeneration()
+
+    def _newGeneration(self):
+        """Identifies a new set of messages, as ids are reused across sets"""
+        self.db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) "
+            "VALUES ('messages', ?)", (uuid.uuid4().hex, ))
+
+    def hasMessages(self) -> bool:
+        """Whether messages have ever been stored, even an empty set"""
+        return self.getMeta("messages") is not None
+
+    @property
+    def generation(self) -> Optional[str]:
+        """Identifier of the currently stored set of messages"""
+        return self.getMeta("messages")
+
+    def loadMessages(self, files: Optional[Iterable[str]] = None,
+                     types: Optional[Iterable[str]] = None) -> MessageTable:
+        """Loads messages, optionally only those in some files or of some types.
+
+        Filtering is done by the file and type indexes. Messages are loaded
+        straight into a compact MessageTable.
+        """
+        query = f"SELECT id, {_quote(MESSAGE_COLUMNS)}, extra FROM messages"
+        conditions = []
+        parameters = []
+        if files is not None:
+            files = list(files)
+            conditions.append(f"file IN ({', '.join('?' * len(files))})")
+            parameters.extend(files)
+        if types is not None:
+            types = list(types)
+            conditions.append(f"type IN ({', '.join('?' * len(types))})")
+            parameters.extend(types)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+
+        messages = MessageTable()
+        for (id_, file, row, column, type_, text, text_hash, legitimate,
+             error, extra) in self.db.execute(query, parameters):
+            messages.append(file, row, column, type_, text, int(text_hash),
+                            legitimate, error, id_,
+                            json.loads(extra) if extra is not None else None)
+
+        return messages
+
+    def updateMessages(self, generation: Optional[str],
+                       legitimate: Mapping[int, bool],
+                       comments: Mapping[int, str]) -> bool:
+        """Stores legitimate flags and comments, keyed by message id.
+
+        Edits are only applied to the set of messages they were made on,
+        returns False if the messages have since been replaced.
+        """
+        with self.db:
+            if generation != self.generation:
+                return False
+
+            self.db.executemany(
+                "UPDATE messages SET legitimate = ? WHERE id = ?",
+                [(value, id_) for id_, value in legitimate.items()])
+            self.db.executemany(
+                "INSERT OR REPLACE INTO comments (message_id, comment) "
+                "VALUES (?, ?)", list(comments.items()))
+
+        return True
+
+    def getComment(self, message: MessageType) -> str:
+        """Fetches the comment on a message"""
+        row = self.db.execute(
+            "SELECT comment FROM comments WHERE message_id = ?",
+            (message["id"], )).fetchone()
+        return row[0] if row is not None else DEFAULT_COMMENT
+
+    #### Lint units
+
+    def lintUnits(self) -> Dict[str, str]:
+        """Fingerprints of the cached lint units, by unit name"""
+        return dict(self.db.execute("SELECT name, fingerprint FROM lint_units"))
+
+    def loadLintUnit(self, name: str) -> Tuple[int, List[LintRecord], List[str]]:
+        """Loads the cached return code, messages and errors of a lint unit"""
+        returncode, errors = self.db.execute(
+            "SELECT returncode, errors FROM lint_units WHERE name = ?",
+            (name, )).fetchone()
+        records = [
+            LintRecord(file, row, column, type_, text, int(text_hash),
+                       bool(error))
+            for file, row, column, type_, text, text_hash, error in
+            self.db.execute(
+                f"SELECT {_quote(LintRecord._fields)} FROM lint_unit_messages "
+                "WHERE unit = ? ORDER BY rowid", (name, ))
+        ]
+
+        return returncode, records, json.loads(errors)
+
+    def saveLintUnit(self, name: str, fingerprint: str, returncode: int,
+                     records: Iterable[LintRecord], errors: List[str]):
+        """Caches the results of linting a unit, replacing older results"""
+        with self.db:
+            self.db.execute("DELETE FROM lint_units WHERE name = ?", (name, ))
+            self.db.execute(
+                "INSERT INTO lint_units (name, fingerprint, returncode, errors) "
+                "VALUES (?, ?, ?, ?)",
+                (name, fingerprint, returncode, json.dumps(errors)))
+            self.db.executemany(
+                f"INSERT INTO lint_unit_messages "
+                f"(unit, {_quote(LintRecord._fields)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((name, record.file, record.row, record.column, record.type,
+                  record.text, str(record.text_hash), record.error)
+                 for record in records))
+
+    def pruneLintUnits(self, names: Iterable[str]):
+        """Drops cached lint units other than the given ones"""
+        names = list(names)
+        with self.db:
+            self.db.execute(
+                f"DELETE FROM lint_units WHERE name NOT IN "
+                f"({', '.join('?' * len(names))})", names)
+
+    #### Waivers
+
+    def replaceWaivers(self, waivers: MessageListType):
+        """Replaces every waiver with a new set of waivers, in order"""
+        with self.db:
+            self.db.execute("DELETE FROM waivers")
+            self.db.executemany(
+                f"INSERT INTO waivers (id, {_quote(WAIVER_COLUMNS)}, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((i, waiver["file"], waiver["row"], waiver["type"],
+                  waiver.get("author"), waiver.get("date"),
+                  waiver.get("reason"), waiver.get("text"),
+                  str(waiver["text_hash"]),
+                  _extra(waiver, WAIVER_COLUMNS, IMPLIED_WAIVER_FIELDS))
+                 for i, waiver in enumerate(waivers, 1)))
+
+    def loadWaivers(self) -> MessageListType:
+        """Loads all waivers, in the order they were added"""
+        waivers = []
+        for (id_, file, row, type_, author, date, reason, text, text_hash,
+             extra) in self.db.execute(
+                 f"SELECT id, {_quote(WAIVER_COLUMNS)}, extra FROM waivers "
+                 "ORDER BY id"):
+            waiver = {
+                "id": id_,
+                "file": file,
+                "row": row,
+                "type": type_,
+                "author": author,
+                "date": date,
+                "reason": reason,
+                "text_hash": int(text_hash),
+                "text": text,
+                "waiver": True,
+                "legitimate": False,
+            }
+            if extra is not None:
+                waiver.update(json.loads(extra))
+            waivers.append(waiver)
+
+        return waivers
+
+    #### YAML import/export
+
+    def exportWaivers(self, path: Path):
+        """Writes waivers to a YAML file, e.g. to be committed.
+
+        The file is replaced atomically, so it is never seen half written.
+        """
+        path = Path(path)
+        waivers = self.loadWaivers()
+        for waiver in waivers:
+            del waiver["id"]
+
+        fd, temp_path = tempfile.mkstemp(dir=str(path.parent),
+                                         prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                dump(waivers, f)
+            os.replace(temp_path, str(path))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        self.setMeta("waivers_mtime", str(path.stat().st_mtime))
+
+    def importWaivers(self, path: Path):
+        """Replaces every waiver with those in a YAML file"""
+        with open(path) as f:
+            waivers = safe_load(f) or []
+        # Committed waivers may still hold legacy hashes
+        hashes = self.legacyHashes() if waivers else None
+        for waiver in waivers:
+            migrate_waiver_hash(waiver, hashes)
+
+        self.replaceWaivers(waivers)
+        self.setMeta("waivers_mtime", str(Path(path).stat().st_mtime))
+
+    def legacyHashes(self) -> Dict[Tuple[str, int], int]:
+        """Current text hash of each message, by (file, legacy hash)"""
+        return legacy_hashes(
+            self.db.execute("SELECT file, text FROM messages"))
+
+    def migrateHashes(self):
+        """Moves messages and waivers to the current text hash.
+
+        Message hashes are always recomputed from their text. Waivers are
+        re-hashed through the legacy hashes of the messages in their file,
+        as they may hold the hash of another message than their own text,
+        see migrate_waiver_hash(). Cached lint units are dropped.
+        """
+        hashes = self.legacyHashes()
+        with self.db:
+            self.db.executemany(
+                "UPDATE messages SET text_hash = ? WHERE id = ?",
+                [(str(text_hash(text)), id_) for id_, text in self.db.execute(
+                    "SELECT id, text FROM messages")])
+
+            waivers = []
+            for id_, file, text, hash_ in self.db.execute(
+                    "SELECT id, file, text, text_hash FROM waivers"):
+                waiver = {"file": file, "text": text or "",
+                          "text_hash": int(hash_)}
+                if migrate_waiver_hash(waiver, hashes):
+                    waivers.append((str(waiver["text_hash"]), id_))
+            self.db.executemany(
+                "UPDATE waivers SET text_hash = ? WHERE id = ?", waivers)
+
+            # Cached lint results are simply re-linted
+            self.db.execute("DELETE FROM lint_units")
+
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) "
+                "VALUES ('text_hash', ?)", (TEXT_HASH_VERSION, ))
+
+
+def store_path(build_path: Path, prefix: str) -> Path:
+    """Path of the message store with the given prefix in a build"""
+    return Path(build_path) / f"{prefix}_messages.db"
+
+
+def open_store(build_path: Path, prefix: str) -> MessageStore:
+    """Opens the message store of a build.
+
+    Builds from before the store existed have their {prefix}_messages.yaml
+    imported once. {prefix}_waivers.yaml is imported whenever it has been
+    changed outside of the store, e.g. by checking out committed waivers.
+    Stores saved with an older text hash are migrated.
+    """
+    build_path = Path(build_path)
+    store = MessageStore(store_path(build_path, prefix))
+
+    messages_path = build_path / f"{prefix}_messages.yaml"
+    if not store.hasMessages() and messages_path.exists():
+        with open(messages_path) as f:
+            store.replaceMessages(safe_load(f) or [])
+
+    waivers_path = build_path / f"{prefix}_waivers.yaml"
+    if waivers_path.exists():
+        if store.getMeta("waivers_mtime") != str(waivers_path.stat().st_mtime):
+            store.importWaivers(waivers_path)
+
+    if store.getMeta("text_hash") != TEXT_HASH_VERSION:
+        store.migrateHashes()
+
+    return store
@@ -0,0 +1,111 @@
+###############################################################################
+# @file pyVerifGUI/db/parse_cache.py
+# @package pyVerifGUI.db.parse_cache
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief SQLite cache of the parser outputs of each source file
+##############################################################################
+
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+import json
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed_files (
+    path TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    entries TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hierarchies (
+    top TEXT PRIMARY KEY,
+    structure TEXT NOT NULL,
+    hierarchy TEXT NOT NULL
+);
+"""
+
+
+class ParseCache:
+    """Parser outputs (modules, interfaces and packages) of each source file.
+
+    Outputs are stored along with the key they were parsed with, which
+    covers the contents of the file and of every file it includes, so an
+    entry is only reused while none of those have changed.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def keys(self) -> Dict[str, str]:
+        """Key each cached file was parsed with"""
+        return dict(self.db.execute("SELECT path, key FROM parsed_files"))
+
+    def hasFilesIn(self, directories: Iterable[Path]) -> bool:
+        """Whether any file under the given directories is cached.
+
+        Only the cache is looked at, the files themselves might be gone.
+        """
+        for directory in directories:
+            prefix = str(Path(directory)) + os.sep
+            row = self.db.execute(
+                "SELECT 1 FROM parsed_files WHERE substr(path, 1, ?) = ? "
+                "LIMIT 1", (len(prefix), prefix)).fetchone()
+            if row is not None:
+                return True
+
+        return False
+
+    def load(self, paths: Iterable[str]) -> Dict[str, dict]:
+        """Cached outputs of the given files, by file"""
+        wanted = set(paths)
+        return {
+            path: json.loads(entries)
+            for path, entries in self.db.execute(
+                "SELECT path, entries FROM parsed_files")
+            if path in wanted
+        }
+
+    def save(self, results: Mapping[str, Tuple[str, dict]]):
+        """Stores the (key, outputs) parsed for each file"""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO parsed_files (path, key, entries) "
+                "VALUES (?, ?, ?)",
+                ((path, key, json.dumps(entries, default=str))
+                 for path, (key, entries) in results.items()))
+
+    def prune(self, paths: Iterable[str]):
+        """Forgets the given files"""
+        with self.db:
+            self.db.executemany("DELETE FROM parsed_files WHERE path = ?",
+                                ((path, ) for path in paths))
+
+    def loadHierarchy(self, top: str, structure: str) -> Optional[dict]:
+        """Hierarchy saved for top, if the design structure is unchanged"""
+        row = self.db.execute(
+            "SELECT hierarchy FROM hierarchies WHERE top = ? AND structure = ?",
+            (top, structure)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def saveHierarchy(self, top: str, structure: str, hierarchy: dict):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO hierarchies (top, structure, hierarchy) "
+                "VALUES (?, ?, ?)",
+                (top, structure, json.dumps(hierarchy, default=str)))
+
+
+def parse_cache_path(builds_path: Path) -> Path:
+    """Where the parse cache shared by every build lives"""
+    return Path(builds_path) / "sv_parse_cache.db"
@@ -23,6 +23,7 @@ import inspect
 
 from pyVerifGUI.plugin_utils import import_plugins
 from pyVerifGUI.tasks.base import task_names
+from pyVerifGUI.tasks.process_pool import shutdown_pool
 import pyVerifGUI.gui.tabs
 
 from .config import Config
@@ -128,7 +129,9 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
 
         #### Menu bar
         self.menu_bar = QtWidgets.QMenuBar(self)
-        self.menu_bar.addMenu(FileMenu(self.menu_bar, self.config))
+        self.file_menu = FileMenu(self.menu_bar, self.config)
+        self.file_menu.flushRequested.connect(self.flushTabs)
+        self.menu_bar.addMenu(self.file_menu)
         self.menu_bar.addMenu(ViewMenu(self.menu_bar))
         self.menu_bar.addMenu(HelpMenu(self.menu_bar))
         self.setMenuBar(self.menu_bar)
@@ -188,6 +191,13 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
             self.globalUpdate.connect(tab.update)
             tab.logOutput.connect(self.logger.log_out)
 
+            # Message tabs show messages while their task is running
+            if hasattr(tab, "appendMessages"):
+                self.overview_tab.runner.messages_began.connect(
+                    tab.beginStreaming)
+                self.overview_tab.runner.messages_found.connect(
+                    tab.appendMessages)
+
         # Verify and disable any tabs that don't validate
         self.verifyTabs()
 
@@ -216,6 +226,11 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
 
         return True
 
+    def flushTabs(self):
+        """Saves any pending changes in every tab"""
+        for tab in self.tabs:
+            tab.flush()
+
     def closeEvent(self, event: QtGui.QCloseEvent):
         """Overridden here to save any open text editors"""
         for tab in self.tabs:
@@ -228,6 +243,10 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
 
         self.overview_tab.runner.killAllTasks()
 
+        # Make sure every edit is on disk
+        self.flushTabs()
+        shutdown_pool()
+
         # Close if nothing is unsaved
         # TODO provide method to override, e.g. unsafely close
         super().closeEvent(event)
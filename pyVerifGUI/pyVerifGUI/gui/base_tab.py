@@ -68,6 +68,12 @@ class Tab(QtWidgets.QWidget):
         """
         return True
 
+    def flush(self):
+        """Re-implement in child class to save any pending changes.
+
+        Called before closing the application.
+        """
+
     #### ------
     # Functions the plugin or whatever needs to define for common functionality
     def _post_init(self) -> Optional[str]:
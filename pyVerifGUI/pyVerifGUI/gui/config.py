@@ -76,6 +76,9 @@ class Config(QtCore.QObject):
 
         self.new_build = False
         self.is_valid = False
+        # Maximum number of threads tasks may use, set by the runner. Defaults
+        # to the runner's default, so parsing is parallel from the start.
+        self.num_threads = max(1, (os.cpu_count() or 1) // 2)
 
     def reload_config(self):
         """Reloads configuration and build, e.g. after an edit"""
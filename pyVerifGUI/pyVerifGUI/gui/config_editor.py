@@ -93,6 +93,8 @@ class ConfigEditor(QtWidgets.QWidget):
         # Extra verilator lint arguments
         self.verilator_label = QtWidgets.QLabel("Verilator linting arguments (optional)", self)
         self.verilator_args = QtWidgets.QPlainTextEdit(self)
+        self.lint_sharded = QtWidgets.QCheckBox(
+            "Lint design subtrees in parallel (uses the runner's thread count)", self)
 
         # Buttons!
         self.validate_button = QtWidgets.QPushButton("Validate", self)
@@ -117,8 +119,9 @@ class ConfigEditor(QtWidgets.QWidget):
         self.layout.addWidget(self.parser_args, 10, 0)
         self.layout.addWidget(self.verilator_label, 11, 0)
         self.layout.addWidget(self.verilator_args, 12, 0)
-        self.layout.addWidget(self.validate_button, 13, 0, 1, 2)
-        self.layout.addWidget(self.save, 14, 0, 1, 2)
+        self.layout.addWidget(self.lint_sharded, 13, 0)
+        self.layout.addWidget(self.validate_button, 14, 0, 1, 2)
+        self.layout.addWidget(self.save, 15, 0, 1, 2)
 
         if config_path is None:
             dialog = QtWidgets.QFileDialog.getSaveFileName
@@ -196,6 +199,7 @@ class ConfigEditor(QtWidgets.QWidget):
 
         self.parser_args.setPlainText(config.get("parse_args", ""))
         self.verilator_args.setPlainText(config.get("verilator_args", ""))
+        self.lint_sharded.setChecked(bool(config.get("lint_sharded", False)))
 
     def validate(self) -> List[str]:
         """Validates that the input config settings are correct"""
@@ -243,6 +247,7 @@ class ConfigEditor(QtWidgets.QWidget):
             "rtl_dirs": self.rtl.dump(),
             "parse_args": self.parser_args.toPlainText(),
             "verilator_args": self.verilator_args.toPlainText(),
+            "lint_sharded": self.lint_sharded.isChecked(),
         })
 
         dump(self.config, open(str(self.config_path), "w"))
@@ -16,6 +16,7 @@ from pathlib import Path
 import subprocess as sp
 import shutil
 
+from pyVerifGUI.db import open_store, store_path
 from pyVerifGUI.tasks.base import task_names
 
 
@@ -23,6 +24,8 @@ class FileMenu(QtWidgets.QMenu):
     """Custom menu for doing file-based stuff"""
 
     log_output = QtCore.Signal(str)
+    # Emitted when pending edits need to be saved to disk
+    flushRequested = QtCore.Signal()
 
     def __init__(self, parent, config):
         super().__init__("File", parent)
@@ -58,7 +61,14 @@ class FileMenu(QtWidgets.QMenu):
     def commitLint(self, checked=False):
         """Preps for linter waiver commits"""
         del checked
+        self.flushRequested.emit()
         filename = self.config.build_path.resolve() / "linter_waivers.yaml"
+        if store_path(self.config.build_path, "linter").exists():
+            # Waivers are committed as YAML, exported from the message store
+            store = open_store(self.config.build_path, "linter")
+            store.exportWaivers(filename)
+            store.close()
+
         if filename.exists():
             self.commit_file.setText(str(filename))
             self.commit_dialog.exec_()
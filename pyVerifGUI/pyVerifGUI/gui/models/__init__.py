@@ -19,5 +19,6 @@ from typing import Sequence, Mapping, Union
 MessageType = Mapping[str, Union[str, int, bool]]
 MessageListType = Sequence[Mapping[str, Union[str, int, bool]]]
 
+from .table import MessageTable, MessageRow
 from .design import ModuleTreeItem, ModuleTreeItemModel
 from .lint import LintMessageModel, DiffLintMessageModel, LintMessages, LintWaivers
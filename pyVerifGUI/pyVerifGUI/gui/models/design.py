@@ -19,18 +19,35 @@ from qtpy.QtCore import QAbstractItemModel, QModelIndex
 from typing import Mapping, Sequence
 
 from pyVerifGUI.gui.models import MessageType
+from pyVerifGUI.parsers.design_dag import DesignDag
+
+
+# Children created at a time when a module is expanded, so huge fan-outs
+# don't stall the view
+FETCH_BATCH = 1000
 
 
 class ModuleTreeItem:
-    """Item to represent each module in the design module hierarchy"""
-    def __init__(self, name: str, parent=None):
+    """Item to represent each module in the design module hierarchy.
+
+    Items built from a DesignDag only create their children when they are
+    fetched, see ModuleTreeItemModel, so only the instances that have been
+    looked at exist.
+    """
+    def __init__(self, name: str, parent=None, dag: DesignDag = None):
         self.name = name
         self.parent = parent
         self.children = []
+        # Row of this item in its parent
         self.index = None
+        # Graph the children are created from
+        self.dag = dag
+        # Hierarchical path, worked out when first needed
+        self._path = None
 
     def appendChild(self, child: ModuleTreeItem):
         """Adds a child module"""
+        child.index = len(self.children)
         self.children.append(child)
 
     def child(self, row: int) -> ModuleTreeItem:
@@ -40,18 +57,59 @@ class ModuleTreeItem:
         return self.children[row]
 
     def childCount(self) -> int:
-        """Counts the number of sub-modules"""
+        """Counts the number of sub-modules created so far"""
         return len(self.children)
 
+    def hasChildren(self) -> bool:
+        """Whether there are sub-modules, created yet or not"""
+        if self.dag is not None:
+            return len(self.dag.children(self.name)) > 0
+
+        return len(self.children) > 0
+
+    def pendingCount(self) -> int:
+        """Counts the sub-modules that haven't been created yet"""
+        if self.dag is None:
+            return 0
+
+        return len(self.dag.children(self.name)) - len(self.children)
+
+    def fetchMore(self, count: int):
+        """Creates up to count more sub-modules from the graph"""
+        first = len(self.children)
+        for name in self.dag.children(self.name)[first:first + count]:
+            self.appendChild(ModuleTreeItem(name, self, self.dag))
+
+    def rowOf(self, name: str) -> int:
+        """Row of the first sub-module with the given name, created yet or
+        not, -1 if there is none
+        """
+        names = [child.name for child in self.children]
+        if self.dag is not None:
+            names = self.dag.children(self.name)
+
+        try:
+            return names.index(name)
+        except ValueError:
+            return -1
+
     def row(self) -> int:
         """Returns the index of this child to it's parent"""
-        if self.parent is not None:
-            for i, child in enumerate(self.parent.children):
-                if child == self:
-                    return i
+        if self.index is not None:
+            return self.index
 
         return 0
 
+    def path(self) -> str:
+        """Hierarchical path of the module, from the top module"""
+        if self._path is None:
+            if self.parent is None or self.parent.parent is None:
+                self._path = self.name
+            else:
+                self._path = f"{self.parent.path()}.{self.name}"
+
+        return self._path
+
     def data(self) -> str:
         """Accessor for module name"""
         return self.name
@@ -67,6 +125,10 @@ class ModuleTreeItem:
             self.appendChild(child)
             child.build(in_tree[key])
 
+    def buildFromDag(self, dag: DesignDag):
+        """Adds the top module of a graph, which creates its children lazily"""
+        self.appendChild(ModuleTreeItem(dag.top, self, dag))
+
 
 class ModuleTreeItemModel(QAbstractItemModel):
     """Implements the functions require to implement the model class for use
@@ -107,6 +169,52 @@ class ModuleTreeItemModel(QAbstractItemModel):
 
         return self.createIndex(parent_item.row(), 0, parent_item)
 
+    def itemFor(self, index: QModelIndex) -> ModuleTreeItem:
+        """The item of an index, the root for an invalid index"""
+        if not index.isValid():
+            return self.tree_root
+
+        return index.internalPointer()
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        """Overridden so modules can be expanded before their children exist"""
+        return self.itemFor(parent).hasChildren()
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        """Whether some children of the item haven't been created yet"""
+        return self.itemFor(parent).pendingCount() > 0
+
+    def fetchMore(self, parent: QModelIndex):
+        """Creates the next batch of children of the item, as it is expanded
+        or scrolled through
+        """
+        item = self.itemFor(parent)
+        count = min(item.pendingCount(), FETCH_BATCH)
+        if count <= 0:
+            return
+
+        first = item.childCount()
+        self.beginInsertRows(parent, first, first + count - 1)
+        item.fetchMore(count)
+        self.endInsertRows()
+
+    def indexForPath(self, path: Sequence[str]) -> QModelIndex:
+        """Index of the instance at a path of module names from the top,
+        fetching the children along it. Invalid if there is no such instance.
+        """
+        index = QModelIndex()
+        for name in path:
+            item = self.itemFor(index)
+            row = item.rowOf(name)
+            if row < 0:
+                return QModelIndex()
+
+            while item.childCount() <= row:
+                self.fetchMore(index)
+            index = self.index(row, 0, index)
+
+        return index
+
     def rowCount(self, parent: QModelIndex) -> int:
         """Required subclass implementation. Returns the number of the item's children"""
         if not parent.isValid():
@@ -0,0 +1,127 @@
+###############################################################################
+# @file pyVerifGUI/gui/models/diff.py
+# @package pyVerifGUI.gui.models.diff
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Differences between the messages of two builds
+##############################################################################
+
+from typing import Any, Callable, Hashable, List, NamedTuple, Optional, Sequence
+
+from pyVerifGUI.gui.models import MessageType, MessageListType
+
+from .table import MessageTable
+
+
+def canonical_fields(*message_lists: MessageListType) -> List[str]:
+    """Sorted union of the fields found in the given messages.
+
+    diffType is ignored, as older builds may have it saved with their messages,
+    as is the id messages are given by the message store.
+    """
+    fields = set()
+    for messages in message_lists:
+        if isinstance(messages, MessageTable):
+            # Every row has the same fields, plus any extra ones
+            fields.update(messages.fields)
+            for extra in messages.extra.values():
+                fields.update(extra.keys())
+            continue
+
+        for message in messages:
+            fields.update(message.keys())
+    fields.discard("diffType")
+    fields.discard("id")
+
+    return sorted(fields)
+
+
+def canonical_key(fields: Sequence[str]) -> Callable[[MessageType], Hashable]:
+    """Builds a function returning a hashable key of every field of a message"""
+    def key(message: MessageType) -> Hashable:
+        return tuple(map(message.get, fields))
+
+    return key
+
+
+class DiffRecord:
+    """Lightweight reference to a message on one side of a diff.
+
+    Behaves like the (read-only) message it wraps, with an extra "diffType"
+    field of either "add" or "remove". The original message is never modified.
+    """
+    __slots__ = ("diffType", "message")
+
+    def __init__(self, diffType: str, message: MessageType):
+        self.diffType = diffType
+        self.message = message
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "diffType":
+            return self.diffType
+        return self.message[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "diffType":
+            return self.diffType
+        return self.message.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key == "diffType" or key in self.message
+
+
+class MessageDiff(NamedTuple):
+    """Result of diffing two lists of messages"""
+    added: List[DiffRecord]
+    removed: List[DiffRecord]
+    unchanged: MessageListType
+
+
+def _keys(messages: MessageListType, key: Callable[[MessageType], Hashable],
+          fields: Sequence[str]) -> List[Hashable]:
+    """Keys of every message, built column by column for message tables"""
+    if isinstance(messages, MessageTable):
+        return messages.keyTuples(fields)
+
+    return [key(message) for message in messages]
+
+
+def diff_messages(current: MessageListType, compare: MessageListType,
+                  key: Optional[Callable[[MessageType], Hashable]] = None
+                  ) -> MessageDiff:
+    """Diffs two lists of messages in linear time.
+
+    Each message is hashed once, then membership is checked with set lookups.
+    By default messages are compared on every field.
+    """
+    if key is None:
+        fields = canonical_fields(current, compare)
+        key = canonical_key(fields)
+        current_keys = _keys(current, key, fields)
+        compare_keys = _keys(compare, key, fields)
+    else:
+        current_keys = [key(message) for message in current]
+        compare_keys = [key(message) for message in compare]
+    current_set = set(current_keys)
+    compare_set = set(compare_keys)
+
+    added = []
+    unchanged = []
+    for message, message_key in zip(current, current_keys):
+        if message_key in compare_set:
+            unchanged.append(message)
+        else:
+            added.append(DiffRecord("add", message))
+
+    removed = [
+        DiffRecord("remove", message)
+        for message, message_key in zip(compare, compare_keys)
+        if message_key not in current_set
+    ]
+
+    return MessageDiff(added, removed, unchanged)
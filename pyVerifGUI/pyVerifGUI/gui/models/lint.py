@@ -12,10 +12,12 @@
 ##############################################################################
 
 from qtpy import QtCore, QtGui
+from typing import Optional
 
 from pyVerifGUI.gui.models import MessageListType
 
 from .message import AbstractMessageModel, AbstractDiffMessageModel, Messages
+from .waivers import RuleMatcher
 
 
 class LintMessages(Messages):
@@ -40,9 +42,10 @@ class LintWaivers(Messages):
 
 class LintMessageModel(AbstractMessageModel):
     """Abstract model class to represent a linter message"""
-    def __init__(self, messages: MessageListType, waivers: MessageListType):
+    def __init__(self, messages: MessageListType, waivers: MessageListType,
+                 rules: Optional[RuleMatcher] = None):
         """Messages come directly from parsed linter_messages.yaml"""
-        super().__init__(messages, waivers, LintMessages, LintWaivers)
+        super().__init__(messages, waivers, LintMessages, LintWaivers, rules)
 
 
 class DiffLintMessageModel(AbstractDiffMessageModel):
@@ -13,10 +13,23 @@
 
 from qtpy import QtCore, QtGui
 import os
-from typing import Sequence, Union
+from typing import Hashable, Mapping, Optional, Sequence, Tuple, Union
 
 from pyVerifGUI.gui.models import MessageType, MessageListType
 
+from .diff import diff_messages
+from .table import MessageTable, fold_hash
+from .waivers import RuleMatcher, WaiverIndex, message_key
+
+
+# Background colours for each message state
+LEGITIMATE_COLOUR = QtGui.QColor(0xFF, 0x45, 0)
+ERROR_COLOUR = QtGui.QColor(0xD0, 0, 0)
+WAIVED_COLOUR = QtGui.QColor(0x60, 0x60, 0x60)
+DEFAULT_COLOUR = QtGui.QColor(0xD4, 0xD2, 0)
+ADDED_COLOUR = QtGui.QColor(0x00, 0xD0, 0x00)
+REMOVED_COLOUR = QtGui.QColor(0xD0, 0x00, 0x00)
+
 
 class Messages:
     """Base class to contain lists of messages"""
@@ -33,16 +46,35 @@ class Messages:
         return self.messages[position]
 
     def append(self, item: MessageType):
-        self.messages.append(item)
+        self._editable().append(item)
 
     def remove(self, item: MessageType):
-        self.messages.remove(item)
+        self._editable().remove(item)
+
+    def insert(self, position: int, item: MessageType):
+        self._editable().insert(position, item)
+
+    def pop(self, position: int) -> MessageType:
+        return self._editable().pop(position)
+
+    def _editable(self) -> list:
+        """Messages as a list, which can be edited.
+
+        Messages loaded into a MessageTable are turned into a list of its
+        rows the first time they change. Each row has a single view, so the
+        listed messages are the same objects as before.
+        """
+        if isinstance(self.messages, MessageTable):
+            self.messages = list(self.messages)
+
+        return self.messages
 
 
 class AbstractMessageModel(QtCore.QAbstractItemModel):
     """Base model to represent a message to be displayed in a table"""
     def __init__(self, messages: MessageListType, waivers: MessageListType,
-                 messageType: Messages, waiverType: Messages):
+                 messageType: Messages, waiverType: Messages,
+                 rules: Optional[RuleMatcher] = None):
         super().__init__()
         # These are here so we can provide a more generic interface
         # Can easily be provided in the subclass's constructor
@@ -61,100 +93,384 @@ class AbstractMessageModel(QtCore.QAbstractItemModel):
         self.messages = self.all_messages
         self.selection = "all"
 
+        # Rendered (display strings, colour) for each displayed row,
+        # filled in the first time a row is painted
+        self.render_cache = [None] * len(self.messages)
+        self.basenames = {}
         self.view_full_filenames = False
 
+        # Set while applying a batch of changes, collects rows to repaint
+        self.batch_rows = None
+
+        self.waiver_index = WaiverIndex(self.messageKey)
+        # Pattern-based waivers, and the rule each message is waived by
+        self.rules = rules if rules is not None else RuleMatcher()
+        self.rule_matches = {}
         self.filterMessages()
         self.called = 0
 
     def isMessageEqual(self, a, b):
         """Required implementation of whether two messages are equal"""
         if a["file"] == b["file"] and a["row"] == b["row"]:
-            if a["text_hash"] == b["text_hash"]:
+            if fold_hash(a["text_hash"]) == fold_hash(b["text_hash"]):
                 return True
 
         return False
 
+    def messageKey(self, message: MessageType) -> Hashable:
+        """Hashable key that messages and waivers are matched on.
+
+        Must agree with isMessageEqual, as it is what the waiver index uses.
+        """
+        return message_key(message)
+
     def filterMessages(self):
         """Builds list of waived and unwaived messages."""
+        self.waiver_index.build(self.all_messages, self.waivers)
+        self.message_order = {
+            id(message): i for i, message in enumerate(self.all_messages)
+        }
+        self.waiver_order = {
+            id(waiver): i for i, waiver in enumerate(self.waivers)
+        }
+        self.next_waiver_order = len(self.waivers)
+
+        # Rules never change while the model exists, so match them once
+        self.rule_matches = {}
+        if len(self.rules) > 0:
+            for message in self.all_messages:
+                rule = self.rules.match(message)
+                if rule is not None:
+                    self.rule_matches[id(message)] = rule
+
         unwaived = []
         waived = []
         orphans = []
 
         # Build filtered lists
         for message in self.all_messages:
-            is_waived = False
-
-            # Check if message is waived
-            for waiver in self.waivers:
-                if self.isMessageEqual(message, waiver):
-                    is_waived = True
-                    break
-
-            if is_waived:
+            if self.isWaived(message):
                 waived.append(message)
             else:
                 unwaived.append(message)
 
         # Find orphaned waivers
         for waiver in self.waivers:
-            is_orphan = True
-            for message in waived:
-                if self.isMessageEqual(message, waiver):
-                    is_orphan = False
-                    break
-
-            if is_orphan:
+            if self.waiver_index.isOrphan(waiver):
                 orphans.append(waiver)
 
         self.unwaived_messages = self.messageType(unwaived)
         self.waived_messages = self.messageType(waived)
         self.orphans = self.waiverType(orphans)
         # Update selection
-        self.selectMessages(self.selection)
+        self.resetSelection(self.selection)
+
+    def isWaived(self, message: MessageType) -> bool:
+        """Whether a message is waived, either by a waiver or by a rule"""
+        return (self.waiver_index.isWaived(message)
+                or id(message) in self.rule_matches)
+
+    def findRule(self, message: MessageType) -> Optional[MessageType]:
+        """Finds the waiver rule matching a given message, if any"""
+        return self.rule_matches.get(id(message))
+
+    def _orderedPosition(self, partition: Messages, item: MessageType,
+                         order: Mapping[int, int]) -> int:
+        """Binary search for where an item belongs in an ordered partition"""
+        position = order[id(item)]
+        low, high = 0, len(partition)
+        while low < high:
+            mid = (low + high) // 2
+            if order[id(partition[mid])] < position:
+                low = mid + 1
+            else:
+                high = mid
+
+        return low
+
+    def _insertOrdered(self, partition: Messages, item: MessageType,
+                       order: Mapping[int, int]):
+        """Inserts an item into a partition, keeping the original ordering"""
+        position = self._orderedPosition(partition, item, order)
+        if partition is self.messages and self.batch_rows is not None:
+            partition.insert(position, item)
+            self.render_cache.insert(position, None)
+        elif partition is self.messages:
+            self.beginInsertRows(QtCore.QModelIndex(), position, position)
+            partition.insert(position, item)
+            self.render_cache.insert(position, None)
+            self.endInsertRows()
+        else:
+            partition.insert(position, item)
+
+    def _removeOrdered(self, partition: Messages, item: MessageType,
+                       order: Mapping[int, int]):
+        """Removes an item from a partition in O(log n) lookups"""
+        position = self._orderedPosition(partition, item, order)
+        if position >= len(partition) or partition[position] is not item:
+            return
+
+        if partition is self.messages and self.batch_rows is not None:
+            partition.pop(position)
+            self.render_cache.pop(position)
+        elif partition is self.messages:
+            self.beginRemoveRows(QtCore.QModelIndex(), position, position)
+            partition.pop(position)
+            self.render_cache.pop(position)
+            self.endRemoveRows()
+        else:
+            partition.pop(position)
+
+    def _appendRows(self, partition: Messages, items: MessageListType):
+        """Appends items to the end of a partition"""
+        if not items:
+            return
+
+        if partition is self.messages:
+            first = len(partition)
+            self.beginInsertRows(QtCore.QModelIndex(), first,
+                                 first + len(items) - 1)
+            for item in items:
+                partition.append(item)
+            self.render_cache.extend([None] * len(items))
+            self.endInsertRows()
+        else:
+            for item in items:
+                partition.append(item)
+
+    def appendMessages(self, messages: MessageListType):
+        """Adds messages after all others, e.g. as a running task finds them.
+
+        The new rows are inserted into the displayed list, so the view keeps
+        its scroll position and selection.
+        """
+        waived = []
+        unwaived = []
+        first = len(self.all_messages)
+        for i, message in enumerate(messages):
+            self.message_order[id(message)] = first + i
+            if len(self.rules) > 0:
+                rule = self.rules.match(message)
+                if rule is not None:
+                    self.rule_matches[id(message)] = rule
+
+            # Waivers matching the new message are no longer orphans
+            for waiver in self.waiver_index.addMessage(message):
+                self._removeOrdered(self.orphans, waiver, self.waiver_order)
+
+            if self.isWaived(message):
+                waived.append(message)
+            else:
+                unwaived.append(message)
 
-    def addWaiver(self, waiver: MessageType, rebuild=True):
-        """Adds a waiver to the list of waivers"""
-        self.waivers.append(waiver)
-        if rebuild:
-            self.filterMessages()
+        self._appendRows(self.all_messages, messages)
+        self._appendRows(self.waived_messages, waived)
+        self._appendRows(self.unwaived_messages, unwaived)
 
-    def removeWaiver(self, waiver: MessageType, rebuild=True):
+    def rowOf(self, item: MessageType) -> Optional[int]:
+        """Returns the displayed row of a message or waiver, or None"""
+        if self.selection in ("waivers", "orphans"):
+            order = self.waiver_order
+        else:
+            order = self.message_order
+
+        if id(item) not in order:
+            return None
+
+        row = self._orderedPosition(self.messages, item, order)
+        if row < len(self.messages) and self.messages[row] is item:
+            return row
+
+        return None
+
+    def invalidateMessage(self, message: MessageType):
+        """Drops the cached rendering of a message, so it gets repainted"""
+        row = self.rowOf(message)
+        if row is not None and self.batch_rows is not None:
+            self.render_cache[row] = None
+            self.batch_rows.append(row)
+        elif row is not None:
+            self.render_cache[row] = None
+            self.dataChanged.emit(
+                self.index(row, 0, QtCore.QModelIndex()),
+                self.index(row, self.columnCount() - 1, QtCore.QModelIndex()))
+
+    def setLegitimate(self, message: MessageType, legitimate: bool):
+        """Marks a message as (not) legitimate"""
+        if message["legitimate"] != legitimate:
+            message.update({"legitimate": legitimate})
+            self.invalidateMessage(message)
+
+    def _indexWaiver(self, waiver: MessageType, order: Optional[int] = None):
+        """Updates the waived/unwaived/orphan partitions for a new waiver.
+
+        New waivers go at the end, unless given an existing ordering slot.
+        """
+        if order is None:
+            order = self.next_waiver_order
+            self.next_waiver_order += 1
+        self.waiver_order[id(waiver)] = order
+        self._insertOrdered(self.waivers, waiver, self.waiver_order)
+
+        for message in self.waiver_index.addWaiver(waiver):
+            if id(message) in self.rule_matches:
+                # Already waived by a rule
+                continue
+            self._removeOrdered(self.unwaived_messages, message,
+                                self.message_order)
+            self._insertOrdered(self.waived_messages, message,
+                                self.message_order)
+            if self.selection == "all":
+                self.invalidateMessage(message)
+
+        if self.waiver_index.isOrphan(waiver):
+            self._insertOrdered(self.orphans, waiver, self.waiver_order)
+
+    def _unindexWaiver(self, waiver: MessageType):
+        """Updates the waived/unwaived/orphan partitions for a removed waiver"""
+        self._removeOrdered(self.waivers, waiver, self.waiver_order)
+        if self.waiver_index.isOrphan(waiver):
+            self._removeOrdered(self.orphans, waiver, self.waiver_order)
+
+        for message in self.waiver_index.removeWaiver(waiver):
+            if id(message) in self.rule_matches:
+                # Still waived by a rule
+                continue
+            self._removeOrdered(self.waived_messages, message,
+                                self.message_order)
+            self._insertOrdered(self.unwaived_messages, message,
+                                self.message_order)
+            if self.selection == "all":
+                self.invalidateMessage(message)
+
+        del self.waiver_order[id(waiver)]
+
+    def addWaiver(self, waiver: MessageType):
+        """Adds a waiver to the list of waivers.
+
+        Only the rows affected by the waiver are signalled to the view.
+        """
+        self._indexWaiver(waiver)
+
+    def removeWaiver(self, waiver: MessageType):
         """Removes an existing waiver from the list"""
-        self.waivers.remove(waiver)
-        if rebuild:
-            self.filterMessages()
+        self._unindexWaiver(waiver)
 
     def updateWaiver(self, old: MessageType, new: MessageType):
-        """Replaces an existing waiver with a new waiver"""
-        self.removeWaiver(old, rebuild=False)
-        self.addWaiver(new)
+        """Replaces an existing waiver with a new waiver, in the same position"""
+        order = self.waiver_order[id(old)]
+        self._unindexWaiver(old)
+        self._indexWaiver(new, order)
+
+    def updateWaivers(self,
+                      added: MessageListType = (),
+                      removed: MessageListType = (),
+                      updated: Sequence[Tuple[MessageType, MessageType]] = ()):
+        """Applies a batch of waiver changes as a single transaction.
+
+        The view gets one notification for the whole batch, rather than one
+        per affected row.
+        """
+        # Waiver changes can only move rows in or out of filtered views
+        moves_rows = self.selection != "all"
+        if moves_rows:
+            self.layoutAboutToBeChanged.emit()
+            persistent = self.persistentIndexList()
+            persistent_items = [(index.internalPointer(), index.column())
+                                for index in persistent]
+
+        self.batch_rows = []
+        try:
+            for waiver in removed:
+                self._unindexWaiver(waiver)
+            for old, new in updated:
+                order = self.waiver_order[id(old)]
+                self._unindexWaiver(old)
+                self._indexWaiver(new, order)
+            for waiver in added:
+                self._indexWaiver(waiver)
+            rows = self.batch_rows
+        finally:
+            self.batch_rows = None
+
+        if moves_rows:
+            # Keep the selection and current index on the same items
+            new_persistent = []
+            for item, column in persistent_items:
+                row = self.rowOf(item)
+                if row is None:
+                    new_persistent.append(QtCore.QModelIndex())
+                else:
+                    new_persistent.append(self.createIndex(row, column, item))
+            self.changePersistentIndexList(persistent, new_persistent)
+            self.layoutChanged.emit()
+        elif rows:
+            self.dataChanged.emit(
+                self.index(min(rows), 0, QtCore.QModelIndex()),
+                self.index(max(rows), self.columnCount() - 1,
+                           QtCore.QModelIndex()))
+
+    def addWaivers(self, waivers: MessageListType):
+        """Adds a list of waivers in one transaction"""
+        self.updateWaivers(added=waivers)
+
+    def removeWaivers(self, waivers: MessageListType):
+        """Removes a list of waivers in one transaction"""
+        self.updateWaivers(removed=waivers)
 
     def findWaiver(self, message: MessageType) -> MessageType:
         """Finds the waiver associated with a given message"""
-        for waiver in self.waivers:
-            if self.isMessageEqual(waiver, message):
-                return waiver
+        return self.waiver_index.findWaiver(message)
 
-        return None
-
-    def selectMessages(self, selection: str):
-        """Change the type of messages to be displayed"""
-        self.beginResetModel()
-        self.selection = selection
+    def partition(self, selection: str) -> Messages:
+        """Returns the list of messages for a given selection"""
         if selection == "all":
-            self.messages = self.all_messages
+            return self.all_messages
         elif selection == "unwaived":
-            self.messages = self.unwaived_messages
+            return self.unwaived_messages
         elif selection == "waived":
-            self.messages = self.waived_messages
+            return self.waived_messages
         elif selection == "waivers":
-            self.messages = self.waivers
+            return self.waivers
         elif selection == "orphans":
-            self.messages = self.orphans
+            return self.orphans
         else:
             raise KeyError
+
+    def selectMessages(self, selection: str):
+        """Change the type of messages to be displayed"""
+        # Edits to the displayed list are signalled row by row, so only
+        # reset when a different list is being displayed
+        if (self.partition(selection) is self.messages
+                and selection == self.selection):
+            return
+
+        self.resetSelection(selection)
+
+    def resetSelection(self, selection: str):
+        """Resets the model to display the given selection"""
+        self.beginResetModel()
+        self.selection = selection
+        self.messages = self.partition(selection)
+        self.render_cache = [None] * len(self.messages)
         self.endResetModel()
 
+    @property
+    def view_full_filenames(self) -> bool:
+        """Whether full paths are displayed instead of file basenames"""
+        return self._view_full_filenames
+
+    @view_full_filenames.setter
+    def view_full_filenames(self, view: bool):
+        """Changing the file display invalidates every rendered row"""
+        self._view_full_filenames = view
+        self.render_cache = [None] * len(self.messages)
+        if len(self.messages) > 0:
+            self.dataChanged.emit(
+                self.index(0, 0, QtCore.QModelIndex()),
+                self.index(len(self.messages) - 1,
+                           self.columnCount() - 1, QtCore.QModelIndex()))
+
     def index(self, row: int, column: int,
               parent: QtCore.QModelIndex) -> QtCore.QModelIndex:
         """Returns the index of a requested item"""
@@ -191,28 +507,51 @@ class AbstractMessageModel(QtCore.QAbstractItemModel):
         """Returns the data associated with an index"""
         if index.isValid():
             if role == QtCore.Qt.DisplayRole:
-                accessor = self.messages.accessors[index.column()]
-                data = index.internalPointer()[accessor]
-                if accessor == "file":
-                    if not self.view_full_filenames:
-                        return os.path.basename(data)
-                return data
+                return self.renderRow(index.row())[0][index.column()]
             elif role == QtCore.Qt.BackgroundColorRole:
-                return self.getBackgroundColour(index)
-
-    def getBackgroundColour(self, index: QtCore.QModelIndex) -> QtGui.QColor:
-        """Returns the background colour for a given index"""
-        message = index.internalPointer()
-        #if self.findWaiver(message):
+                return self.renderRow(index.row())[1]
+
+    def renderRow(self, row: int) -> Tuple[Sequence, QtGui.QColor]:
+        """Returns the cached display strings and colour for a row"""
+        rendered = self.render_cache[row]
+        if rendered is None:
+            rendered = self.renderMessage(self.messages[row])
+            self.render_cache[row] = rendered
+
+        return rendered
+
+    def renderMessage(self,
+                      message: MessageType) -> Tuple[Sequence, QtGui.QColor]:
+        """Builds the display strings and colour for a message"""
+        display = []
+        for accessor in self.messages.accessors:
+            data = message[accessor]
+            if accessor == "file" and not self.view_full_filenames:
+                data = self.basename(data)
+            display.append(data)
+
+        return (tuple(display), self.getBackgroundColour(message))
+
+    def basename(self, path: str) -> str:
+        """os.path.basename, computed once per unique path"""
+        name = self.basenames.get(path)
+        if name is None:
+            name = os.path.basename(path)
+            self.basenames[path] = name
+
+        return name
+
+    def getBackgroundColour(self, message: MessageType) -> QtGui.QColor:
+        """Returns the background colour for a given message"""
         if message["legitimate"]:
-            return QtGui.QColor(0xFF, 0x45, 0)
+            return LEGITIMATE_COLOUR
         elif message.get("error", False):
-            return QtGui.QColor(0xD0, 0, 0)
+            return ERROR_COLOUR
         elif self.selection == "all":
-            if self.findWaiver(message) is not None:
-                return QtGui.QColor(0x60, 0x60, 0x60)
+            if self.isWaived(message):
+                return WAIVED_COLOUR
 
-        return QtGui.QColor(0xD4, 0xD2, 0)
+        return DEFAULT_COLOUR
 
     def headerData(self, column: int, orientation: int, role: int) -> str:
         """Returns the appropriate data for the headers"""
@@ -253,23 +592,13 @@ class AbstractDiffMessageModel(AbstractMessageModel):
 
     def generateDiffs(self, current: MessageListType,
                       compare: MessageListType) -> MessageListType:
-        """Adds differential dicts from current and compare to storage"""
-        storage = []
-        for message in current:
-            if message not in compare:
-                message.update({"diffType": "add"})
-                storage.append(message)
-        for message in compare:
-            if message not in current:
-                message.update({"diffType": "remove"})
-                storage.append(message)
-        return storage
-
-    def getBackgroundColour(self, index: QtCore.QModelIndex) -> QtGui.QColor:
-        """Returns the background colour for a given index"""
-        if index.internalPointer()["diffType"] == "add":
-            colour = QtGui.QColor(0x00, 0xD0, 0x00)
-        else:
-            colour = QtGui.QColor(0xD0, 0x00, 0x00)
+        """Returns diff records for everything added or removed in current"""
+        diff = diff_messages(current, compare)
+        return diff.added + diff.removed
+
+    def getBackgroundColour(self, message: MessageType) -> QtGui.QColor:
+        """Returns the background colour for a given message"""
+        if message["diffType"] == "add":
+            return ADDED_COLOUR
 
-        return colour
+        return REMOVED_COLOUR
@@ -0,0 +1,249 @@
+###############################################################################
+# @file pyVerifGUI/gui/models/table.py
+# @package pyVerifGUI.gui.models.table
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Compact, column-oriented storage of messages
+##############################################################################
+
+from array import array
+from typing import Any, Hashable, Iterator, List, Optional, Sequence
+
+from pyVerifGUI.gui.models import MessageType, MessageListType
+
+# Text hashes are kept to 64 bits. Longer (older, MD5-based) hashes are
+# folded to their low 64 bits, so they still match.
+HASH_MASK = (1 << 64) - 1
+
+# Bits of the flags column
+LEGITIMATE = 1
+ERROR = 2
+
+
+def fold_hash(text_hash: int) -> int:
+    """Reduces a text hash to the 64 bits that are stored and compared"""
+    return text_hash & HASH_MASK
+
+
+class MessageRow:
+    """Lightweight, dict-like view of one message in a MessageTable.
+
+    Each row has exactly one view, so views can be used as the identity of
+    a message, like the dicts they replace.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "MessageTable", index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self.table.value(self.index, key)
+
+    def __setitem__(self, key: str, value: Any):
+        self.table.setValue(self.index, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.table.fields or key in self.table.extra.get(
+            self.index, {})
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __repr__(self) -> str:
+        return f"MessageRow({dict(self.items())})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return self.table.fields + list(self.table.extra.get(self.index, ()))
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def update(self, values: MessageType):
+        for key, value in values.items():
+            self[key] = value
+
+
+class MessageTable:
+    """Messages stored column by column.
+
+    File and type strings are interned, so each distinct path or type is only
+    stored once. Rows, columns, flags, hashes and ids are packed in arrays.
+    Fields without a column are kept per row in "extra", which is expected to
+    be empty for most messages.
+
+    Indexing the table gives MessageRow views, created on first access.
+    """
+    fields = [
+        "id", "file", "row", "column", "text", "text_hash", "type", "waiver",
+        "legitimate", "error"
+    ]
+
+    def __init__(self):
+        self.strings = []
+        self.string_index = {}
+        self.ids = array("q")
+        self.files = array("I")
+        self.rows = array("i")
+        self.columns = array("i")
+        self.types = array("I")
+        self.flags = array("B")
+        self.text_hashes = array("Q")
+        self.texts = []
+        self.extra = {}
+        self.views = []
+
+    @classmethod
+    def fromMessages(cls, messages: MessageListType) -> "MessageTable":
+        """Builds a table from message dicts"""
+        table = cls()
+        for i, message in enumerate(messages):
+            extra = {
+                key: value
+                for key, value in message.items()
+                if key not in cls.fields and key != "comment"
+            }
+            table.append(message["file"], message["row"], message["column"],
+                         message["type"], message["text"],
+                         message["text_hash"], message.get("legitimate", False),
+                         message.get("error", False), message.get("id", i + 1),
+                         extra)
+
+        return table
+
+    def intern(self, string: str) -> int:
+        """Index of a string in the string table, adding it if needed"""
+        index = self.string_index.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self.string_index[string] = index
+
+        return index
+
+    def append(self, file: str, row: int, column: int, type_: str, text: str,
+               text_hash: int, legitimate: bool = False, error: bool = False,
+               id_: Optional[int] = None, extra: Optional[MessageType] = None):
+        """Adds a message to the end of the table"""
+        index = len(self.texts)
+        self.ids.append(index + 1 if id_ is None else id_)
+        self.files.append(self.intern(file))
+        self.rows.append(row)
+        self.columns.append(column)
+        self.types.append(self.intern(type_))
+        self.flags.append((LEGITIMATE if legitimate else 0)
+                          | (ERROR if error else 0))
+        self.text_hashes.append(fold_hash(text_hash))
+        self.texts.append(text)
+        self.views.append(None)
+        if extra:
+            self.extra[index] = dict(extra)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index: int) -> MessageRow:
+        view = self.views[index]
+        if view is None:
+            if index < 0:
+                index += len(self)
+            view = MessageRow(self, index)
+            self.views[index] = view
+
+        return view
+
+    def __iter__(self) -> Iterator[MessageRow]:
+        views = self.views
+        if None in views:
+            for i, view in enumerate(views):
+                if view is None:
+                    views[i] = MessageRow(self, i)
+
+        return iter(views)
+
+    def value(self, index: int, key: str) -> Any:
+        """Value of a field of a message"""
+        if key == "file":
+            return self.strings[self.files[index]]
+        elif key == "row":
+            return self.rows[index]
+        elif key == "text_hash":
+            return self.text_hashes[index]
+        elif key == "text":
+            return self.texts[index]
+        elif key == "type":
+            return self.strings[self.types[index]]
+        elif key == "column":
+            return self.columns[index]
+        elif key == "legitimate":
+            return bool(self.flags[index] & LEGITIMATE)
+        elif key == "error":
+            return bool(self.flags[index] & ERROR)
+        elif key == "waiver":
+            return False
+        elif key == "id":
+            return self.ids[index]
+
+        return self.extra.get(index, {})[key]
+
+    def setValue(self, index: int, key: str, value: Any):
+        """Changes a field of a message. Only flags and extra fields can change"""
+        if key == "legitimate":
+            if value:
+                self.flags[index] |= LEGITIMATE
+            else:
+                self.flags[index] &= ~LEGITIMATE
+        elif key == "error":
+            if value:
+                self.flags[index] |= ERROR
+            else:
+                self.flags[index] &= ~ERROR
+        elif key in self.fields:
+            raise KeyError(f"Message field '{key}' is read-only")
+        else:
+            self.extra.setdefault(index, {})[key] = value
+
+    def keyTuples(self, fields: Sequence[str]) -> List[Hashable]:
+        """Tuples of the given fields for every row, built column by column"""
+        columns = []
+        for field in fields:
+            if field == "file":
+                columns.append([self.strings[i] for i in self.files])
+            elif field == "type":
+                columns.append([self.strings[i] for i in self.types])
+            elif field == "row":
+                columns.append(self.rows)
+            elif field == "column":
+                columns.append(self.columns)
+            elif field == "text":
+                columns.append(self.texts)
+            elif field == "text_hash":
+                columns.append(self.text_hashes)
+            elif field == "id":
+                columns.append(self.ids)
+            elif field == "legitimate":
+                columns.append([bool(f & LEGITIMATE) for f in self.flags])
+            elif field == "error":
+                columns.append([bool(f & ERROR) for f in self.flags])
+            elif field == "waiver":
+                columns.append([False] * len(self))
+            else:
+                columns.append([
+                    self.extra.get(i, {}).get(field) for i in range(len(self))
+                ])
+
+        return list(zip(*columns))
@@ -0,0 +1,202 @@
+###############################################################################
+# @file pyVerifGUI/gui/models/waivers.py
+# @package pyVerifGUI.gui.models.waivers
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Hash indexing and pattern rules to match messages against waivers
+##############################################################################
+
+from typing import Callable, Hashable, Mapping, Optional, Sequence, Tuple
+from fnmatch import fnmatchcase
+from pathlib import Path
+import re
+
+from pyVerifGUI.gui.models import MessageType, MessageListType
+
+from .table import fold_hash
+
+KeyType = Tuple[str, int, int]
+
+# Fields a waiver rule can match on
+RULE_FIELDS = ("type", "file", "module", "text")
+
+
+def message_key(message: MessageType) -> KeyType:
+    """Returns the key a message and its waiver are matched on.
+
+    Hashes are folded to 64 bits, as that is all messages keep.
+    """
+    return (message["file"], message["row"], fold_hash(message["text_hash"]))
+
+
+class WaiverIndex:
+    """Hash index of messages and waivers, keyed on the fields they match on.
+
+    Every lookup is a dictionary access, so classifying a message, finding its
+    waiver or checking whether a waiver is orphaned is O(1).
+    """
+    def __init__(self, key: Callable[[MessageType], Hashable] = message_key):
+        self.key = key
+        self.messages = {}
+        self.waivers = {}
+
+    def build(self, messages: MessageListType, waivers: MessageListType):
+        """(Re)builds the index from scratch"""
+        self.messages = {}
+        self.waivers = {}
+        for message in messages:
+            self.messages.setdefault(self.key(message), []).append(message)
+        for waiver in waivers:
+            self.waivers.setdefault(self.key(waiver), []).append(waiver)
+
+    def findWaiver(self, message: MessageType) -> Optional[MessageType]:
+        """Returns the first waiver matching a message, or None"""
+        waivers = self.waivers.get(self.key(message))
+        if waivers:
+            return waivers[0]
+
+        return None
+
+    def isWaived(self, message: MessageType) -> bool:
+        """Returns True if any waiver matches the message"""
+        return self.key(message) in self.waivers
+
+    def isOrphan(self, waiver: MessageType) -> bool:
+        """Returns True if a waiver does not match any message"""
+        return self.key(waiver) not in self.messages
+
+    def matchingMessages(self, waiver: MessageType) -> MessageListType:
+        """Returns all messages matched by a waiver"""
+        return self.messages.get(self.key(waiver), [])
+
+    def addMessage(self, message: MessageType) -> MessageListType:
+        """Indexes a new message.
+
+        Returns the waivers which did not match any message before this one.
+        """
+        messages = self.messages.setdefault(self.key(message), [])
+        messages.append(message)
+        if len(messages) > 1:
+            return []
+
+        return self.waivers.get(self.key(message), [])
+
+    def addWaiver(self, waiver: MessageType) -> MessageListType:
+        """Indexes a new waiver.
+
+        Returns the messages which were not waived before this waiver.
+        """
+        waivers = self.waivers.setdefault(self.key(waiver), [])
+        waivers.append(waiver)
+        if len(waivers) > 1:
+            # Another waiver already covers these messages
+            return []
+
+        return self.matchingMessages(waiver)
+
+    def removeWaiver(self, waiver: MessageType) -> MessageListType:
+        """Removes a waiver from the index.
+
+        Returns the messages which are no longer waived by any waiver.
+        """
+        key = self.key(waiver)
+        waivers = self.waivers.get(key, [])
+        for i, existing in enumerate(waivers):
+            if existing is waiver:
+                del waivers[i]
+                break
+        else:
+            return []
+
+        if waivers:
+            return []
+
+        del self.waivers[key]
+        return self.messages.get(key, [])
+
+
+class RuleMatcher:
+    """Matches messages against pattern-based waiver rules.
+
+    A rule is a waiver-like mapping with any of these optional patterns:
+
+    - type: glob on the lint type, e.g. "UNUSED*"
+    - file: glob on the message's file path, e.g. "*/third_party/*"
+    - module: glob on the name of any module defined in the message's file
+    - text: regular expression searched for in the message text
+
+    A message is matched by the first rule whose patterns all match. The
+    type, file and module patterns only depend on a message's (file, type)
+    pair, so candidate rules are resolved once per unique pair and cached.
+    Classifying messages is therefore linear in the number of messages,
+    with only the text expressions of the candidate rules left to check.
+    """
+    def __init__(self, rules: MessageListType = (),
+                 file_modules: Optional[Mapping[str, Sequence[str]]] = None):
+        self.rules = []
+        self.errors = []
+        self.text_patterns = []
+        self.file_modules = {}
+        self.candidates = {}
+
+        for path, modules in (file_modules or {}).items():
+            self.file_modules[Path(path).as_posix()] = modules
+
+        for rule in rules:
+            if not any(rule.get(field) for field in RULE_FIELDS):
+                self.errors.append(f"Rule has no patterns: {dict(rule)}")
+                continue
+
+            try:
+                text = re.compile(rule["text"]) if rule.get("text") else None
+            except re.error as exc:
+                self.errors.append(
+                    f"Invalid text expression '{rule['text']}': {exc}")
+                continue
+
+            self.rules.append(rule)
+            self.text_patterns.append(text)
+
+    def __len__(self):
+        return len(self.rules)
+
+    @property
+    def uses_modules(self) -> bool:
+        """True if any rule needs to know which modules are in a file"""
+        return any(rule.get("module") for rule in self.rules)
+
+    def _candidates(self, file: str, lint_type: str) -> Sequence[int]:
+        """Indices of the rules whose type, file and module patterns match"""
+        candidates = self.candidates.get((file, lint_type))
+        if candidates is not None:
+            return candidates
+
+        modules = self.file_modules.get(Path(file).as_posix(), [])
+        candidates = []
+        for i, rule in enumerate(self.rules):
+            if rule.get("type") and not fnmatchcase(lint_type, rule["type"]):
+                continue
+            if rule.get("file") and not fnmatchcase(file, rule["file"]):
+                continue
+            if rule.get("module") and not any(
+                    fnmatchcase(module, rule["module"])
+                    for module in modules):
+                continue
+            candidates.append(i)
+
+        self.candidates[(file, lint_type)] = candidates
+        return candidates
+
+    def match(self, message: MessageType) -> Optional[MessageType]:
+        """Returns the first rule matching a message, or None"""
+        for i in self._candidates(message["file"], message["type"]):
+            text = self.text_patterns[i]
+            if text is None or text.search(message["text"]):
+                return self.rules[i]
+
+        return None
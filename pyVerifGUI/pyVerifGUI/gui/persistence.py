@@ -0,0 +1,175 @@
+###############################################################################
+# @file pyVerifGUI/gui/persistence.py
+# @package pyVerifGUI.gui.persistence
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Debounced background saving of message and waiver edits
+##############################################################################
+
+from qtpy import QtCore
+from pathlib import Path
+from typing import Optional
+import traceback
+
+from pyVerifGUI.db import MessageStore
+from pyVerifGUI.gui.models import MessageType, MessageListType
+
+
+class PendingEdits:
+    """A batch of edits to save to a message store"""
+    def __init__(self, store_path: Path, waivers_path: Path,
+                 generation: Optional[str]):
+        self.store_path = store_path
+        self.waivers_path = waivers_path
+        self.generation = generation
+        # Message id -> latest value, so repeated edits coalesce
+        self.legitimate = {}
+        self.comments = {}
+        # Snapshot of every waiver, if they need saving
+        self.waivers = None
+
+    def __bool__(self) -> bool:
+        return bool(self.legitimate or self.comments
+                    or self.waivers is not None)
+
+    def apply(self):
+        """Writes the edits. Waivers are also exported for committing."""
+        store = MessageStore(self.store_path)
+        try:
+            if self.legitimate or self.comments:
+                if not store.updateMessages(self.generation, self.legitimate,
+                                            self.comments):
+                    raise RuntimeError(
+                        f"Messages in {self.store_path} were replaced, "
+                        "discarding edits made to the previous messages")
+
+            if self.waivers is not None:
+                store.replaceWaivers(self.waivers)
+                store.exportWaivers(self.waivers_path)
+        finally:
+            store.close()
+
+
+class PersistenceSignals(QtCore.QObject):
+    """Signals for a PersistenceJob, as QRunnable is not a QObject"""
+    error = QtCore.Signal(str)
+
+
+class PersistenceJob(QtCore.QRunnable):
+    """Applies a batch of edits in a QThreadPool"""
+    def __init__(self, edits: PendingEdits, signals: PersistenceSignals):
+        super().__init__()
+        self.edits = edits
+        self.signals = signals
+
+    def run(self):
+        try:
+            self.edits.apply()
+        except Exception as exc:
+            self.signals.error.emit(
+                f"Error saving edits: {exc}\n{traceback.format_exc()}")
+
+
+class PersistenceService(QtCore.QObject):
+    """Saves edits to the messages and waivers of a build.
+
+    Edits are recorded as they happen, and saved once no new edit has come in
+    for a short delay, so bursts of edits are written once. Saving happens in
+    a single background thread, so writes stay ordered and the UI never waits
+    on the disk, except when flushing before closing or switching builds.
+    """
+
+    # Emitted with a description of any failure to save
+    error = QtCore.Signal(str)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None,
+                 delay: int = 1000):
+        super().__init__(parent)
+        self.store_path = None
+        self.waivers_path = None
+        self.generation = None
+        self.pending = None
+        self.waivers = None
+        # Comments saved this session, so reads don't race the writer
+        self.comments = {}
+
+        self.signals = PersistenceSignals()
+        self.signals.error.connect(self.error)
+
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.save)
+
+    def attach(self, store: MessageStore, waivers_path: Path):
+        """Starts tracking edits for a new store, saving any previous edits"""
+        self.flush()
+        self.store_path = store.path
+        self.waivers_path = waivers_path
+        self.generation = store.generation
+        self.comments = {}
+
+    def _edits(self) -> PendingEdits:
+        """The batch of edits currently being recorded"""
+        if self.store_path is None:
+            raise RuntimeError("No message store to save edits to")
+        if self.pending is None:
+            self.pending = PendingEdits(self.store_path, self.waivers_path,
+                                        self.generation)
+
+        # (Re)start the delay
+        self.timer.start()
+        return self.pending
+
+    def setLegitimate(self, message: MessageType):
+        """Records a change to the legitimate flag of a message"""
+        self._edits().legitimate[message["id"]] = message["legitimate"]
+
+    def setComment(self, message: MessageType, comment: str):
+        """Records a new comment on a message"""
+        self._edits().comments[message["id"]] = comment
+        self.comments[message["id"]] = comment
+
+    def getComment(self, message: MessageType) -> Optional[str]:
+        """Returns a comment edited this session, or None"""
+        return self.comments.get(message["id"])
+
+    def saveWaivers(self, waivers: MessageListType):
+        """Records that the list of waivers has changed.
+
+        The list is only copied when saving, however many edits were made.
+        """
+        self._edits()
+        self.waivers = waivers
+
+    def isDirty(self) -> bool:
+        """Whether there are edits that are not yet on disk"""
+        return self.pending is not None or self.pool.activeThreadCount() > 0
+
+    def save(self):
+        """Starts saving all recorded edits in the background"""
+        self.timer.stop()
+        if self.pending is None:
+            return
+
+        edits = self.pending
+        self.pending = None
+        if self.waivers is not None:
+            # Snapshot on this thread, the UI keeps editing the originals
+            edits.waivers = [dict(waiver) for waiver in self.waivers]
+            self.waivers = None
+
+        self.pool.start(PersistenceJob(edits, self.signals))
+
+    def flush(self):
+        """Saves all recorded edits, and waits for them to be written"""
+        self.save()
+        self.pool.waitForDone()
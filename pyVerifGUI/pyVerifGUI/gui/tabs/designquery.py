@@ -0,0 +1,168 @@
+###############################################################################
+# @file pyVerifGUI/gui/tabs/designquery.py
+# @package pyVerifGUI.gui.tabs.designquery
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Definition of Design Query tab
+##############################################################################
+
+from qtpy import QtWidgets
+from typing import List, Sequence, Tuple
+import time
+
+from pyVerifGUI.gui.base_tab import Tab, is_tab
+from pyVerifGUI.db.design import DesignStore, design_store_path
+from pyVerifGUI.tasks.parse import ParseTask
+
+# Columns shown for each kind of query
+QUERY_COLUMNS = {
+    "Modules": ["Module", "File"],
+    "Ports": ["Module", "Port", "Direction", "Type", "Dimension", "Width"],
+    "Parameters": ["Module", "Parameter", "Dimension", "Value"],
+    "Instances": ["Parent", "Module", "Instance"],
+}
+
+DIRECTIONS = ["Any", "input", "output", "inout"]
+
+
+@is_tab
+class DesignQueryTab(Tab):
+    """Searches the modules, ports, parameters and instances of the design"""
+    _name = "design_query"
+    _display = "Design Query"
+    _placement = 1
+
+    def _post_init(self):
+        self.layout = QtWidgets.QVBoxLayout(self)
+        self.layout.setObjectName("layout")
+
+        # Query form
+        self.query_layout = QtWidgets.QHBoxLayout()
+        self.query_kind = QtWidgets.QComboBox(self)
+        self.query_kind.addItems(list(QUERY_COLUMNS))
+        self.query_kind.currentTextChanged.connect(self.updateForm)
+        self.module_text = QtWidgets.QLineEdit(self)
+        self.module_text.setPlaceholderText("Module (e.g. *fifo*)")
+        self.module_text.returnPressed.connect(self.runQuery)
+        self.name_text = QtWidgets.QLineEdit(self)
+        self.name_text.setPlaceholderText("Name (e.g. axi_*)")
+        self.name_text.returnPressed.connect(self.runQuery)
+        self.direction = QtWidgets.QComboBox(self)
+        self.direction.addItems(DIRECTIONS)
+        self.query_button = QtWidgets.QPushButton("Query", self)
+        self.query_button.clicked.connect(self.runQuery)
+        self.query_layout.addWidget(self.query_kind)
+        self.query_layout.addWidget(self.module_text)
+        self.query_layout.addWidget(self.name_text)
+        self.query_layout.addWidget(self.direction)
+        self.query_layout.addWidget(self.query_button)
+
+        # Results
+        self.results = QtWidgets.QTableWidget(self)
+        self.results.setObjectName("results")
+        self.results.setEditTriggers(self.results.NoEditTriggers)
+        self.results.setSortingEnabled(True)
+        self.status_label = QtWidgets.QLabel("", self)
+
+        self.layout.addLayout(self.query_layout)
+        self.layout.addWidget(self.results)
+        self.layout.addWidget(self.status_label)
+
+        self.store = None
+        # Build and parse the store was opened for
+        self.last_update = None
+        self.updateForm(self.query_kind.currentText())
+
+    def _verify(self) -> Tuple[bool, str]:
+        if self.config.config.get("working_dir") is None:
+            return (False, "Configuration does not have working directory!")
+        if self.config.config.get("rtl_dirs") is None:
+            return (False, "No sources specified")
+
+        return (True, "")
+
+    def update(self):
+        """Opens the design database of the current build once it is parsed"""
+        status = None
+        if self.config.build is not None:
+            status = self.config.status.get(ParseTask._name)
+
+        if not status or not status["finished"]:
+            self.closeStore()
+            self.last_update = None
+            return
+
+        update = (self.config.build, status["time"])
+        if update == self.last_update:
+            return
+
+        self.last_update = update
+        self.closeStore()
+        path = design_store_path(self.config.build_path /
+                                 f"sv_{self.config.top_module}")
+        if path.exists():
+            self.store = DesignStore(path)
+            self.status_label.setText("")
+        else:
+            self.status_label.setText("Design has not been parsed!")
+
+    def closeStore(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def flush(self):
+        self.closeStore()
+
+    def updateForm(self, kind: str):
+        """Only offers a direction for port queries"""
+        self.direction.setEnabled(kind == "Ports")
+        self.name_text.setEnabled(kind != "Modules")
+
+    def runQuery(self):
+        """Shows the results of the query in the form"""
+        if self.store is None:
+            self.status_label.setText("Design has not been parsed!")
+            return
+
+        kind = self.query_kind.currentText()
+        module = self.module_text.text().strip() or "*"
+        name = self.name_text.text().strip() or "*"
+        direction = self.direction.currentText()
+
+        start = time.perf_counter()
+        if kind == "Modules":
+            rows = self.store.modules(module)
+        elif kind == "Ports":
+            rows = self.store.ports(module, name,
+                                    None if direction == "Any" else direction)
+        elif kind == "Parameters":
+            rows = self.store.params(module, name)
+        else:
+            rows = self.store.instances(module, "*", name)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.showResults(QUERY_COLUMNS[kind], rows)
+        self.status_label.setText(
+            f"{len(rows)} results in {elapsed:.1f} ms")
+
+    def showResults(self, columns: List[str], rows: List[Sequence]):
+        # Sorting while filling would move rows as they are filled in
+        self.results.setSortingEnabled(False)
+        self.results.clear()
+        self.results.setColumnCount(len(columns))
+        self.results.setHorizontalHeaderLabels(columns)
+        self.results.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                text = "" if value is None else str(value)
+                self.results.setItem(row, column,
+                                     QtWidgets.QTableWidgetItem(text))
+
+        self.results.resizeColumnsToContents()
+        self.results.setSortingEnabled(True)
@@ -12,14 +12,26 @@
 ##############################################################################
 
 from qtpy import QtWidgets, QtCore, QtGui
-from oyaml import safe_load
+from collections import OrderedDict
+from itertools import islice
 from typing import Tuple
 import time
 
 from pyVerifGUI.gui.models import ModuleTreeItem, ModuleTreeItemModel
 from pyVerifGUI.gui.base_tab import Tab, is_tab
+from pyVerifGUI.parsers.design_dag import DAG_FILE, DesignDag
+from pyVerifGUI.parsers.design_index import DesignIndex
+from pyVerifGUI.parsers.design_metrics import DesignMetrics
+from pyVerifGUI.parsers.sv_outputs import load_sv_yaml
 from pyVerifGUI.tasks.parse import ParseTask
 
+# Most instances listed for a search
+SEARCH_RESULTS = 200
+# Most modules kept rendered for the module info box
+MODULE_INFO_CACHE = 256
+# Modules listed in the report, largest first
+REPORT_MODULES = 20
+
 
 @is_tab
 class DesignViewTab(Tab):
@@ -45,6 +57,25 @@ class DesignViewTab(Tab):
         self.treeView.setSelectionBehavior(self.treeView.SelectItems)
         self.treeView.setSelectionMode(self.treeView.SingleSelection)
 
+        # Instance search
+        self.search_text = QtWidgets.QLineEdit(self)
+        self.search_text.setObjectName("search_text")
+        self.search_text.setPlaceholderText("Search modules...")
+        self.search_text.setClearButtonEnabled(True)
+        self.search_text.textChanged.connect(self.searchDesign)
+        self.search_results = QtWidgets.QListWidget(self)
+        self.search_results.setObjectName("search_results")
+        self.search_results.itemActivated.connect(self.jumpToInstance)
+        self.search_results.itemClicked.connect(self.jumpToInstance)
+        self.search_results.hide()
+
+        # Design hierarchy layout
+        self.tree_widget = QtWidgets.QWidget(self.splitter)
+        self.tree_layout = QtWidgets.QVBoxLayout(self.tree_widget)
+        self.tree_layout.addWidget(self.search_text)
+        self.tree_layout.addWidget(self.search_results)
+        self.tree_layout.addWidget(self.treeView)
+
         # Design info layout
         self.info_widget = QtWidgets.QWidget(self.splitter)
         self.info_layout = QtWidgets.QVBoxLayout(self.info_widget)
@@ -52,7 +83,7 @@ class DesignViewTab(Tab):
         self.info_layout.addWidget(self.textBrowser)
 
         # Layout organization
-        self.splitter.addWidget(self.treeView)
+        self.splitter.addWidget(self.tree_widget)
         self.splitter.addWidget(self.info_widget)
         self.layout.addWidget(self.splitter)
 
@@ -67,10 +98,16 @@ class DesignViewTab(Tab):
         self.addAction(self.copy_path_act)
 
         self.sv_files = None
-        self.sv_hierarchy = None
+        self.design_dag = None
+        self.design_index = None
+        self.design_metrics = None
         self.sv_interfaces = None
         self.sv_modules = None
         self.last_update = time.time()
+        # Time of the parse the design was loaded from
+        self.parse_time = None
+        # Rendered module info, by (module name, parse time)
+        self.module_info = OrderedDict()
 
     def _verify(self) -> Tuple[bool, str]:
         if self.config.config.get("working_dir") is None:
@@ -115,9 +152,10 @@ class DesignViewTab(Tab):
         else:
             self.last_update = time.time()
 
+        self.parse_time = self.config.status[ParseTask._name]["time"]
         if self.read_parsed():
             tree = ModuleTreeItem(self.config.build)
-            tree.build(self.sv_hierarchy[self.config.top_module]["tree"])
+            tree.buildFromDag(self.design_dag)
         else:
             tree = ModuleTreeItem("unknown")
             tree.build({"No parsed files found!": {}})
@@ -131,11 +169,44 @@ class DesignViewTab(Tab):
             selection_model.setCurrentIndex(
                 index, QtCore.QItemSelectionModel.SelectionFlag.Select)
 
+        self.searchDesign(self.search_text.text())
+
     def removeTree(self):
         """Slot for when there is no design loaded"""
         tree = ModuleTreeItem("blank")
         self.treeView.setModel(ModuleTreeItemModel(tree))
         self.textBrowser.setPlainText("")
+        self.search_results.clear()
+        self.search_results.hide()
+
+    def searchDesign(self, text: str):
+        """Lists the instances of modules matching the search text"""
+        self.search_results.clear()
+        if self.design_index is None or not text:
+            self.search_results.hide()
+            return
+
+        for name in self.design_index.search(text):
+            remaining = SEARCH_RESULTS - self.search_results.count()
+            if remaining <= 0:
+                break
+
+            for path in islice(self.design_index.instancePaths(name),
+                               remaining):
+                item = QtWidgets.QListWidgetItem(".".join(path))
+                item.setData(QtCore.Qt.UserRole, path)
+                self.search_results.addItem(item)
+
+        self.search_results.setVisible(self.search_results.count() > 0)
+
+    def jumpToInstance(self, item: QtWidgets.QListWidgetItem):
+        """Selects the instance of a search result in the hierarchy"""
+        model = self.treeView.model()
+        index = model.indexForPath(item.data(QtCore.Qt.UserRole))
+        if index.isValid():
+            self.treeView.scrollTo(index)
+            self.treeView.selectionModel().setCurrentIndex(
+                index, QtCore.QItemSelectionModel.SelectionFlag.ClearAndSelect)
 
     def updateInfo(self, current: QtCore.QItemSelection,
                    previous: QtCore.QItemSelection):
@@ -143,52 +214,66 @@ class DesignViewTab(Tab):
         del previous
         self.textBrowser.setPlainText(self.getModuleText(current))
 
-    def getHierarchy(self, model: ModuleTreeItemModel) -> str:
-        """Recursive function to find the hierarchical location of a certain item"""
-        parent = model.parent()
-        if parent != QtCore.QModelIndex():
-            return (self.getHierarchy(parent) +
-                    "." + model.internalPointer().name)
-
-        return model.internalPointer().name
+    def getHierarchy(self, model: QtCore.QModelIndex) -> str:
+        """Finds the hierarchical location of a certain item"""
+        return model.internalPointer().path()
 
     def prettyPrintModule(self, model: QtCore.QModelIndex) -> str:
         """Prints the information about a module in a nice way"""
-
-        module = self.sv_modules[model.internalPointer().name]
-        text = f"{module['name']}: {module['path']}\n\n"
-
+        header, body = self.renderModule(model.internalPointer().name)
         path = self.getHierarchy(model)
-        text += "Hierarchical Path: " + path + "\n\n"
-
-        text += "Input ports:\n"
-        for signal in module['ports']:
-            if signal[0] == "input":
-                text += f"  {signal[4]} {signal[3]}\n"
-        text += "\n"
-
-        text += "Output ports:\n"
-        for signal in module['ports']:
-            if signal[0] == "output":
-                text += f"  {signal[4]} {signal[3]}\n"
-        text += "\n"
+        return f"{header}Hierarchical Path: {path}\n\n{body}"
 
-        text += "Modules:\n"
-        for submodule in module['submodules'].keys():
-            text += f"  {submodule}"
+    def renderModule(self, name: str) -> Tuple[str, str]:
+        """Text describing a module, before and after its hierarchical path.
 
-        return text
+        Kept for the most recently shown modules of the current parse.
+        """
+        key = (name, self.parse_time)
+        if key in self.module_info:
+            self.module_info.move_to_end(key)
+            return self.module_info[key]
+
+        module = self.sv_modules[name]
+        header = f"{module['name']}: {module['path']}\n\n"
+
+        lines = ["Input ports:"]
+        lines.extend(f"  {signal[4]} {signal[3]}" for signal in module['ports']
+                     if signal[0] == "input")
+        lines.extend(["", "Output ports:"])
+        lines.extend(f"  {signal[4]} {signal[3]}" for signal in module['ports']
+                     if signal[0] == "output")
+        lines.extend(["", "Modules:"])
+        lines.extend(f"  {submodule}" for submodule in module['submodules'])
+
+        metrics = self.design_metrics.module(name)
+        if metrics is not None:
+            lines.extend([
+                "",
+                "Metrics:",
+                f"  Instances: {metrics.instances}",
+                f"  Subtree size: {metrics.subtree_size}",
+                f"  Depth: {metrics.depth}",
+                f"  Fan-in: {metrics.fan_in}",
+                f"  Fan-out: {metrics.fan_out}",
+                f"  Files: {metrics.files}",
+            ])
+
+        self.module_info[key] = (header, "\n".join(lines))
+        if len(self.module_info) > MODULE_INFO_CACHE:
+            self.module_info.popitem(last=False)
+
+        return self.module_info[key]
 
     def getModuleText(self, model: QtCore.QModelIndex) -> str:
         """Gets the text to display in the module info box"""
-        try:
-            for key in self.sv_modules.keys():
-                if key == model.internalPointer().name:
-                    return self.prettyPrintModule(model)
-        except AttributeError:
+        if self.design_index is None:
             return "Design has not been parsed!"
 
-        return "Module not found!"
+        if self.design_index.definition(model.internalPointer().name) is None:
+            return "Module not found!"
+
+        return self.prettyPrintModule(model)
 
     def read_parsed(self) -> bool:
         """Read in YAML from parser
@@ -197,19 +282,49 @@ class DesignViewTab(Tab):
         """
         sv_parsed = f"sv_{self.config.top_module}"
         try:
-            self.sv_hierarchy = safe_load(
-                open(self.config.build_path / sv_parsed / "sv_hierarchy.yaml"))
-            self.sv_files = safe_load(
-                open(self.config.build_path / sv_parsed / "sv_files.yaml"))
-            self.sv_modules = safe_load(
-                open(self.config.build_path / sv_parsed / "sv_modules.yaml"))
-            self.sv_interfaces = safe_load(
-                open(self.config.build_path / sv_parsed /
-                     "sv_interfaces.yaml"))
+            parse_path = self.config.build_path / sv_parsed
+            if (parse_path / DAG_FILE).exists():
+                self.design_dag = DesignDag.load(parse_path / DAG_FILE)
+            else:
+                # Parsed before the graph was saved
+                hierarchy = load_sv_yaml(parse_path / "sv_hierarchy.yaml")
+                top = self.config.top_module
+                self.design_dag = DesignDag.fromTree(top,
+                                                     hierarchy[top]["tree"])
+            self.sv_files = load_sv_yaml(parse_path / "sv_files.yaml")
+            self.sv_modules = load_sv_yaml(parse_path / "sv_modules.yaml")
+            self.sv_interfaces = load_sv_yaml(parse_path /
+                                              "sv_interfaces.yaml")
+            self.design_index = DesignIndex(self.design_dag, self.sv_modules)
+            self.design_metrics = DesignMetrics(self.design_index)
             return True
         except FileNotFoundError:
-            self.sv_hierarchy = None
+            self.design_dag = None
+            self.design_index = None
+            self.design_metrics = None
             self.sv_files = None
             self.sv_modules = None
             self.sv_interfaces = None
             return False
+
+    def _report(self) -> str:
+        """Summary of the design and its largest modules"""
+        if self.design_metrics is None and not self.read_parsed():
+            return "Design has not been parsed!"
+
+        top = self.design_metrics.module(self.design_dag.top)
+        text = f"""- Modules: {len(self.design_metrics.metrics)}
+- Instances: {top.subtree_size}
+- Hierarchy depth: {top.depth}
+- Source files: {top.files}
+
+| Module | Instances | Subtree size | Depth | Fan-in | Fan-out | Files |
+|---|---|---|---|---|---|---|
+"""
+        rows = [
+            f"| {metrics.name} | {metrics.instances} | {metrics.subtree_size} "
+            f"| {metrics.depth} | {metrics.fan_in} | {metrics.fan_out} "
+            f"| {metrics.files} |"
+            for metrics in self.design_metrics.largest(REPORT_MODULES)
+        ]
+        return text + "\n".join(rows)
@@ -18,7 +18,9 @@ from datetime import date
 from typing import Tuple
 import shutil
 
-from pyVerifGUI.gui.models import LintMessageModel, DiffLintMessageModel, MessageType
+from pyVerifGUI.gui.models import LintMessageModel, DiffLintMessageModel, MessageType, MessageListType
+from pyVerifGUI.gui.models.waivers import RuleMatcher
+from pyVerifGUI.parsers.sv_outputs import load_sv_yaml
 from pyVerifGUI.gui.base_tab import is_tab
 from pyVerifGUI.tasks.lint import LintTask
 
@@ -102,6 +104,24 @@ class LintViewTab(MessageViewTab):
         self.dialog.text_text.setText(waiver["text"])
         self.dialog.text_hash = waiver["text_hash"]
 
+    def buildRuleMatcher(self, rules: MessageListType) -> RuleMatcher:
+        """Gives module-based rules the modules defined in each file"""
+        matcher = RuleMatcher(rules)
+        if not matcher.uses_modules:
+            return matcher
+
+        modules_path = (self.config.build_path / f"sv_{self.config.top_module}"
+                        / "sv_modules.yaml")
+        if not modules_path.exists():
+            self.log("Waiver rules match on modules, but the design has not been parsed")
+            return matcher
+
+        file_modules = {}
+        for name, module in (load_sv_yaml(modules_path) or {}).items():
+            file_modules.setdefault(module["path"], []).append(name)
+
+        return RuleMatcher(rules, file_modules)
+
     def generateSummary(self) -> str:
         """Generates the summary text"""
         model = self.message_table.model()
@@ -130,8 +150,10 @@ class LintViewTab(MessageViewTab):
         if count > 0:
             waived_count = len(model.waived_messages)
             unwaived_count = len(model.unwaived_messages)
-            waiver_count = len(model.waivers)
-            waiver_diff = waiver_count - waived_count
+            waiver_diff = len(model.orphans)
+            rule_waived_count = len(model.rule_matches)
+            matched_rules = {id(rule) for rule in model.rule_matches.values()}
+            unused_rule_count = len(model.rules) - len(matched_rules)
             waived_percent = 100 * (waived_count / count)
             unwaived_percent = 100 * (unwaived_count / count)
 
@@ -148,6 +170,10 @@ class LintViewTab(MessageViewTab):
                 text += f"{waiver_diff} waivers that do not apply!\n\n"
             elif waiver_diff == 1:
                 text += "1 waiver that does not apply!\n\n"
+            if len(model.rules) > 0:
+                text += f"{rule_waived_count} matched by {len(matched_rules)} / {len(model.rules)} waiver rules\n\n"
+            if unused_rule_count > 0:
+                text += f"{unused_rule_count} waiver rules that do not apply!\n\n"
             text += f"{file_count} files linted\n\n"
 
         return text
@@ -12,18 +12,23 @@
 ##############################################################################
 
 from qtpy import QtWidgets, QtCore, QtGui
-from oyaml import safe_load, dump
+from oyaml import safe_load
 import shutil
 import copy
-import time
 from typing import Sequence
 
+from pyVerifGUI.db import open_store
 from pyVerifGUI.gui.editor import Editor
 from pyVerifGUI.gui.models import MessageType, MessageListType
 from pyVerifGUI.gui.models.message import Messages
+from pyVerifGUI.gui.models.waivers import RuleMatcher
 from pyVerifGUI.gui.base_tab import Tab
+from pyVerifGUI.gui.persistence import PersistenceService
 from pyVerifGUI.tasks.parse import ParseTask
 
+# Milliseconds between updates of the summary while messages stream in
+STREAMING_SUMMARY_INTERVAL = 250
+
 class MessageViewTab(Tab):
     """Base class to view messages with associated waivers"""
 
@@ -38,11 +43,24 @@ class MessageViewTab(Tab):
         # Prevents us from updating selection when it hasn't changed
         self.old_selection = "all"
         # Prevents us from updating our models when they haven't changed
-        self.last_model_update = time.time()
+        self.last_model_update = None
         self.dialog = None
         self.old_waiver = None
         self.waiver_type = ""
         self.status_name = ""
+        # Storage for the messages and waivers of the current build
+        self.store = None
+        # Whether messages are being shown as the task finds them
+        self.streaming = False
+        # Edits are saved to the store in the background
+        self.persistence = PersistenceService(self)
+        self.persistence.error.connect(self.log)
+        self.config.buildChanged.connect(self.persistence.flush)
+        # The streaming summary is rendered on a timer, not for every batch
+        self.summary_timer = QtCore.QTimer(self)
+        self.summary_timer.setSingleShot(True)
+        self.summary_timer.setInterval(STREAMING_SUMMARY_INTERVAL)
+        self.summary_timer.timeout.connect(self.updateStreamingSummary)
 
         self.layout = QtWidgets.QVBoxLayout(self)
         self.layout.setObjectName("layout")
@@ -255,9 +273,7 @@ class MessageViewTab(Tab):
         self._view_full_filenames = view
         model = self.message_table.model()
         if model is not None:
-            model.beginResetModel()
             model.view_full_filenames = view
-            model.endResetModel()
 
     def showEditor(self):
         """Switch extra display tabs to show editor to user."""
@@ -315,23 +331,6 @@ class MessageViewTab(Tab):
         """Required to implement in subclass"""
         raise NotImplementedError
 
-    def dumpMessages(self, model: Messages):
-        """Save any modifications to messages"""
-        dump(
-            model.all_messages.messages,
-            open(self.config.build_path / f"{self.waiver_type}_messages.yaml",
-                 "w"))
-
-    def dumpWaivers(self, model: Messages):
-        """Write list of waivers to file"""
-        if self.waiver_type == "":
-            raise NotImplementedError
-
-        dump(
-            model.waivers.messages,
-            open(self.config.build_path / f"{self.waiver_type}_waivers.yaml",
-                 "w"))
-
     def buildAddDialog(self, message: MessageType):
         """Required to implement in subclass
 
@@ -347,11 +346,14 @@ class MessageViewTab(Tab):
         if selection_model.hasSelection():
             message = selection_model.selection().indexes()[0].internalPointer(
             )
+            if self.streaming:
+                self.log("Messages can be marked legitimate once the task finishes")
+                return
             if self.checkIfMessage(message):
                 # toggles legitimate status
-                message.update({"legitimate": not message["legitimate"]})
-                self.dumpMessages(self.message_table.model())
-                self.modelUpdate()
+                model = self.message_table.model()
+                model.setLegitimate(message, not message["legitimate"])
+                self.persistence.setLegitimate(message)
 
     def addOrEditWaiver(self, checked=False):
         """Common handler for dealing with adding or editing waivers for a message"""
@@ -408,12 +410,16 @@ class MessageViewTab(Tab):
         # Check if we have multiple selections, if we do, then manage adding waivers properly
         rows_selected = self.message_table.selectionModel().selectedRows()
         if len(rows_selected) > 1:
+            waivers = []
+            waived_keys = set()
             for row in rows_selected:
                 message = row.internalPointer()
                 # Check if message already has a waiver
-                if model.findWaiver(message) is not None:
+                key = model.messageKey(message)
+                if model.findWaiver(message) is not None or key in waived_keys:
                     # message has a waiver, skip it
                     continue
+                waived_keys.add(key)
 
                 ## Make a copy of the waiver to edit
                 # These fields are the fields matched for messages/waivers,
@@ -422,13 +428,16 @@ class MessageViewTab(Tab):
                 waiver_["file"] = message["file"]
                 waiver_["row"] = message["row"]
                 waiver_["text_hash"] = message["text_hash"]
+                waiver_["type"] = message["type"]
+                waiver_["text"] = message["text"]
 
-                model.addWaiver(waiver_)
+                waivers.append(waiver_)
+
+            model.addWaivers(waivers)
         else:
             model.addWaiver(waiver)
 
-        # Dump waivers to disk
-        self.dumpWaivers(model)
+        self.persistence.saveWaivers(model.waivers)
         self.viewUpdate()
         self.dialog.finished.disconnect()
 
@@ -470,28 +479,58 @@ class MessageViewTab(Tab):
 
         model = self.message_table.model()
         model.updateWaiver(self.old_waiver, waiver)
-        self.dumpWaivers(model)
+        self.persistence.saveWaivers(model.waivers)
         self.viewUpdate()
         self.dialog.finished.disconnect()
 
+    def getSelectedWaivers(self) -> MessageListType:
+        """Gets the waivers of every selected row.
+
+        Selected waivers are used directly, selected messages contribute
+        the waiver that matches them, if any.
+        """
+        model = self.message_table.model()
+        waivers = []
+        seen = set()
+        for row in self.message_table.selectionModel().selectedRows():
+            item = row.internalPointer()
+            if self.checkIfMessage(item):
+                item = model.findWaiver(item)
+            if item is not None and id(item) not in seen:
+                seen.add(id(item))
+                waivers.append(item)
+
+        return waivers
+
     def waiverRemove(self):
         """Called when removing waiver. Generic enough to be implemented here"""
         waiver = self.getMessageSelection()
         # checkIfMessage should return false if it is a waiver
-        if waiver is None or self.checkIfMessage(waiver):
+        if waiver is None:
+            self.no_waiver_dialog.exec_()
+            return
+
+        waivers = self.getSelectedWaivers()
+        if len(waivers) == 0:
             self.no_waiver_dialog.exec_()
             return
 
         msg = QtWidgets.QMessageBox()
-        msg.setText("Confirm removing waiver.")
-        msg.setInformativeText(f"In {waiver['file']}, on line {waiver['row']}")
+        if len(waivers) == 1:
+            msg.setText("Confirm removing waiver.")
+            msg.setInformativeText(
+                f"In {waivers[0]['file']}, on line {waivers[0]['row']}")
+        else:
+            msg.setText(f"Confirm removing {len(waivers)} waivers.")
         msg.setStandardButtons(QtWidgets.QMessageBox.Ok
                                | QtWidgets.QMessageBox.Cancel)
         msg.setDefaultButton(QtWidgets.QMessageBox.Cancel)
+        if msg.exec_() != QtWidgets.QMessageBox.Ok:
+            return
 
         model = self.message_table.model()
-        model.removeWaiver(waiver)
-        self.dumpWaivers(model)
+        model.removeWaivers(waivers)
+        self.persistence.saveWaivers(model.waivers)
         self.viewUpdate()
 
     def editComment(self):
@@ -499,13 +538,16 @@ class MessageViewTab(Tab):
         message = self.getMessageSelection()
         if message is None:
             return
+        if self.streaming:
+            self.log("Messages can be commented on once the task finishes")
+            return
 
-        self.edit_comment_dialog.comment.setText(message["comment"])
+        self.edit_comment_dialog.comment.setText(self.getComment(message))
 
         ok = self.edit_comment_dialog.exec_()
         if ok:
-            message["comment"] = self.edit_comment_dialog.comment.toPlainText()
-            self.dumpMessages(self.message_table.model())
+            self.persistence.setComment(
+                message, self.edit_comment_dialog.comment.toPlainText())
             self.displayMessageDetails()
 
     def onSelection(self, current: QtCore.QItemSelection,
@@ -542,14 +584,17 @@ class MessageViewTab(Tab):
 
         # Update values in waiver
         waiver = selection_model.currentIndex().internalPointer()
-        waiver.update({
+        new_waiver = dict(waiver)
+        new_waiver.update({
             "row": message["row"],
             "text_hash": message["text_hash"],
         })
 
         # Implement changes
-        self.dumpWaivers(self.message_table.model())
-        self.modelUpdate()
+        model = self.message_table.model()
+        model.updateWaiver(waiver, new_waiver)
+        self.persistence.saveWaivers(model.waivers)
+        self.viewUpdate()
 
     def onFilterChange(self, checked=False):
         """Slot for handling updates to message view filters"""
@@ -606,7 +651,7 @@ class MessageViewTab(Tab):
 
 {message['type']}: {message['text']}
 
-Comment: {message['comment']}
+Comment: {self.getComment(message)}
 """
 
     def waiverDetails(self, waiver: MessageType) -> str:
@@ -619,6 +664,19 @@ Comment: {message['comment']}
 {waiver['type']}: {waiver['text']}
 
 Waiving reason: {waiver['reason']}
+"""
+
+    def ruleDetails(self, rule: MessageType) -> str:
+        """Returns text to display about a waiver rule"""
+        patterns = ", ".join(f"{field} `{rule[field]}`"
+                             for field in ("type", "file", "module", "text")
+                             if rule.get(field))
+        return f"""
+### Waiver Rule
+
+Matches {patterns}, waived on {rule.get('date', '')}.
+
+Waiving reason: {rule.get('reason', '')}
 """
 
     def onLintSelectionUpdate(self, selected: QtCore.QItemSelection,
@@ -638,8 +696,11 @@ Waiving reason: {waiver['reason']}
             if self.checkIfMessage(message):
                 text = self.messageDetails(message)
                 waiver = self.message_table.model().findWaiver(message)
+                rule = self.message_table.model().findRule(message)
                 if waiver is not None:
                     text += self.waiverDetails(waiver)
+                elif rule is not None:
+                    text += self.ruleDetails(rule)
             else:
                 text = self.waiverDetails(message)
         else:
@@ -652,8 +713,30 @@ Waiving reason: {waiver['reason']}
         del text
         self.onUpdate()
 
+    def getComment(self, message: MessageType) -> str:
+        """Gets the comment on a message, including unsaved edits"""
+        if "id" not in message:
+            # Found by a running task, not stored yet
+            return message.get("comment", "N/A")
+
+        comment = self.persistence.getComment(message)
+        if comment is None:
+            comment = self.store.getComment(message)
+
+        return comment
+
+    def flush(self):
+        """Saves any pending edits"""
+        self.persistence.flush()
+
     def loadMessages(self, prefix: str) -> Sequence[MessageListType]:
         """Loads messages and waivers with the given prefix"""
+        # Edits must be on disk before anything is (re)loaded
+        self.persistence.flush()
+        if self.store is not None:
+            self.store.close()
+        self.store = open_store(self.config.build_path, prefix)
+
         waivers_path = self.config.build_path / f"{prefix}_waivers.yaml"
         if not waivers_path.exists():
             waivers_steal_path, ok = QtWidgets.QFileDialog.getOpenFileName(
@@ -664,17 +747,18 @@ Waiving reason: {waiver['reason']}
 
             if ok:
                 shutil.copy(waivers_steal_path, str(waivers_path))
+                self.store.importWaivers(waivers_path)
             else:
-                # create empty waivers file
-                dump([], open(waivers_path, "w"))
+                # create waivers file from whatever is already stored
+                self.store.exportWaivers(waivers_path)
 
-        try:
-            messages = safe_load(
-                open(self.config.build_path / f"{prefix}_messages.yaml"))
-            waivers = safe_load(open(waivers_path))
-        except FileNotFoundError:
-            # TODO this doesn't handle this error properly...
+        if not self.store.hasMessages():
             self.log("Unable to load messages.")
+            raise FileNotFoundError(self.store.path)
+
+        messages = self.store.loadMessages()
+        waivers = self.store.loadWaivers()
+        self.persistence.attach(self.store, waivers_path)
 
         diff_build_path = self.config.builds_path / self.diff_tab.diff_choose.currentText(
         )
@@ -684,13 +768,28 @@ Waiving reason: {waiver['reason']}
         # Load diff builds conditionally
         diff_messages, diff_waivers = ([], [])
         if diff_build_status[self.status_name]:
-            diff_messages = safe_load(
-                open(diff_build_path / f"{prefix}_messages.yaml"))
-            diff_waivers = safe_load(
-                open(diff_build_path / f"{prefix}_waivers.yaml"))
+            diff_store = open_store(diff_build_path, prefix)
+            diff_messages = diff_store.loadMessages()
+            diff_waivers = diff_store.loadWaivers()
+            diff_store.close()
 
         return (messages, waivers, diff_messages, diff_waivers)
 
+    def loadRules(self, prefix: str) -> MessageListType:
+        """Loads the pattern-based waiver rules with the given prefix.
+
+        Rules are optional, so a missing file means there are none.
+        """
+        rules_path = self.config.build_path / f"{prefix}_waiver_rules.yaml"
+        if not rules_path.exists():
+            return []
+
+        return safe_load(open(rules_path)) or []
+
+    def buildRuleMatcher(self, rules: MessageListType) -> RuleMatcher:
+        """Compiles waiver rules, can be extended to give more context"""
+        return RuleMatcher(rules)
+
     def updateDiffBuilds(self):
         """Updates the QComboBox where the build to diff against is selected"""
         listed_builds = list(
@@ -713,10 +812,15 @@ Waiving reason: {waiver['reason']}
     def modelUpdate(self):
         """Slot for managing model updates"""
 
-        if self.config.status[self.status_name]["time"] == self.last_model_update:
+        # Only rebuild the models when the build, its messages or the build
+        # being diffed against have changed
+        update = (self.config.build,
+                  self.config.status[self.status_name].get("time"),
+                  self.diff_tab.diff_choose.currentText())
+        if update == self.last_model_update:
             return
 
-        self.last_model_update = time.time()
+        self.last_model_update = update
 
         model = self.messageModel([], [])
         diff_model = self.diffMessageModel([], [], [], [])
@@ -729,7 +833,11 @@ Waiving reason: {waiver['reason']}
             (messages, waivers, diff_messages,
                 diff_waivers) = self.loadMessages(self.waiver_type)
 
-            model = self.messageModel(messages, waivers)
+            rules = self.buildRuleMatcher(self.loadRules(self.waiver_type))
+            for error in rules.errors:
+                self.log(f"Ignoring {self.waiver_type} waiver rule: {error}")
+
+            model = self.messageModel(messages, waivers, rules)
             diff_model = self.diffMessageModel(messages, diff_messages,
                                                 waivers, diff_waivers)
 
@@ -744,17 +852,76 @@ Waiving reason: {waiver['reason']}
                 f"Error: unable to load {self.waiver_type} messages/waivers"
             )
 
+        self.setModels(model, diff_model)
+        self.updateSummary()
+
+    def setModels(self, model: QtCore.QAbstractItemModel,
+                  diff_model: QtCore.QAbstractItemModel):
+        """Displays new message and diff models"""
         self.message_table.setModel(model)
         self.diff_tab.table.setModel(diff_model)
+        # A new selection model comes with every new model
         self.message_table.selectionModel().currentRowChanged.connect(
             self.onSelection)
-        self.updateSummary()
+        self.message_table.selectionModel().selectionChanged.connect(
+            self.onLintSelectionUpdate)
+        # New models always start by showing all messages
+        self.old_selection = "all"
+
+    def beginStreaming(self, task_name: str):
+        """Slot for a task starting to find messages.
+
+        Shows the current waivers with no messages, which are then added as
+        the task finds them, so they can be triaged before it finishes.
+        """
+        if task_name != self.status_name or self.config.build is None:
+            return
+
+        self.persistence.flush()
+        if self.store is not None:
+            self.store.close()
+        self.store = open_store(self.config.build_path, self.waiver_type)
+        waivers_path = self.config.build_path / f"{self.waiver_type}_waivers.yaml"
+        # Waivers can be edited while streaming, messages are replaced after
+        self.persistence.attach(self.store, waivers_path)
+
+        rules = self.buildRuleMatcher(self.loadRules(self.waiver_type))
+        model = self.messageModel([], self.store.loadWaivers(), rules)
+        model.view_full_filenames = self._view_full_filenames
+        self.setModels(model, self.diffMessageModel([], [], [], []))
+
+        self.streaming = True
+        # Make sure the final messages get loaded
+        self.last_model_update = None
+        self.setEnabled(True)
+        self.filterLints()
+        self.summary_text.setMarkdown(f"{task_name} is running...")
+
+    def appendMessages(self, task_name: str, messages: MessageListType):
+        """Slot for messages found by a running task"""
+        if task_name != self.status_name or not self.streaming:
+            return
+
+        self.message_table.model().appendMessages(messages)
+        if not self.summary_timer.isActive():
+            self.summary_timer.start()
+
+    def updateStreamingSummary(self):
+        """Shows how many messages the running task has found so far"""
+        if not self.streaming:
+            return
+
+        model = self.message_table.model()
+        self.summary_text.setMarkdown(
+            f"{self.status_name} is running...\n\n"
+            f"{len(model.all_messages)} messages found so far, "
+            f"{len(model.unwaived_messages)} unwaived")
 
     def viewUpdate(self):
         """Slot for managing view updates"""
         self.filterLints()
-        self.message_table.selectionModel().selectionChanged.connect(
-            self.onLintSelectionUpdate)
+        if len(self.message_table.model().orphans) > 0:
+            self.message_show_orphans.show()
         self.updateSummary()
 
     def updateSummary(self):
@@ -766,6 +933,14 @@ Waiving reason: {waiver['reason']}
         raise NotImplementedError
 
     def update(self):
+        if self.streaming:
+            status = self.config.status.get(self.status_name, {})
+            if status.get("status") == "incomplete":
+                # Still running, keep showing messages as they come in
+                return
+            self.streaming = False
+            self.summary_timer.stop()
+
         if self.shouldLoadMessages():
             self.setEnabled(True)
             self.modelUpdate()
@@ -817,8 +992,9 @@ class OrphanTab(QtWidgets.QWidget):
     current messages
     """
 
-    # Signal to pass out information about the orphan to update
-    orphanUpdate = QtCore.Signal(dict)
+    # Signal to pass out the message to update the orphan with. Rows of a
+    # MessageTable aren't dicts, so the signal can't be typed as one.
+    orphanUpdate = QtCore.Signal(object)
     # Open a file
     fileOpened = QtCore.Signal(str, int)
 
@@ -49,6 +49,10 @@ class Runner(QtWidgets.QWidget):
     test_finished = QtCore.Signal()
     testing_complete = QtCore.Signal()
 
+    # Task name, and messages found by it while running
+    messages_began = QtCore.Signal(str)
+    messages_found = QtCore.Signal(str, list)
+
     # "Internal" signal for killing tests
     kill_test = QtCore.Signal(str)
 
@@ -71,8 +75,10 @@ class Runner(QtWidgets.QWidget):
         self.thread_select = QtWidgets.QSpinBox(self)
         self.thread_select.setMinimum(1)
         self.thread_select.setMaximum(os.cpu_count() * 2)
-        self.thread_select.setValue(os.cpu_count() / 2)
+        self.thread_select.setValue(max(1, os.cpu_count() // 2))
         self.thread_select.valueChanged.connect(self.checkThreadsValue)
+        # Tasks use the default until the count is changed
+        self.config.num_threads = self.thread_select.value()
 
         self.layout.addWidget(self.thread_label, 0, 0)
         self.layout.addWidget(self.thread_select, 0, 2)
@@ -123,6 +129,7 @@ class Runner(QtWidgets.QWidget):
 
     def checkThreadsValue(self, threads: int):
         """Pops a warning box if selected number of threads exceeds cores"""
+        self.config.num_threads = threads
         if threads > os.cpu_count():
             if not self.thread_warned:
                 delta = threads - os.cpu_count()
@@ -168,6 +175,13 @@ class Runner(QtWidgets.QWidget):
         except AttributeError:
             pass
 
+        # Only tasks which report messages as they find them have these
+        try:
+            task.messages_began.connect(self.messages_began)
+            task.messages_found.connect(self.messages_found)
+        except AttributeError:
+            pass
+
         # Only compilation tasks have these signals
         try:
             task.reset_compilation.connect(self.resetCompilation)
@@ -11,4 +11,6 @@
 # @brief Custom parsers
 ##############################################################################
 
-from .lint_messages import parse_verilator_output
+from .lint_messages import (LintRecord, parse_verilator_stream,
+                            parse_verilator_output, text_hash)
+from .sv_outputs import load_sv_yaml, dump_sv_yaml
@@ -0,0 +1,114 @@
+###############################################################################
+# @file pyVerifGUI/parsers/design_dag.py
+# @package pyVerifGUI.parsers.design_dag
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Design hierarchy as a graph of modules
+##############################################################################
+"""Design hierarchy as a graph of modules.
+
+sv_hierarchy.yaml holds the instance tree fully expanded, so the subtree of
+a module is repeated for every instance of it. The graph only holds each
+module once, along with the modules it instantiates, and is saved as
+sv_hierarchy_dag.yaml:
+
+    top: top_module
+    modules:
+      top_module: [module_a, module_b]
+      module_a: [module_c]
+      module_b: [module_c]
+      module_c: []
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from pyVerifGUI.parsers.sv_outputs import dump_sv_yaml, load_sv_yaml
+
+# Name of the file the graph is saved as, next to the other parser outputs
+DAG_FILE = "sv_hierarchy_dag.yaml"
+
+
+def design_graph(tree: dict) -> Dict[str, List[str]]:
+    """Modules instantiated by each module of a hierarchy tree.
+
+    A module's subtree is the same wherever it is instantiated, so each
+    module is only walked once, however often it appears in the tree.
+    """
+    graph = {}
+    pending = [tree]
+    while pending:
+        for name, branch in pending.pop().items():
+            if name not in graph:
+                graph[name] = list(branch)
+                pending.append(branch)
+
+    return graph
+
+
+def reachable(graph: Dict[str, List[str]], roots: Iterable[str]) -> List[str]:
+    """Modules instantiated under the given roots, roots included, depth first"""
+    modules = []
+    seen = set()
+    pending = list(reversed(list(roots)))
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+
+        seen.add(name)
+        modules.append(name)
+        pending.extend(reversed(graph.get(name, ())))
+
+    return modules
+
+
+class DesignDag:
+    """Hierarchy below a top module, each module held once.
+
+    Instances are the paths from the top module through the graph, which
+    is how they are listed when needed, rather than all being stored.
+    """
+    def __init__(self, top: str, modules: Dict[str, List[str]]):
+        self.top = top
+        self.modules = modules
+
+    @classmethod
+    def fromTree(cls, top: str, tree: dict) -> "DesignDag":
+        """Graph of an expanded tree, as found in sv_hierarchy.yaml"""
+        return cls(top, design_graph(tree))
+
+    @classmethod
+    def fromModules(cls, top: str, sv_modules: dict) -> "DesignDag":
+        """Graph of the submodules of each module under top, as parsed"""
+        modules = {}
+        pending = [top]
+        while pending:
+            name = pending.pop()
+            if name not in modules:
+                submodules = (sv_modules.get(name) or {}).get("submodules") or {}
+                modules[name] = list(submodules)
+                pending.extend(modules[name])
+
+        return cls(top, modules)
+
+    @classmethod
+    def load(cls, path: Path) -> "DesignDag":
+        data = load_sv_yaml(path)
+        return cls(data["top"], data["modules"])
+
+    def dump(self, path: Path):
+        dump_sv_yaml({"top": self.top, "modules": self.modules}, path)
+
+    def children(self, name: str) -> List[str]:
+        """Modules instantiated by a module, none for unparsed modules"""
+        return self.modules.get(name, [])
+
+    def below(self, roots: Iterable[str]) -> List[str]:
+        """Every module under the given roots, roots included"""
+        return reachable(self.modules, roots)
@@ -0,0 +1,150 @@
+###############################################################################
+# @file pyVerifGUI/parsers/design_index.py
+# @package pyVerifGUI.parsers.design_index
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Lookup and search of modules and instances of a parsed design
+##############################################################################
+
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional
+
+from pyVerifGUI.parsers.design_dag import DesignDag
+
+
+class DesignIndex:
+    """Index of a parsed design, built once per parse.
+
+    Maps module names to their definitions and to the modules that
+    instantiate them. Instances are paths of module names from the top
+    module, and are listed by walking up from a module, so they never all
+    exist at once.
+    """
+    def __init__(self, dag: DesignDag, sv_modules: Optional[dict] = None):
+        self.dag = dag
+        self.definitions = sv_modules or {}
+
+        self.parents: Dict[str, List[str]] = {name: [] for name in dag.modules}
+        for name, children in dag.modules.items():
+            for child in children:
+                self.parents.setdefault(child, []).append(name)
+
+        # Sorted (lower case name, name), for prefix search
+        self.names = sorted((name.lower(), name) for name in self.parents)
+        self.order = self._postOrder()
+        self.counts = self._countInstances()
+
+    def _postOrder(self) -> List[str]:
+        """Modules with the modules they instantiate before them.
+
+        Recursive instantiations are left out, a module being walked isn't
+        walked again below itself.
+        """
+        order = []
+        done = set()
+        walking = set()
+        for root in [self.dag.top] + list(self.parents):
+            if root in done:
+                continue
+
+            walking.add(root)
+            pending = [(root, iter(self.dag.children(root)))]
+            while pending:
+                name, children = pending[-1]
+                child = next(children, None)
+                if child is None:
+                    pending.pop()
+                    walking.discard(name)
+                    done.add(name)
+                    order.append(name)
+                elif child not in done and child not in walking:
+                    walking.add(child)
+                    pending.append((child, iter(self.dag.children(child))))
+
+        return order
+
+    def _countInstances(self) -> Dict[str, int]:
+        """Instances of each module, counted in one pass down the graph"""
+        position = {name: pos for pos, name in enumerate(self.order)}
+        counts = dict.fromkeys(self.order, 0)
+        counts[self.dag.top] = 1
+        for name in reversed(self.order):
+            for child in self.dag.children(name):
+                # Recursive instantiations come after the module they're in
+                if position[child] < position[name]:
+                    counts[child] += counts[name]
+
+        return counts
+
+    def definition(self, name: str) -> Optional[dict]:
+        """Parsed definition of a module, None for unparsed modules"""
+        return self.definitions.get(name)
+
+    def instanceCount(self, name: str) -> int:
+        """How many times a module is instantiated under the top module"""
+        return self.counts.get(name, 0)
+
+    def instancePaths(self, name: str) -> Iterator[List[str]]:
+        """Hierarchical paths of every instance of a module, from the top"""
+        if name not in self.parents:
+            return
+
+        # Paths are built bottom up, from the module to the top
+        pending = [[name]]
+        while pending:
+            path = pending.pop()
+            head = path[-1]
+            if head == self.dag.top:
+                yield list(reversed(path))
+                continue
+
+            for parent in reversed(self.parents.get(head, [])):
+                # Recursive instantiations end at their first repeat
+                if parent not in path:
+                    pending.append(path + [parent])
+
+    def search(self, text: str, limit: int = 50) -> List[str]:
+        """Module names matching text, case insensitively.
+
+        Names starting with text come first, then names containing it, then
+        names containing its characters in order.
+        """
+        text = text.lower()
+        if not text:
+            return []
+
+        matches = []
+        found = set()
+        start = bisect_left(self.names, (text, ""))
+        for lower, name in self.names[start:]:
+            if not lower.startswith(text) or len(matches) >= limit:
+                break
+            matches.append(name)
+            found.add(name)
+
+        for lower, name in self.names:
+            if len(matches) >= limit:
+                break
+            if name not in found and text in lower:
+                matches.append(name)
+                found.add(name)
+
+        for lower, name in self.names:
+            if len(matches) >= limit:
+                break
+            if name not in found and _subsequence(text, lower):
+                matches.append(name)
+                found.add(name)
+
+        return matches
+
+
+def _subsequence(text: str, name: str) -> bool:
+    """Whether the characters of text appear in name, in order"""
+    remaining = iter(name)
+    return all(char in remaining for char in text)
@@ -0,0 +1,102 @@
+###############################################################################
+# @file pyVerifGUI/parsers/design_metrics.py
+# @package pyVerifGUI.parsers.design_metrics
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Size and shape metrics of each module of a parsed design
+##############################################################################
+
+from typing import Dict, List, NamedTuple
+
+from pyVerifGUI.parsers.design_index import DesignIndex
+
+
+class ModuleMetrics(NamedTuple):
+    """Metrics of a module and the hierarchy below it"""
+    name: str
+    # Times the module is instantiated under the top module
+    instances: int
+    # Instances in the subtree of one instance, itself included
+    subtree_size: int
+    # Levels of instances below the module, 0 for leaf modules
+    depth: int
+    # Modules instantiating it
+    fan_in: int
+    # Instances it contains directly
+    fan_out: int
+    # Source files of the modules in its subtree
+    files: int
+
+
+class DesignMetrics:
+    """Metrics of every module in a design.
+
+    Each module is visited once, after the modules it instantiates, with the
+    results of those reused rather than walking every instance of the
+    expanded hierarchy. Files are held as bit masks, one bit per source file,
+    so the files of a subtree are merged in one operation per submodule.
+    """
+    def __init__(self, index: DesignIndex):
+        self.index = index
+        self.files: List[str] = []
+        self.metrics: Dict[str, ModuleMetrics] = {}
+        self.file_masks: Dict[str, int] = {}
+        self._measure()
+
+    def _fileMask(self, name: str, file_ids: Dict[str, int]) -> int:
+        """Bit of the file a module is defined in, 0 for unparsed modules"""
+        definition = self.index.definition(name)
+        if not definition or not definition.get("path"):
+            return 0
+
+        path = definition["path"]
+        if path not in file_ids:
+            file_ids[path] = len(self.files)
+            self.files.append(path)
+
+        return 1 << file_ids[path]
+
+    def _measure(self):
+        dag = self.index.dag
+        file_ids = {}
+        sizes = {}
+        depths = {}
+        # Submodules come first, those not measured yet are recursive
+        # instantiations and are left out
+        for name in self.index.order:
+            size = 1
+            depth = 0
+            mask = self._fileMask(name, file_ids)
+            for child in dag.children(name):
+                if child in sizes:
+                    size += sizes[child]
+                    depth = max(depth, depths[child] + 1)
+                    mask |= self.file_masks[child]
+
+            sizes[name] = size
+            depths[name] = depth
+            self.file_masks[name] = mask
+            self.metrics[name] = ModuleMetrics(
+                name, self.index.instanceCount(name), size, depth,
+                len(set(self.index.parents.get(name, []))),
+                len(dag.children(name)), bin(mask).count("1"))
+
+    def module(self, name: str) -> ModuleMetrics:
+        """Metrics of a module, None if it isn't in the design"""
+        return self.metrics.get(name)
+
+    def subtreeFiles(self, name: str) -> List[str]:
+        """Source files of the modules in a module's subtree"""
+        mask = self.file_masks.get(name, 0)
+        return [path for bit, path in enumerate(self.files) if mask >> bit & 1]
+
+    def largest(self, count: int) -> List[ModuleMetrics]:
+        """Modules with the largest subtrees"""
+        return sorted(self.metrics.values(),
+                      key=lambda metrics: metrics.subtree_size,
+                      reverse=True)[:count]
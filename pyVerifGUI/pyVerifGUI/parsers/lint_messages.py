@@ -12,10 +12,11 @@
 ##############################################################################
 
 import hashlib
-from typing import Sequence, List
+from typing import (Dict, Iterable, Iterator, List, Mapping, NamedTuple,
+                    Optional, Tuple)
 import re
 
-from pyVerifGUI.gui.models import MessageListType
+from pyVerifGUI.gui.models import MessageType, MessageListType
 
 # Modified version of RE from verilator manual
 # Group descriptions
@@ -30,44 +31,163 @@ from pyVerifGUI.gui.models import MessageListType
 verilator_parser = re.compile(r"%(Error|Warning)(-[A-Z0-9_]+)?: (([^\s:]+):(\d+):((\d+):)? )?(.*)")
 
 
+class LintRecord(NamedTuple):
+    """A single parsed linter message.
+
+    General verilator errors, which aren't about any file, have file None.
+    """
+    file: Optional[str]
+    row: int
+    column: int
+    type: str
+    text: str
+    text_hash: int
+    error: bool
+
+
+def text_hash(text: str) -> int:
+    """Stable 64-bit hash of message text, used to match waivers"""
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(),
+        "little")
+
+
+def legacy_text_hash(text: str) -> int:
+    """MD5-based hash that messages and waivers used to be saved with"""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16)
+
+
+def legacy_hashes(messages: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, int], int]:
+    """Current text hash of each (file, text) message, by (file, legacy hash).
+
+    Both the full and the 64-bit folded legacy hashes are mapped.
+    """
+    hashes = {}
+    for file, text in messages:
+        legacy = legacy_text_hash(text)
+        current = text_hash(text)
+        hashes[(file, legacy)] = current
+        hashes[(file, legacy & ((1 << 64) - 1))] = current
+
+    return hashes
+
+
+def migrate_waiver_hash(
+        waiver: MessageType,
+        hashes: Optional[Mapping[Tuple[str, int], int]] = None) -> bool:
+    """Re-hashes a waiver saved with a legacy hash.
+
+    Waivers may hold the hash of another message than their own text, e.g.
+    once an orphan has been updated, so they are looked up in hashes (see
+    legacy_hashes()) by file first. Failing that, a waiver holding the
+    legacy hash of its own text is re-hashed. The legacy hash may have been
+    folded to 64 bits. Returns True if the waiver was changed.
+    """
+    key = (waiver.get("file"), waiver["text_hash"])
+    if hashes is not None and key in hashes:
+        waiver["text_hash"] = hashes[key]
+        return True
+
+    legacy = legacy_text_hash(waiver["text"])
+    if waiver["text_hash"] in (legacy, legacy & ((1 << 64) - 1)):
+        waiver["text_hash"] = text_hash(waiver["text"])
+        return True
+
+    return False
+
+
+def _complete_lines(pieces: Iterable[str], size: int) -> Iterator[str]:
+    """Regroups text into blocks of at least size characters of whole lines"""
+    buffered = []
+    length = 0
+    for piece in pieces:
+        buffered.append(piece)
+        length += len(piece)
+        if length < size:
+            continue
+
+        text = "".join(buffered)
+        end = text.rfind("\n") + 1
+        if end == 0:
+            # No complete line yet
+            buffered = [text]
+            continue
+
+        yield text[:end]
+        buffered = [text[end:]]
+        length = len(buffered[0])
+
+    if length > 0:
+        yield "".join(buffered)
+
+
+def parse_verilator_stream(pieces: Iterable[str],
+                          block_size: int = 1 << 16) -> Iterator[LintRecord]:
+    """Parses verilator output as it is produced.
+
+    Output can be given line by line or in arbitrary blocks, e.g. as read
+    from a running process. It is scanned a block of whole lines at a time,
+    as messages never span lines, so the regular expression skips over the
+    context lines without any per-line Python overhead. File paths, lint
+    types and texts repeat a lot, so only one copy of each is kept, and each
+    distinct text is only hashed once.
+    """
+    strings = {}
+    intern = strings.setdefault
+    # Text -> (the copy of text that is kept, hash of text)
+    hashes = {}
+    record = tuple.__new__
+
+    for block in _complete_lines(pieces, block_size):
+        for (kind, lint_type, location, file, row, _, column,
+             text) in verilator_parser.findall(block):
+            if not location:
+                if kind == "Error":
+                    # General verilator errors
+                    yield record(LintRecord, (None, 0, 0, "", text, 0, True))
+                continue
+
+            if lint_type:
+                lint_type = intern(lint_type, lint_type[1:])
+            elif kind == "Error":
+                # Linting/parsing errors may not have a type
+                lint_type = "Parse Error"
+
+            cached = hashes.get(text)
+            if cached is None:
+                cached = hashes[text] = (text, text_hash(text))
+            text, hash_ = cached
+
+            yield record(LintRecord,
+                         (intern(file, file), int(row),
+                          int(column) if column else 0, lint_type, text,
+                          hash_, kind == "Error"))
+
+
+def record_to_message(record: LintRecord) -> MessageType:
+    """Expands a parsed record into a full message"""
+    return {
+        "file": record.file,
+        "row": record.row,
+        "column": record.column,
+        "text": record.text,
+        "text_hash": record.text_hash,
+        "type": record.type,
+        "waiver": False,
+        "comment": "N/A",
+        "legitimate": False,
+        "error": record.error,
+    }
+
+
 def parse_verilator_output(lint: str) -> (MessageListType, List[str]):
     """Parses verilator outputs for errors and warnings"""
-    matches = verilator_parser.findall(lint)
-
     messages: MessageListType = []
     errors: List[str] = []
-    for match in matches:
-        if match[0] == "Warning":
-            # Linting/parsing warnings
-            messages.append({
-                "file": match[3],
-                "row": int(match[4]),
-                "column": int(match[6]),
-                "text": match[7],
-                "text_hash": int(hashlib.md5(match[7].encode('utf-8')).hexdigest(), 16),
-                "type": match[1][1:],
-                "waiver": False,
-                "comment": "N/A",
-                "legitimate": False,
-                "error": False,
-            })
-        elif match[0] == "Error" and len(match[2]) != 0:
-            # Linting/parsing errors
-            error_type = match[1][1:] if len(match[1]) != 0 else "Parse Error"
-            messages.append({
-                "file": match[3],
-                "row": int(match[4]),
-                "column": int(match[6]),
-                "text": match[7],
-                "text_hash": int(hashlib.md5(match[7].encode('utf-8')).hexdigest(), 16),
-                "type": error_type,
-                "waiver": False,
-                "comment": "N/A",
-                "legitimate": False,
-                "error": True,
-            })
-        elif match[0] == "Error" and len(match[2]) == 0:
-            # General verilator errors
-            errors.append(match[-1])
+    for record in parse_verilator_stream([lint]):
+        if record.file is None:
+            errors.append(record.text)
+        else:
+            messages.append(record_to_message(record))
 
     return messages, errors
@@ -0,0 +1,86 @@
+###############################################################################
+# @file pyVerifGUI/parsers/sv_outputs.py
+# @package pyVerifGUI.parsers.sv_outputs
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Cached loading of the parser outputs (sv_*.yaml)
+##############################################################################
+"""Loading of the sv_*.yaml files written by the parser.
+
+Loading YAML is slow on large designs, so each file gets a binary sidecar
+holding the loaded data, which is used for as long as the YAML file has the
+same modification time and size as when the sidecar was written.
+"""
+
+from oyaml import safe_load, dump
+from pathlib import Path
+from typing import Any
+import os
+import pickle
+
+# Bumped when the sidecar format changes
+SIDECAR_VERSION = 1
+
+
+def sidecar_path(path: Path) -> Path:
+    """Where the binary sidecar of a YAML file lives"""
+    path = Path(path)
+    return path.with_name(path.name + ".pkl")
+
+
+def _stamp(path: Path) -> tuple:
+    stat = os.stat(str(path))
+    return (SIDECAR_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def _write_sidecar(path: Path, data: Any):
+    """Writes the sidecar of a YAML file, if it can be written"""
+    sidecar = sidecar_path(path)
+    temp = sidecar.with_name(sidecar.name + ".tmp")
+    try:
+        with open(str(temp), "wb") as f:
+            pickle.dump((_stamp(path), data), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(str(temp), str(sidecar))
+    except OSError:
+        pass
+
+
+def load_sv_yaml(path: Path) -> Any:
+    """Loads a parser output, from its sidecar while that is up to date.
+
+    Raises FileNotFoundError if the YAML file does not exist, like open().
+    """
+    stamp = _stamp(path)
+    sidecar = sidecar_path(path)
+    try:
+        with open(str(sidecar), "rb") as f:
+            saved, data = pickle.load(f)
+        if saved == stamp:
+            return data
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # Unpickling a damaged sidecar can raise nearly anything, it gets
+        # rebuilt from the YAML file instead
+        try:
+            os.remove(str(sidecar))
+        except OSError:
+            pass
+
+    with open(str(path)) as f:
+        data = safe_load(f)
+    _write_sidecar(path, data)
+
+    return data
+
+
+def dump_sv_yaml(data: Any, path: Path):
+    """Writes a parser output, along with its sidecar"""
+    with open(str(path), "w") as f:
+        dump(data, f)
+    _write_sidecar(path, data)
@@ -0,0 +1,124 @@
+###############################################################################
+# @file pyVerifGUI/parsers/sv_parser.py
+# @package pyVerifGUI.parsers.sv_parser
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief In-process access to rSVParser
+##############################################################################
+"""In-process access to rSVParser
+
+rSVParser installed as a Python package (built with its python feature)
+provides rSVParser.parse(), which returns the outputs the command line tool
+writes to its sv_*.yaml files. Parsing that way skips starting a process
+and writing and loading back the YAML. Builds of the command line tool alone
+have no Python module, and are run as a command instead.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import rSVParser
+except ImportError:
+    rSVParser = None
+
+# Command line options with a value, and the parse() argument they map to
+VALUE_OPTIONS = {
+    "-I": "includes",
+    "--include": "includes",
+    "--pp-includes": "pp_includes",
+    "--extension": "extensions",
+}
+
+# Command line flags, and the parse() argument they set. None is ignored.
+FLAG_OPTIONS = {
+    "--top_module": "top_module",
+    "--manual-pp-includes": "manual_pp_includes",
+    "--skip-sv": "skip_sv",
+    "--skip-v": "skip_v",
+    "-r": None,
+    "--redo": None,
+}
+
+# Outputs, named as their files
+PARSER_OUTPUTS = ("sv_modules", "sv_interfaces", "sv_packages", "sv_files",
+                  "sv_hierarchy")
+
+
+def has_parser_api() -> bool:
+    """Whether the installed rSVParser can be called from Python"""
+    return callable(getattr(rSVParser, "parse", None))
+
+
+def parser_options(args: List[str]) -> Optional[dict]:
+    """parse() arguments equivalent to command line arguments.
+
+    None if the arguments aren't all understood, in which case the command
+    line tool has to be run instead.
+    """
+    options = {"includes": [], "pp_includes": [], "extensions": []}
+    args = iter(arg for arg in args if arg)
+    for arg in args:
+        name, equals, value = arg.partition("=")
+        if name in VALUE_OPTIONS:
+            if not equals:
+                value = next(args, None)
+            if not value:
+                return None
+            options[VALUE_OPTIONS[name]].append(value)
+        elif arg in FLAG_OPTIONS:
+            if FLAG_OPTIONS[arg] is not None:
+                options[FLAG_OPTIONS[arg]] = True
+        else:
+            return None
+
+    return options
+
+
+def _listed(entries: dict) -> dict:
+    """Ports and parameters come back as tuples, they are lists in YAML"""
+    for entry in entries.values():
+        for field in ("ports", "parameters"):
+            if field in entry:
+                entry[field] = [list(item) for item in entry[field]]
+
+    return entries
+
+
+def parse_design(top_module: str, include_dirs: List[Path],
+                 options: dict, cwd: Path) -> Tuple[int, str, Optional[dict]]:
+    """Parses the sources in include_dirs, without writing any files.
+
+    Equivalent to running rSVParser in cwd, with options from
+    parser_options(). Returns a return code, the errors and the outputs,
+    keyed like their files (sv_modules...), with the outputs None if
+    parsing failed.
+    """
+    options = dict(options)
+    # Relative paths are relative to where the command would run
+    options["includes"] = [
+        str(Path(cwd) / path)
+        for path in list(include_dirs) + options["includes"]
+    ]
+    options["pp_includes"] = [
+        str(Path(cwd) / path) for path in options["pp_includes"]
+    ]
+
+    try:
+        outputs = rSVParser.parse(top_module, **options)
+    except Exception as exc:
+        return (-1, f"rSVParser: {exc}", None)
+
+    stderr = "".join(f"{warning}\n" for warning in outputs["warnings"])
+    stderr += "".join(outputs["errors"])
+    if outputs["errors"]:
+        return (-1, stderr, None)
+
+    _listed(outputs["sv_modules"])
+    _listed(outputs["sv_interfaces"])
+    return (0, stderr, {name: outputs[name] for name in PARSER_OUTPUTS})
@@ -0,0 +1,122 @@
+###############################################################################
+# @file pyVerifGUI/tasks/jobs.py
+# @package pyVerifGUI.tasks.jobs
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Jobs run in the process pool by tasks
+##############################################################################
+"""Jobs run in the process pool by tasks
+
+Pool processes are spawned, so they import each job by the module it was
+defined in. Task modules are loaded as plugins, under their bare file names,
+which pool processes can't import. Jobs live here instead, where they are
+always imported as part of the package.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+import codecs
+import io
+import subprocess as sp
+import threading
+
+from pyVerifGUI.parsers import parse_verilator_stream
+from pyVerifGUI.parsers.lint_messages import record_to_message
+from pyVerifGUI.tasks.process_pool import report
+
+# Messages found while linting are reported at least this often, in seconds,
+# or as soon as BATCH_MESSAGES of them are found
+BATCH_INTERVAL = 0.1
+BATCH_MESSAGES = 1000
+
+
+def lint_job(cmd_list: List[str], cwd: str, stubs: Optional[str] = None):
+    """Runs verilator once, returning its return code, parsed messages,
+    general errors, stdout and stderr.
+
+    Meant to be run in the process pool, so parsing and hashing messages
+    never holds the GUI's GIL. Verilator's PID is reported when it starts,
+    and batches of message dicts as verilator reports them. Messages in the
+    stubs file are not reported.
+    """
+    try:
+        popen = sp.Popen(cmd_list,
+                         stdout=sp.PIPE,
+                         stderr=sp.PIPE,
+                         cwd=cwd,
+                         universal_newlines=True)
+    except Exception as exc:
+        return (-42, [], [], "", str(exc))
+    report(("pid", popen.pid))
+
+    # Drain stdout on the side, so verilator never blocks on it
+    stdout = []
+    stdout_reader = threading.Thread(
+        target=lambda: stdout.append(popen.stdout.read()))
+    stdout_reader.start()
+
+    # Messages are parsed as verilator reports them. read1 returns whatever
+    # has been written so far, rather than waiting for a full block, so
+    # decoding is done here instead of by the text wrapper.
+    stderr = []
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(popen.stderr.encoding)(), True)
+
+    # The GUI updates once per batch, so messages are collected into
+    # batches on a timer rather than reported per block. The lock keeps
+    # batches in order.
+    batch = []
+    batch_lock = threading.Lock()
+    done = threading.Event()
+
+    def report_batch():
+        with batch_lock:
+            if batch:
+                report(("messages", [record_to_message(record)
+                                     for record in batch]))
+            batch.clear()
+
+    def report_batches():
+        while not done.wait(BATCH_INTERVAL):
+            report_batch()
+
+    reporter = threading.Thread(target=report_batches, daemon=True)
+    reporter.start()
+
+    def stderr_blocks():
+        # Every block is parsed before the next one is read, so all messages
+        # found so far are batched before waiting on verilator
+        for data in iter(lambda: popen.stderr.buffer.read1(1 << 16), b""):
+            block = decoder.decode(data)
+            stderr.append(block)
+            yield block
+        block = decoder.decode(b"", True)
+        stderr.append(block)
+        yield block
+
+    records = []
+    errors = []
+    for record in parse_verilator_stream(stderr_blocks(), block_size=1):
+        if record.file is None:
+            errors.append(record.text)
+        else:
+            records.append(record)
+            if stubs is None or Path(record.file).name != stubs:
+                with batch_lock:
+                    batch.append(record)
+                    full = len(batch) >= BATCH_MESSAGES
+                if full:
+                    report_batch()
+    done.set()
+    reporter.join()
+    report_batch()
+
+    stdout_reader.join()
+    returncode = popen.wait()
+
+    return (returncode, records, errors, "".join(stdout), "".join(stderr))
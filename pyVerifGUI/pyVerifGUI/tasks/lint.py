@@ -12,16 +12,29 @@
 ##############################################################################
 
 import subprocess as sp
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+import hashlib
+import itertools
 from qtpy import QtCore
 from oyaml import dump
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import threading
+import signal
 import os
 
-from pyVerifGUI.parsers import parse_verilator_output
+from pyVerifGUI.db import MessageStore, store_path
+from pyVerifGUI.parsers.lint_messages import record_to_message
 from pyVerifGUI.gui.config import Config
+from pyVerifGUI.gui.models import MessageListType
 
 from pyVerifGUI.tasks.base import Task, is_task, task_names
-from pyVerifGUI.tasks.worker import Worker
-from pyVerifGUI.tasks.parse import get_extra_args
+from pyVerifGUI.tasks.worker import Worker, WorkerSignals
+from pyVerifGUI.tasks.jobs import lint_job
+from pyVerifGUI.tasks.process_pool import process_pool
+from pyVerifGUI.parsers.design_dag import design_graph, reachable
+from pyVerifGUI.tasks.parse import (SOURCE_SUFFIXES, get_extra_args,
+                                    load_sv_cfg, rtl_file_lists, scan_source)
 
 
 @is_task
@@ -30,14 +43,21 @@ class LintTask(Task):
     _name = task_names.lint
     _description = "SystemVerilog Linter (Verilator)"
 
+    # Emitted with the task name when linting starts
+    messages_began = QtCore.Signal(str)
+    # Emitted with the task name and each batch of messages as they are found
+    messages_found = QtCore.Signal(str, list)
+
     def _run(self):
         """Runs linter task"""
         self.worker = LinterWorker(self._name, self.config)
 
         self.worker.signals.result.connect(self.callback)
         self.worker.signals.stdout.connect(self.run_stdout)
+        self.worker.signals.messages.connect(self.foundMessages)
 
         self.log_output.emit("Linting design...")
+        self.messages_began.emit(self._name)
         QtCore.QThreadPool.globalInstance().start(self.worker)
 
     def callback(self, name: str, rc: int, stdout: str, stderr: str,
@@ -53,47 +73,171 @@ class LintTask(Task):
         self.log_output.emit("Linting finshed!")
         self.succeed("Linting Finished!", [])
 
+    def foundMessages(self, messages: list):
+        """Passes on messages found while linting"""
+        self.messages_found.emit(self._name, messages)
+
+def lint_shards(tree: dict) -> List[str]:
+    """Roots of the independent subtrees below a top module, largest first.
+
+    A module instantiated under several roots is linted with each of them.
+    """
+    graph = design_graph(tree)
+    sizes = {root: len(reachable(graph, [root])) for root in tree}
+
+    return sorted(sizes, key=sizes.get, reverse=True)
+
+
+def verilator_paths(
+        args: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """Include directories, library directories and library files given in
+    verilator arguments.
+
+    Verilator looks for included files in +incdir+ and -I directories, as
+    well as in -y directories, where it also looks for modules missing from
+    the file list. -v files are read for missing modules too.
+    """
+    include_dirs = []
+    library_dirs = []
+    library_files = []
+    args = iter(arg for arg in args if arg)
+    for arg in args:
+        if arg.startswith("+incdir+"):
+            include_dirs.extend(
+                path for path in arg[len("+incdir+"):].split("+") if path)
+        elif arg.startswith("-I") and len(arg) > 2:
+            include_dirs.append(arg[2:])
+        elif arg == "-y":
+            library_dirs.extend(itertools.islice(args, 1))
+        elif arg == "-v":
+            library_files.extend(itertools.islice(args, 1))
+
+    return include_dirs + library_dirs, library_dirs, library_files
+
+
+def module_stub(name: str, module: dict) -> str:
+    """An empty module with the same parameters and ports as a parsed one.
+
+    Stubs let a module be linted without elaborating what it instantiates.
+    """
+    params = []
+    for param in module.get("parameters") or []:
+        _, _, _, dimension, param_name, _, value = param
+        params.append(f"parameter {param_name}{dimension} = {value or 0}")
+
+    ports = []
+    for port in module.get("ports") or []:
+        direction, net_type, _, dimension, port_name, _ = port
+        ports.append(" ".join(
+            part for part in [direction, net_type, dimension, port_name]
+            if part))
+
+    header = f"module {name}"
+    if params:
+        header += " #(\n    " + ",\n    ".join(params) + "\n)"
+    header += " (\n    " + ",\n    ".join(ports) + "\n);" if ports else ";"
+
+    return f"{header}\nendmodule\n"
+
+
+class LintShard:
+    """One verilator run over part of the design.
+
+    Shards are also the units lint results are cached by, under the name of
+    their top module.
+    """
+    def __init__(self, top: str, file_list: Path, stubs: Optional[Path] = None,
+                 fallback: Optional[Path] = None):
+        self.top = top
+        self.file_list = file_list
+        # File of stubbed submodules, whose messages are dropped
+        self.stubs = stubs
+        # File list to lint with instead, if the stubs don't work
+        self.fallback = fallback
+
+        self.fingerprint = None
+        self.cached = False
+        # Of the verilator linting the shard
+        self.pid = None
+        self.returncode = 0
+        self.records = []
+        self.errors = []
+        self.stdout = ""
+        self.stderr = ""
+
+    def files(self, file_list: Path) -> List[str]:
+        """Files in a file list"""
+        return [line for line in file_list.read_text().splitlines() if line]
+
+    def stubsFailed(self) -> bool:
+        """Whether verilator could not make sense of the stubbed submodules"""
+        if self.stubs is None:
+            return False
+
+        return any(record.error and Path(record.file).name == self.stubs.name
+                   for record in self.records)
+
+    def useFallback(self):
+        """Lints against the fallback file list from now on"""
+        self.stubs = None
+        self.file_list = self.fallback
+        self.fallback = None
+
+
+class LinterSignals(WorkerSignals):
+    """Linter signals, to report messages before linting finishes"""
+    # Batch of message dicts, as found
+    messages = QtCore.Signal(list)
+
+
 class LinterWorker(Worker):
+    def __init__(self, tag: str, *args, **kwargs):
+        super().__init__(tag, *args, **kwargs)
+        self.signals = LinterSignals()
+        # Messages already reported. These are only a preview, the final
+        # messages are the ones written to the store.
+        self.reported = set()
+        self.reported_lock = threading.Lock()
+        # Verilator runs in pool processes, so it is killed by PID
+        self.pids = set()
+        self.killed = False
+        self.threads = 1
+        # File path -> content hash and included files, shared by every shard
+        self.sources = {}
+        # Include directories and library files, from the verilator arguments
+        self.search_paths = None
+
     def fn(self, stdout, config: Config):
         """Run verilator as a linter and save the parsed output into the build
         directory.
+
+        Only shards whose fingerprint changed since they were last linted are
+        run, the rest reuse their cached messages.
         """
         del stdout
 
-        if os.name == 'nt':
-            verilator_exe = "verilator.exe"
-        else:
-            verilator_exe = "verilator"
+        self.threads = max(1, getattr(config, "num_threads", 1))
+        rtlfiles = config.build_path.resolve() / "rtlfiles.lst"
+        shards = None
+        if config.config.get("lint_sharded", False) and self.threads > 1:
+            shards = self.planShards(config, rtlfiles)
+        if not shards:
+            shards = [LintShard(config.top_module, rtlfiles)]
 
-        self.cmd_list = [verilator_exe, "--lint-only", "-Wall", "--top-module",
-                         config.top_module, "-f", f"{config.build_path.resolve()}/rtlfiles.lst"]
+        store = MessageStore(store_path(config.build_path, "linter"))
+        try:
+            returncode, records, errors, out, err = self.lintShards(
+                config, store, shards)
 
-        opts = config.config.get("verilator_args", None)
-        self.cmd_list.extend(get_extra_args(opts))
-        self.display_cmd()
+            # Write messages to the build's message store
+            store.replaceRecords(records)
+        finally:
+            store.close()
 
-        # can only be run after parsing has finished
-        try:
-            self.popen = sp.Popen(self.cmd_list,
-                                  stdout=sp.PIPE,
-                                  stderr=sp.PIPE,
-                                  cwd=config.working_dir_path)
-        except Exception as exc:
-            return (-42, "", str(exc))
-
-        stdout, stderr = self.popen.communicate()
-        stderr = stderr.decode()
-        returncode = self.popen.wait()
-        message_text = stderr
-
-        # Parse verilator output to build list of messages
-        messages, errors = parse_verilator_output(message_text)
-        if messages is None:
-            return (-42, "", message_text)
-
-        # Write messages to YAML storage file
+        # Messages used to be stored as YAML, don't leave a stale copy around
         messages_path = config.build_path / "linter_messages.yaml"
-        dump(messages, open(messages_path, "w"))
+        if messages_path.exists():
+            os.remove(str(messages_path))
 
         errors_path = config.build_path / "linter_errors.yaml"
         if errors:
@@ -102,4 +246,307 @@ class LinterWorker(Worker):
             if errors_path.exists():
                 os.remove(str(errors_path))
 
-        return (returncode, stdout.decode(), stderr)
\ No newline at end of file
+        return (returncode, out, err)
+
+    def verilatorExe(self) -> str:
+        if os.name == 'nt':
+            return "verilator.exe"
+        else:
+            return "verilator"
+
+    def verilatorVersion(self, config: Config) -> str:
+        """Version reported by verilator, or an empty string"""
+        try:
+            return sp.run([self.verilatorExe(), "--version"],
+                          stdout=sp.PIPE,
+                          stderr=sp.PIPE,
+                          cwd=config.working_dir_path,
+                          universal_newlines=True).stdout.strip()
+        except Exception:
+            return ""
+
+    def verilatorCommand(self, config: Config, top: str,
+                         file_list: str) -> List[str]:
+        """Command to lint the design under top, from the given file list"""
+        cmd_list = [self.verilatorExe(), "--lint-only", "-Wall",
+                    "--top-module", top, "-f", file_list]
+
+        opts = config.config.get("verilator_args", None)
+        cmd_list.extend(get_extra_args(opts))
+        return cmd_list
+
+    def searchPaths(self, config: Config) -> Tuple[List[Path], List[Path]]:
+        """Directories verilator looks for included files in, and library
+        files it may read modules from
+        """
+        if self.search_paths is None:
+            base = Path(config.working_dir_path)
+            include_dirs, library_dirs, library_files = verilator_paths(
+                get_extra_args(config.config.get("verilator_args", None)))
+            libraries = [base / path for path in library_files]
+            for library_dir in library_dirs:
+                libraries.extend(
+                    path for path in sorted((base / library_dir).glob("*"))
+                    if path.suffix in SOURCE_SUFFIXES and path.is_file())
+
+            # Relative includes are also found from verilator's directory
+            self.search_paths = ([base / path for path in include_dirs] +
+                                 [base], libraries)
+
+        return self.search_paths
+
+    def scan(self, path: Path,
+             include_dirs: List[Path]) -> Tuple[str, List[Path]]:
+        """Hash of a file and the files it includes, scanned once per run"""
+        if path not in self.sources:
+            self.sources[path] = scan_source(path, include_dirs)
+
+        return self.sources[path]
+
+    def fingerprint(self, config: Config, version: str, shard: LintShard,
+                    file_list: Path) -> str:
+        """Identifies everything that lint results of a shard depend on.
+
+        That is the verilator version and command line, and the contents of
+        every file linted, which includes the generated stubs, along with
+        the files they include and the library files verilator may read
+        modules from.
+        """
+        fingerprint = hashlib.blake2b(digest_size=16)
+        fingerprint.update(version.encode())
+        for arg in self.verilatorCommand(config, shard.top, str(file_list)):
+            fingerprint.update(b"\0" + arg.encode())
+
+        include_dirs, libraries = self.searchPaths(config)
+        listed = set()
+        for file in shard.files(file_list):
+            path = (Path(config.working_dir_path) / file).resolve()
+            listed.add(path)
+            digest, _ = self.scan(path, include_dirs)
+            fingerprint.update(f"\0{file}\0{digest}".encode())
+
+        depends: Dict[Path, str] = {}
+        pending = list(listed) + [path.resolve() for path in libraries]
+        while pending:
+            path = pending.pop()
+            if path not in depends:
+                depends[path], includes = self.scan(path, include_dirs)
+                pending.extend(includes)
+
+        for path in sorted(set(depends) - listed):
+            fingerprint.update(f"\0{path}\0{depends[path]}".encode())
+
+        return fingerprint.hexdigest()
+
+    def reportMessages(self, messages: MessageListType):
+        """Reports messages that haven't been reported by another shard"""
+        new = []
+        with self.reported_lock:
+            for message in messages:
+                key = (message["file"], message["row"], message["column"],
+                       message["type"], message["text"])
+                if key not in self.reported:
+                    self.reported.add(key)
+                    new.append(message)
+
+        if new:
+            self.signals.messages.emit(new)
+
+    def onProgress(self, shard: LintShard, item: tuple):
+        """Handles progress reported by the lint job of a shard"""
+        kind, value = item
+        if kind == "pid":
+            shard.pid = value
+            self.pids.add(value)
+            if self.killed:
+                self.killPid(value)
+        elif kind == "messages":
+            self.reportMessages(value)
+
+    def planShards(self, config: Config,
+                   rtlfiles: Path) -> Optional[List[LintShard]]:
+        """Splits the design into shards that can be linted independently.
+
+        Every subtree below the top module is its own shard. The top module
+        itself is linted against stubs of the modules it instantiates, or the
+        full design in rtlfiles if those don't work. Returns None if the
+        design can't be split.
+        """
+        top = config.top_module
+        try:
+            sv_cfg = load_sv_cfg(config.build_path / f"sv_{top}")
+            tree = sv_cfg["sv_hierarchy"][top]["tree"][top]
+        except (OSError, KeyError, TypeError):
+            return None
+
+        if not tree:
+            return None
+
+        shard_path = config.build_path.resolve() / "lint_shards"
+        shard_path.mkdir(exist_ok=True)
+        sv_modules = sv_cfg["sv_modules"]
+
+        # Submodules that weren't parsed (e.g. FPGA intrinsics) can't be
+        # stubbed or sharded, same as they are left out of rtlfiles.lst
+        roots = [root for root in lint_shards(tree) if root in sv_modules]
+
+        stubs = shard_path / f"{top}_stubs.sv"
+        with stubs.open("w") as fptr:
+            for root in roots:
+                fptr.write(module_stub(root, sv_modules[root]))
+
+        # The top module alone, with the stubs standing in for its subtrees
+        files = rtl_file_lists(top, sv_cfg, roots, config.working_dir_path,
+                               full_top=False)
+        files[top].append(stubs.as_posix())
+
+        shards = []
+        for root, shard_files in files.items():
+            file_list = shard_path / f"{root}.lst"
+            with file_list.open("w") as fptr:
+                fptr.write("\n".join(shard_files))
+            shards.append(LintShard(root, file_list))
+
+        shards[0].stubs = stubs
+        shards[0].fallback = rtlfiles
+        return shards
+
+    def lintShard(self, config: Config, version: str,
+                  shard: LintShard) -> Future:
+        """Starts linting a single shard, from its own list of files"""
+        shard.fingerprint = self.fingerprint(config, version, shard,
+                                             shard.file_list)
+        cmd_list = self.verilatorCommand(config, shard.top,
+                                         str(shard.file_list))
+        self.signals.stdout.emit(self.tag, f"**** {' '.join(cmd_list)}")
+        if self.killed:
+            future = Future()
+            future.set_result((-1, [], [], "", "Linting was killed"))
+            return future
+
+        return process_pool(self.threads).submit(
+            lint_job,
+            cmd_list,
+            str(config.working_dir_path),
+            shard.stubs.name if shard.stubs is not None else None,
+            progress=lambda item: self.onProgress(shard, item))
+
+    def runShards(self, config: Config, version: str,
+                  shards: List[LintShard]):
+        """Lints shards in parallel, collecting their results as they finish.
+
+        A shard whose stubs failed is linted again against its fallback as
+        soon as it finishes, alongside the shards still running.
+        """
+        # Largest shards start first, so the slowest finish early
+        running = {
+            self.lintShard(config, version, shard): shard
+            for shard in shards
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard = running.pop(future)
+                (shard.returncode, shard.records, shard.errors, shard.stdout,
+                 shard.stderr) = future.result()
+                self.pids.discard(shard.pid)
+
+                if shard.stubsFailed():
+                    shard.useFallback()
+                    running[self.lintShard(config, version, shard)] = shard
+
+    def lintShards(self, config: Config, store: MessageStore,
+                   shards: List[LintShard]):
+        """Lints shards in parallel, merging their results.
+
+        Shards are looked up in the store first, and only linted if their
+        fingerprint changed. The top module's shard falls back to the full
+        design if verilator can't use the stubs, e.g. because of ports using
+        package types.
+        """
+        version = self.verilatorVersion(config)
+        cached = store.lintUnits()
+        stale = []
+        for shard in shards:
+            fingerprints = [
+                self.fingerprint(config, version, shard, file_list)
+                for file_list in [shard.file_list, shard.fallback]
+                if file_list is not None
+            ]
+            if cached.get(shard.top) == fingerprints[0]:
+                shard.cached = True
+            elif shard.fallback is not None and cached.get(
+                    shard.top) == fingerprints[-1]:
+                # The stubs failed last time too
+                shard.useFallback()
+                shard.cached = True
+            else:
+                stale.append(shard)
+                continue
+
+            shard.fingerprint = cached[shard.top]
+            shard.returncode, shard.records, shard.errors = store.loadLintUnit(
+                shard.top)
+            self.signals.stdout.emit(
+                self.tag, f"**** {shard.top} is unchanged, using cached messages")
+            self.reportMessages([
+                record_to_message(record) for record in shard.records
+                if shard.stubs is None
+                or Path(record.file).name != shard.stubs.name
+            ])
+
+        self.runShards(config, version, stale)
+
+        # Only cache complete results
+        if not self.killed:
+            for shard in stale:
+                if shard.returncode >= 0:
+                    store.saveLintUnit(shard.top, shard.fingerprint,
+                                       shard.returncode, shard.records,
+                                       shard.errors)
+            store.pruneLintUnits(shard.top for shard in shards)
+
+        # Modules instantiated in several shards are reported by each of them
+        seen = set()
+        records = []
+        errors = []
+        for shard in shards:
+            for record in shard.records:
+                if (shard.stubs is not None
+                        and Path(record.file).name == shard.stubs.name):
+                    continue
+
+                key = (record.file, record.row, record.column, record.type,
+                       record.text)
+                if key not in seen:
+                    seen.add(key)
+                    records.append(record)
+
+            for error in shard.errors:
+                if error not in errors:
+                    errors.append(error)
+
+        returncodes = [shard.returncode for shard in shards]
+        returncode = -42 if -42 in returncodes else max(returncodes)
+        if len(shards) == 1:
+            stdout, stderr = shards[0].stdout, shards[0].stderr
+        else:
+            stdout = "".join(f"**** {shard.top}\n{shard.stdout}"
+                             for shard in shards)
+            stderr = "".join(f"**** {shard.top}\n{shard.stderr}"
+                             for shard in shards)
+        return (returncode, records, errors, stdout, stderr)
+
+    def killPid(self, pid: int):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            # Already finished
+            pass
+
+    def kill(self, really: bool):
+        """Slot to kill worker, and every verilator it is running"""
+        if really is True:
+            self.killed = True
+            for pid in list(self.pids):
+                self.killPid(pid)
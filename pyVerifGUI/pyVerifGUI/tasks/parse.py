@@ -12,12 +12,24 @@
 ##############################################################################
 
 from qtpy import QtCore, QtWidgets
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Tuple
 from oyaml import safe_load
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import subprocess as sp
+import hashlib
+import heapq
+import re
 import shutil
-
+import threading
+
+from pyVerifGUI.db import (DesignStore, ParseCache, design_store_path,
+                           parse_cache_path)
+from pyVerifGUI.parsers.sv_outputs import load_sv_yaml, dump_sv_yaml
+from pyVerifGUI.parsers.sv_parser import (has_parser_api, parse_design,
+                                          parser_options)
+from pyVerifGUI.parsers.design_dag import (DAG_FILE, DesignDag, design_graph,
+                                           reachable)
 from pyVerifGUI.tasks.base import Task, is_task, task_names
 from pyVerifGUI.tasks.worker import Worker
 
@@ -35,8 +47,8 @@ class ParseTask(Task):
         """Run parser task"""
         self.copy_dialog = CopyOutputsDialog(self.config)
 
-        # Attempt to copy previous build
-        if self.copy_dialog.askForCopy():
+        # Attempt to copy previous build, only worth it if nothing is cached
+        if not self.cachedSources() and self.copy_dialog.askForCopy():
             self.log_output.emit("RTL copied from previous build...")
             self.taskFinish()
         else:
@@ -50,6 +62,18 @@ class ParseTask(Task):
             QtCore.QThreadPool.globalInstance().start(self.worker)
             self._running = True
 
+    def cachedSources(self) -> bool:
+        """Whether the parse cache has results for any of the sources.
+
+        Runs on the GUI thread, so the sources themselves are left to the
+        worker, which checks which of them are still up to date.
+        """
+        cache = ParseCache(parse_cache_path(self.config.builds_path))
+        try:
+            return cache.hasFilesIn(self.config.rtl_dir_paths)
+        finally:
+            cache.close()
+
     def callback(self, tag: str, rc: int, stdout: str, stderr: str,
                  time: float):
         """Callback to finish parsing"""
@@ -67,39 +91,353 @@ class ParseTask(Task):
         self.succeed("Parsing succeeded!", [task_names.lint])
 
 
-def create_rtlfiles_list(top_module, sv_rtl_fileslist_filename, sv_cfg_data):
-    if not top_module in sv_cfg_data['sv_hierarchy']:
-        return f"<ERROR> '{top_module}' not found in hiearchy tree (sv_hierarchy.yaml)"
-
-    htree = sv_cfg_data['sv_hierarchy'][top_module]['tree']
-
-    def get_modules(blk_dict: dict):
-        modules = list(blk_dict.keys())
-        for branch in blk_dict.values():
-            modules.extend(get_modules(branch))
+# Suffixes of the source files read from the include directories
+SOURCE_SUFFIXES = (".sv", ".svh", ".v", ".vh")
+# Parser outputs which are cached for each source file
+PARSED_OUTPUTS = ("modules", "interfaces", "packages", "files")
+# Bumped when the way cached outputs are produced changes
+PARSE_CACHE_VERSION = "1"
+
+include_parser = re.compile(rb'^[ \t]*`include[ \t]+"([^"]+)"', re.M)
+
+
+def source_files(rtl_dirs: Iterable[Path]) -> List[Path]:
+    """Lists the source files in the given directories"""
+    files = []
+    seen = set()
+    for rtl_dir in rtl_dirs:
+        for path in sorted(Path(rtl_dir).rglob("*")):
+            if path.suffix in SOURCE_SUFFIXES and path.is_file():
+                real = path.resolve()
+                if real not in seen:
+                    seen.add(real)
+                    files.append(path)
+
+    return files
+
+
+def include_search_dirs(rtl_dirs: Iterable[Path],
+                        files: Iterable[Path]) -> List[Path]:
+    """Directories included files are looked up in.
+
+    rSVParser adds every directory holding a source file to the
+    preprocessor include path, along with the given directories.
+    """
+    dirs = [Path(path).resolve() for path in rtl_dirs]
+    dirs.extend(Path(path).resolve().parent for path in files)
+    return list(dict.fromkeys(dirs))
+
+
+def resolve_include(name: str, path: Path,
+                    include_dirs: Iterable[Path]) -> Optional[Path]:
+    """Finds an included file, next to the including file or in include_dirs,
+    see include_search_dirs()
+    """
+    for directory in [path.parent, *include_dirs]:
+        candidate = Path(directory) / name
+        if candidate.is_file():
+            return candidate.resolve()
+
+    return None
+
+
+def scan_source(path: Path,
+                include_dirs: Iterable[Path]) -> Tuple[str, List[Path]]:
+    """Hashes a file, and finds the files it includes"""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return "missing", []
+
+    includes = []
+    for name in include_parser.findall(data):
+        found = resolve_include(name.decode(errors="replace"), path,
+                                include_dirs)
+        if found is not None:
+            includes.append(found)
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest(), includes
+
+
+def parse_keys(files: List[Path], include_dirs: List[Path],
+               salt: str) -> Dict[str, str]:
+    """Key of each file, covering its contents and everything it includes.
+
+    salt covers anything else the parser output depends on, such as its
+    arguments.
+    """
+    digests = {}
+    includes = {}
+    pending = [path.resolve() for path in files]
+    while pending:
+        path = pending.pop()
+        if path not in digests:
+            digests[path], includes[path] = scan_source(path, include_dirs)
+            pending.extend(includes[path])
+
+    keys = {}
+    for path in files:
+        depends = set()
+        pending = [path.resolve()]
+        while pending:
+            dep = pending.pop()
+            if dep not in depends:
+                depends.add(dep)
+                pending.extend(includes[dep])
+
+        key = hashlib.blake2b(f"{PARSE_CACHE_VERSION} {salt}".encode(),
+                              digest_size=16)
+        for dep in sorted(depends):
+            key.update(f"\n{dep} {digests[dep]}".encode())
+        keys[str(path)] = key.hexdigest()
+
+    return keys
+
+
+def parse_shards(files: List[Path], count: int) -> List[List[Path]]:
+    """Splits files into up to count shards of about the same total size"""
+    def size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    shards = [[] for _ in range(min(count, len(files)))]
+    sizes = [0] * len(shards)
+    # Largest first, each into the smallest shard so far
+    for path in sorted(files, key=size, reverse=True):
+        smallest = sizes.index(min(sizes))
+        shards[smallest].append(path)
+        sizes[smallest] += size(path)
+
+    return shards
+
+
+def split_outputs(sv_cfg: dict, cwd: Path,
+                  sources: Dict[Path, str]) -> Dict[str, dict]:
+    """Splits parser outputs up by the source file of each entry.
+
+    sources maps the resolved path of each file that was parsed to the path
+    it is known by, which replaces the path in its entries. Entries of any
+    other file are dropped. sv_files, keyed by file name and then by path,
+    is split into {path: included} for each file.
+    """
+    def source_of(location: str) -> Optional[str]:
+        return sources.get((Path(cwd) / location).resolve())
+
+    split = {
+        source: {output: {}
+                 for output in PARSED_OUTPUTS}
+        for source in sources.values()
+    }
+    for output in PARSED_OUTPUTS:
+        for name, entry in (sv_cfg.get(f"sv_{output}") or {}).items():
+            if output == "files":
+                for location, included in (entry or {}).items():
+                    source = source_of(str(location))
+                    if source is not None:
+                        split[source][output][source] = included
+                continue
+
+            source = source_of(str(entry.get("path", "")))
+            if source is not None:
+                split[source][output][name] = dict(entry, path=source)
+
+    return split
+
+
+def merge_outputs(parsed: Iterable[dict]) -> dict:
+    """Merges the cached outputs of each file back into parser outputs.
+
+    sv_files is keyed by file name again, with a file included if it
+    declares a module, as rSVParser marks them when given a top module.
+    """
+    sv_cfg = {f"sv_{output}": {} for output in PARSED_OUTPUTS}
+    paths = []
+    for entries in parsed:
+        paths.extend(entries.get("files", {}))
+        for output in PARSED_OUTPUTS:
+            if output != "files":
+                sv_cfg[f"sv_{output}"].update(entries.get(output, {}))
+
+    module_paths = {module["path"] for module in sv_cfg["sv_modules"].values()}
+    for path in paths:
+        sv_cfg["sv_files"].setdefault(Path(path).name, {})[path] = (
+            path in module_paths)
+
+    return sv_cfg
+
+
+def design_structure(sv_modules: dict) -> str:
+    """Hash of which modules each module instantiates"""
+    structure = hashlib.blake2b(digest_size=16)
+    for name in sorted(sv_modules):
+        submodules = sv_modules[name].get("submodules") or {}
+        structure.update(f"{name}:{','.join(sorted(submodules))}\n".encode())
+
+    return structure.hexdigest()
+
+
+def module_tree(name: str, sv_modules: dict, subtrees: dict = None) -> dict:
+    """Tree of the modules instantiated under a module.
+
+    Every instance of a module shares the same subtree, so building the
+    tree, and dumping it with aliases, is linear in the number of modules.
+    Recursive instantiations end the tree with an empty subtree.
+    """
+    if subtrees is None:
+        subtrees = {}
+
+    # None while the submodules are built. Recursive instantiations get an
+    # empty tree of their own, sharing the unfinished one would make a cycle.
+    subtrees[name] = None
+    tree = {}
+    submodules = (sv_modules.get(name) or {}).get("submodules") or {}
+    for submodule in submodules:
+        if submodule not in subtrees:
+            module_tree(submodule, sv_modules, subtrees)
+        subtree = subtrees[submodule]
+        tree[submodule] = {} if subtree is None else subtree
+
+    subtrees[name] = tree
+    return tree
+
+
+package_reference = re.compile(r"\b(\w+)\s*::")
+identifier = re.compile(r"\w+")
+
+
+def dependency_files(sv_cfg_data, base: Path = Path()) -> List[str]:
+    """Lists the files of packages and interfaces, dependencies first.
+
+    A file depends on the packages it references (pkg::) and the interfaces
+    it names. Packages stay ahead of interfaces, otherwise files keep their
+    parsed order, which also decides circular references.
+    """
+    definitions = {}
+    files = []
+    for kind in ("sv_packages", "sv_interfaces"):
+        for name, data in (sv_cfg_data.get(kind) or {}).items():
+            path = data['path']
+            definitions[name] = (kind, path)
+            if path not in files:
+                files.append(path)
+
+    order = {path: index for index, path in enumerate(files)}
+    dependants = {path: [] for path in files}
+    blocking = dict.fromkeys(files, 0)
+    for path in files:
+        try:
+            text = (Path(base) / path).read_text(errors="replace")
+        except OSError:
+            continue
+
+        names = set(package_reference.findall(text))
+        names.update(name for name in identifier.findall(text)
+                     if name in definitions
+                     and definitions[name][0] == "sv_interfaces")
+        for dependency in {definitions[name][1] for name in names
+                           if name in definitions}:
+            if dependency != path:
+                dependants[dependency].append(path)
+                blocking[path] += 1
+
+    ready = [order[path] for path in files if blocking[path] == 0]
+    heapq.heapify(ready)
+    ordered = []
+    while len(ordered) < len(files):
+        if not ready:
+            # Circular references, break them in parsed order
+            ready = [min(order[path] for path in files
+                         if blocking[path] > 0)]
+            blocking[files[ready[0]]] = 0
+
+        path = files[heapq.heappop(ready)]
+        ordered.append(path)
+        for dependant in dependants[path]:
+            blocking[dependant] -= 1
+            if blocking[dependant] == 0:
+                heapq.heappush(ready, order[dependant])
+
+    return ordered
+
+
+def design_files(modules: Iterable[str],
+                 sv_cfg_data,
+                 dependencies: Optional[List[str]] = None) -> List[str]:
+    """Lists the files needed to build the given modules.
+
+    Packages and interfaces come first, as modules may depend on any of them.
+    They are taken from dependencies if given, see dependency_files().
+    """
+    if dependencies is None:
+        dependencies = dependency_files(sv_cfg_data)
+
+    files_lst = list(dict.fromkeys(dependencies))
+    seen = set(files_lst)
+    sv_modules = sv_cfg_data['sv_modules']
+    for mdl_name in modules:
+        mdl = sv_modules.get(mdl_name)
+        # None happens when external modules are used, such as FPGA intrinsics
+        if mdl is not None and mdl['path'] not in seen:
+            seen.add(mdl['path'])
+            files_lst.append(mdl['path'])
+
+    return [Path(path).as_posix() for path in files_lst]
+
+
+def rtl_file_lists(top_module: str,
+                   sv_cfg_data,
+                   roots: Iterable[str] = (),
+                   base: Path = Path(),
+                   full_top: bool = True) -> Dict[str, List[str]]:
+    """File lists of the design under top_module and of each given subtree.
+
+    With full_top False, the list of top_module only has its own files. The
+    module graph and the order of packages and interfaces are only worked
+    out once for all of them.
+    """
+    tree = sv_cfg_data['sv_hierarchy'][top_module]['tree']
+    graph = design_graph(tree)
+    dependencies = dependency_files(sv_cfg_data, base)
+
+    top_modules = reachable(graph, tree) if full_top else [top_module]
+    lists = {top_module: design_files(top_modules, sv_cfg_data, dependencies)}
+    for root in roots:
+        lists[root] = design_files(reachable(graph, [root]), sv_cfg_data,
+                                   dependencies)
+
+    return lists
+
+
+def load_sv_cfg(parse_path: Path) -> dict:
+    """Loads the parser outputs found in the given directory"""
+    return {
+        f"sv_{name}": load_sv_yaml(parse_path / f"sv_{name}.yaml")
+        for name in ["modules", "hierarchy", "packages", "interfaces"]
+    }
+
+
+def load_parsed(parse_path: Path, names: Iterable[str] = PARSED_OUTPUTS) -> dict:
+    """Loads the given parser outputs, empty where they don't exist"""
+    sv_cfg = {}
+    for name in names:
+        try:
+            sv_cfg[f"sv_{name}"] = load_sv_yaml(parse_path /
+                                                 f"sv_{name}.yaml")
+        except FileNotFoundError:
+            sv_cfg[f"sv_{name}"] = {}
 
-        return modules
+    return sv_cfg
 
-    modules = get_modules(htree)
-    files_lst = []
-    for pkg_data in sv_cfg_data['sv_packages'].values():
-        if pkg_data['path'] not in files_lst:
-            files_lst.append(pkg_data['path'])
 
-    for if_data in sv_cfg_data['sv_interfaces'].values():
-        if if_data['path'] not in files_lst:
-            files_lst.append(if_data['path'])
+def create_rtlfiles_list(top_module, sv_rtl_fileslist_filename, sv_cfg_data,
+                         base: Path = Path()):
+    if not top_module in sv_cfg_data['sv_hierarchy']:
+        return f"<ERROR> '{top_module}' not found in hiearchy tree (sv_hierarchy.yaml)"
 
-    for mdl_name in modules:
-        try:
-            mdl = sv_cfg_data['sv_modules'][mdl_name]
-            if mdl['path'] not in files_lst:
-                files_lst.append(mdl['path'])
-        except KeyError:
-            # This happens when external modules are used, such as FPGA intrinsics
-            pass
-
-    posix_pathlst = [Path(path).as_posix() for path in files_lst]
+    posix_pathlst = rtl_file_lists(top_module, sv_cfg_data,
+                                   base=base)[top_module]
     with Path(sv_rtl_fileslist_filename).open('w') as fptr:
         fptr.write("\n".join(posix_pathlst))
 
@@ -115,66 +453,310 @@ def get_extra_args(args: Optional[str]) -> List:
 
 
 class SVParseWorker(Worker):
+    def __init__(self, tag: str, *args, **kwargs):
+        super().__init__(tag, *args, **kwargs)
+        # Shards run parsers in parallel, so each one is kept to be killed
+        self.popens = []
+        self.popens_lock = threading.Lock()
+        self.killed = False
+        self.threads = 1
+        self.search_dirs = []
+
     def fn(self, stdout, config: Config):
         """Run the SystemVerilog parser and save its output to the build
-        directory
+        directory.
+
+        Outputs are cached for each source file, so only new or changed
+        files are parsed again, unless nothing is cached yet. With more than
+        one thread, files are parsed in shards, one parser per thread.
         """
-        # Check if rSVParser exists first
+        self.threads = max(1, getattr(config, "num_threads", 1))
+        extra_args = get_extra_args(config.config.get("parse_args", None))
+        parse_path = config.build_path / f"sv_{config.top_module}"
+        files = source_files(config.rtl_dir_paths)
+        self.search_dirs = include_search_dirs(config.rtl_dir_paths, files)
+        keys = parse_keys(files, self.search_dirs, " ".join(extra_args))
+
+        cache = ParseCache(parse_cache_path(config.builds_path))
         try:
-            thing = sp.run(["rSVParser", "-h"], capture_output=True)
-            self.cmd_list = ["rSVParser"]
-        except FileNotFoundError:
-            return (
-                -1, "",
-                "rSVParser not found! Please ensure it is installed and in your PATH."
-            )
+            cached = cache.keys()
+            stale = [
+                path for path in files
+                if cached.get(str(path)) != keys[str(path)]
+            ]
+            if len(stale) == len(files) and self.threads == 1:
+                returncode, stdout, stderr, sv_cfg = self.parseAll(
+                    config, extra_args)
+                if returncode != 0:
+                    # Necessary, because when the parser fails, the required files often do not exist
+                    return (returncode, stdout, stderr)
+
+                sources = {path.resolve(): str(path) for path in files}
+                split = split_outputs(sv_cfg, config.working_dir_path,
+                                      sources)
+                cache.save({path: (keys[path], entries)
+                            for path, entries in split.items()})
+                cache.saveHierarchy(config.top_module,
+                                    design_structure(sv_cfg["sv_modules"]),
+                                    sv_cfg["sv_hierarchy"])
+            else:
+                self.signals.stdout.emit(
+                    self.tag,
+                    f"**** {len(stale)} of {len(files)} files changed since they were last parsed")
+                returncode, stdout, stderr = (0, "", "")
+                if stale:
+                    returncode, stdout, stderr, split = self.parseShards(
+                        config, stale, extra_args)
+                    if returncode != 0:
+                        return (returncode, stdout, stderr)
+
+                    cache.save({path: (keys[path], entries)
+                                for path, entries in split.items()})
+
+                sv_cfg = self.mergeCached(config, cache, files)
+                parse_path.mkdir(parents=True, exist_ok=True)
+                for name, outputs in sv_cfg.items():
+                    dump_sv_yaml(outputs, parse_path / f"{name}.yaml")
+
+            cache.prune(path for path in cached if not Path(path).exists())
+        finally:
+            cache.close()
+
+        # Compact hierarchy, for the design tab
+        top = config.top_module
+        if top in (sv_cfg["sv_hierarchy"] or {}):
+            dag = DesignDag.fromTree(top, sv_cfg["sv_hierarchy"][top]["tree"])
+            dag.dump(parse_path / DAG_FILE)
+
+        # Queryable copy of the design, for the design query tab
+        store = DesignStore(design_store_path(parse_path))
+        try:
+            store.replaceDesign(sv_cfg["sv_modules"])
+        finally:
+            store.close()
+
+        # Generate list of files for linter to use
+        error = create_rtlfiles_list(config.top_module,
+                                  str(config.build_path / "rtlfiles.lst"), sv_cfg,
+                                  config.working_dir_path)
+        if error:
+            return (-1, "", error)
 
-        self.cmd_list = ["rSVParser", config.top_module, "--top_module"]
-        for path in config.rtl_dir_paths:
-            self.cmd_list.extend(["--include", str(path)])
+        return (returncode, stdout, stderr)
 
-        parse_args = config.config.get("parse_args", None)
-        self.cmd_list.extend(get_extra_args(parse_args))
-        self.display_cmd()
+    def runParser(self, top_module: str, include_dirs: List[Path],
+                  extra_args: List[str], top: bool,
+                  cwd: Path) -> Tuple[int, str, str, Optional[dict]]:
+        """Parses the sources in include_dirs, printing the parser output.
 
-        try:
-            self.popen = sp.Popen(self.cmd_list,
-                                  stdout=sp.PIPE,
-                                  stderr=sp.PIPE,
-                                  cwd=config.working_dir_path)
-        except Exception as exc:
-            return (-1, "", str(exc))
-        returncode, stdout = self.emit_stdout("parser")
-        _, stderr = self.popen.communicate()
+        rSVParser is run in cwd, and its outputs are loaded from there.
+        Outputs are None if parsing failed. Parsing is done in-process
+        instead when rSVParser is installed as a Python module.
+        """
+        names = PARSED_OUTPUTS + (("hierarchy", ) if top else ())
+        options = parser_options(extra_args) if has_parser_api() else None
+        if options is not None:
+            options["top_module"] = top
+            return self.parseInProcess(top_module, include_dirs, options,
+                                       names, cwd)
+
+        cmd_list = ["rSVParser", top_module]
+        if top:
+            cmd_list.append("--top_module")
+        for path in include_dirs:
+            cmd_list.extend(["--include", str(path)])
+        cmd_list.extend(extra_args)
+
+        self.signals.stdout.emit(self.tag, f"**** {' '.join(cmd_list)}")
+        with self.popens_lock:
+            # Checked along with starting, so kill() sees every parser
+            if self.killed:
+                return (-1, "", "Parsing was killed", None)
+            try:
+                popen = sp.Popen(cmd_list,
+                                 stdout=sp.PIPE,
+                                 stderr=sp.PIPE,
+                                 cwd=cwd)
+            except FileNotFoundError:
+                return (
+                    -1, "",
+                    "rSVParser not found! Please ensure it is installed and in your PATH.",
+                    None)
+            except Exception as exc:
+                return (-1, "", str(exc), None)
+            self.popens.append(popen)
 
+        try:
+            stdout = ""
+            for line in popen.stdout:
+                line = line.decode()
+                self.signals.stdout.emit("parser", line)
+                stdout += line
+            returncode = popen.wait()
+            stderr = popen.stderr.read().decode()
+        finally:
+            with self.popens_lock:
+                self.popens.remove(popen)
         if returncode != 0:
-            # Necessary, because when the parser fails, the required files often do not exist
-            return (returncode, stdout, stderr.decode())
+            return (returncode, stdout, stderr, None)
 
-        # Copy output to build directory
-        working_parse_path = config.build_path / f"sv_{config.top_module}"
+        return (returncode, stdout, stderr,
+                load_parsed(Path(cwd) / f"sv_{top_module}", names))
 
-        # Generate list of files for linter to use
-        modules = safe_load(open(str(working_parse_path / "sv_modules.yaml")))
-        hierarchy = safe_load(
-            open(str(working_parse_path / "sv_hierarchy.yaml")))
-        packages = safe_load(open(str(working_parse_path /
-                                      "sv_packages.yaml")))
-        interfaces = safe_load(
-            open(str(working_parse_path / "sv_interfaces.yaml")))
-        sv_cfg = {
-            "sv_modules": modules,
-            "sv_hierarchy": hierarchy,
-            "sv_packages": packages,
-            "sv_interfaces": interfaces,
-        }
-        error = create_rtlfiles_list(config.top_module,
-                                  str(config.build_path / "rtlfiles.lst"), sv_cfg)
-        if error:
-            return (-1, "", error)
+    def parseInProcess(self, top_module: str, include_dirs: List[Path],
+                       options: dict, names: Iterable[str],
+                       cwd: Path) -> Tuple[int, str, str, Optional[dict]]:
+        """runParser, through the rSVParser Python module.
 
-        return (returncode, stdout, stderr.decode())
+        Outputs are only written to cwd for a top level parse, as the
+        command would have. A parse in progress can't be interrupted, so
+        if the worker is killed meanwhile its result is thrown away.
+        """
+        if self.killed:
+            return (-1, "", "Parsing was killed", None)
+        self.signals.stdout.emit(self.tag,
+                                 f"**** rSVParser {top_module} (in process)")
+
+        returncode, stderr, outputs = parse_design(top_module, include_dirs,
+                                                   options, cwd)
+        if self.killed:
+            return (-1, "", "Parsing was killed", None)
+        if returncode != 0:
+            return (returncode, "", stderr, None)
+
+        if options["top_module"]:
+            parse_path = Path(cwd) / f"sv_{top_module}"
+            parse_path.mkdir(parents=True, exist_ok=True)
+            for name, data in outputs.items():
+                dump_sv_yaml(data, parse_path / f"{name}.yaml")
+
+        return (returncode, "", stderr,
+                {f"sv_{name}": outputs[f"sv_{name}"] for name in names})
+
+    def kill(self, really: bool):
+        """Slot to kill worker, and every parser it is running"""
+        if really is True:
+            with self.popens_lock:
+                self.killed = True
+                for popen in self.popens:
+                    popen.kill()
+
+    def parseAll(self, config: Config,
+                 extra_args: List[str]) -> Tuple[int, str, str, Optional[dict]]:
+        """Parses the whole design into the build directory"""
+        return self.runParser(config.top_module, config.rtl_dir_paths,
+                              extra_args, True, config.working_dir_path)
+
+    def parseShards(self, config: Config, files: List[Path],
+                    extra_args: List[str]) -> Tuple[int, str, str, dict]:
+        """Parses the given files in parallel shards, see parseFiles"""
+        shards = parse_shards(files, self.threads)
+        if len(shards) > 1:
+            self.signals.stdout.emit(
+                self.tag, f"**** Parsing in {len(shards)} shards")
+
+        stage = config.build_path / "parse_stage"
+        with ThreadPoolExecutor(len(shards)) as executor:
+            results = list(
+                executor.map(
+                    lambda index: self.parseFiles(
+                        config, shards[index], extra_args, stage / str(index)),
+                    range(len(shards))))
+        shutil.rmtree(str(stage), ignore_errors=True)
+
+        returncode = next((result[0] for result in results if result[0] != 0),
+                          0)
+        split = {}
+        for result in results:
+            split.update(result[3])
+
+        return (returncode, "".join(result[1] for result in results),
+                "".join(result[2] for result in results), split)
+
+    def parseFiles(self, config: Config, files: List[Path],
+                   extra_args: List[str],
+                   stage: Path) -> Tuple[int, str, str, dict]:
+        """Parses only the given files, returning their outputs by file.
+
+        The files, and the files they include, are copied to a staging
+        directory laid out like the include directories, which the parser
+        is pointed at instead. Every staged directory is passed as a
+        preprocessor include, as the directories of all the sources are in a
+        full parse.
+        """
+        if stage.exists():
+            shutil.rmtree(str(stage))
+
+        include_dirs = [Path(path).resolve() for path in config.rtl_dir_paths]
+        staged = {}
+        sources = {}
+        pending = [(path.resolve(), str(path)) for path in files]
+        while pending:
+            real, source = pending.pop()
+            if real in staged:
+                if source is not None:
+                    sources[staged[real].resolve()] = source
+                continue
+
+            for index, include_dir in enumerate(include_dirs):
+                try:
+                    relative = real.relative_to(include_dir)
+                    stage_path = stage / "src" / str(index) / relative
+                    break
+                except ValueError:
+                    continue
+            else:
+                stage_path = stage / "src" / "ext" / str(len(staged)) / real.name
+
+            stage_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(str(real), str(stage_path))
+            staged[real] = stage_path
+            if source is not None:
+                sources[stage_path.resolve()] = source
+
+            _, includes = scan_source(real, self.search_dirs)
+            pending.extend((include, None) for include in includes)
+
+        stage_dirs = []
+        for directory in sorted((stage / "src").iterdir()):
+            if directory.name == "ext":
+                stage_dirs.extend(sorted(directory.iterdir()))
+            else:
+                stage_dirs.append(directory)
+
+        pp_includes = []
+        for directory in sorted({path.parent for path in staged.values()}):
+            pp_includes.extend(["--pp-includes", str(directory.resolve())])
 
+        try:
+            returncode, stdout, stderr, sv_cfg = self.runParser(
+                config.top_module, stage_dirs, extra_args + pp_includes, False,
+                stage)
+            if returncode != 0:
+                return (returncode, stdout, stderr, {})
+
+            return (returncode, stdout, stderr,
+                    split_outputs(sv_cfg, stage, sources))
+        finally:
+            shutil.rmtree(str(stage), ignore_errors=True)
+
+    def mergeCached(self, config: Config, cache: ParseCache,
+                    files: List[Path]) -> dict:
+        """Builds the parser outputs of the design from the cache"""
+        paths = [str(path) for path in files]
+        parsed = cache.load(paths)
+        sv_cfg = merge_outputs(parsed[path] for path in paths if path in parsed)
+
+        # The hierarchy only changes along with which modules are instantiated
+        top = config.top_module
+        structure = design_structure(sv_cfg["sv_modules"])
+        hierarchy = cache.loadHierarchy(top, structure)
+        if hierarchy is None:
+            # Not cached, as it would be saved expanded
+            hierarchy = {top: {"tree": {top: module_tree(top, sv_cfg["sv_modules"])}}}
+        sv_cfg["sv_hierarchy"] = hierarchy
+
+        return sv_cfg
 
 
 class CopyOutputsDialog(QtWidgets.QDialog):
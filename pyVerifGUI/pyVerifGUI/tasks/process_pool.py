@@ -0,0 +1,217 @@
+###############################################################################
+# @file pyVerifGUI/tasks/process_pool.py
+# @package pyVerifGUI.tasks.process_pool
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Process pool for CPU-heavy Python work of tasks
+##############################################################################
+"""Process pool for CPU-heavy Python work
+
+Workers in a QThreadPool still share the GUI's GIL, so pure Python work in
+them (parsing, hashing, serializing) stalls the Qt event loop. Jobs submitted
+here run in separate processes instead, and only their (compact) results come
+back to the GUI process.
+
+Jobs can also report progress while they run, e.g. to stream results, by
+calling report(). Progress is passed to the callback the job was submitted
+with, in a thread of the GUI process.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+import itertools
+import multiprocessing
+import threading
+import traceback
+
+# Set in pool processes, where progress is sent to and the current job
+_progress = None
+_job = None
+
+
+def _init_worker(progress):
+    global _progress
+    _progress = progress
+
+
+def _run_job(job: int, fn: Callable, args: tuple):
+    """Runs a job in a pool process, then marks the end of its progress"""
+    global _job
+    _job = job
+    try:
+        return fn(*args)
+    finally:
+        _job = None
+        _progress.put((job, None))
+
+
+def report(item: Any):
+    """Sends progress from a running job to its callback.
+
+    Does nothing outside of a pool process, so jobs can also be run directly.
+    """
+    if _progress is not None and _job is not None:
+        _progress.put((_job, item))
+
+
+class _Job:
+    """A submitted job, finished once it has run and all progress is handled"""
+    def __init__(self, progress: Optional[Callable[[Any], None]]):
+        self.progress = progress
+        self.future = Future()
+        self.result = None
+        self.reported = False
+        self.lock = threading.Lock()
+
+    def executed(self, result: Future):
+        """Called when the job has run"""
+        with self.lock:
+            self.result = result
+            # A crashed process never ends its progress
+            done = self.reported or result.exception() is not None
+        if done:
+            self.finish()
+
+    def progressEnded(self):
+        """Called when all progress of the job has been handled"""
+        with self.lock:
+            self.reported = True
+            done = self.result is not None
+        if done:
+            self.finish()
+
+    def finish(self):
+        if self.future.done():
+            return
+
+        exception = self.result.exception()
+        if exception is not None:
+            self.future.set_exception(exception)
+        else:
+            self.future.set_result(self.result.result())
+
+
+class ProcessPool:
+    """Pool of worker processes, see the module description.
+
+    Processes are spawned rather than forked, as forking a process running
+    Qt and other threads is not safe.
+    """
+    def __init__(self, workers: int):
+        context = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self.progress = context.SimpleQueue()
+        self.executor = ProcessPoolExecutor(workers,
+                                            mp_context=context,
+                                            initializer=_init_worker,
+                                            initargs=(self.progress, ))
+        self.jobs = {}
+        self.job_ids = itertools.count()
+        self.lock = threading.Lock()
+        # Set once a process died, after which the executor runs nothing
+        self.broken = False
+
+        self.reader = threading.Thread(target=self._readProgress, daemon=True)
+        self.reader.start()
+
+    def submit(self,
+               fn: Callable,
+               *args,
+               progress: Optional[Callable[[Any], None]] = None) -> Future:
+        """Runs fn(*args) in a pool process.
+
+        fn and its arguments must be picklable, i.e. fn must be a module
+        level function. Anything fn passes to report() is given to progress.
+        The returned future completes after the last progress is handled.
+        """
+        job_id = next(self.job_ids)
+        job = _Job(progress)
+        with self.lock:
+            self.jobs[job_id] = job
+
+        try:
+            future = self.executor.submit(_run_job, job_id, fn, args)
+        except BrokenProcessPool:
+            self.broken = True
+            with self.lock:
+                self.jobs.pop(job_id, None)
+            raise
+
+        future.add_done_callback(self._executed)
+        future.add_done_callback(job.executed)
+        return job.future
+
+    def _executed(self, result: Future):
+        if isinstance(result.exception(), BrokenProcessPool):
+            self.broken = True
+
+    def busy(self) -> bool:
+        """Whether any job is still running"""
+        with self.lock:
+            return any(not job.future.done() for job in self.jobs.values())
+
+    def _readProgress(self):
+        """Hands progress from pool processes to job callbacks"""
+        while True:
+            job_id, item = self.progress.get()
+            if job_id is None:
+                break
+
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if item is None:
+                    self.jobs.pop(job_id, None)
+            if job is None:
+                continue
+
+            if item is None:
+                job.progressEnded()
+            elif job.progress is not None:
+                try:
+                    job.progress(item)
+                except Exception:
+                    traceback.print_exc()
+
+    def shutdown(self):
+        """Waits for running jobs, then stops every process"""
+        self.executor.shutdown()
+        self.progress.put((None, None))
+        self.reader.join()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def process_pool(workers: int) -> ProcessPool:
+    """Returns the pool shared by every task.
+
+    The pool is resized to the given number of workers when it is idle,
+    otherwise it is shared as it is. A pool broken by a dead process is
+    replaced, as it would fail every job from then on.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (_pool.broken or _pool.workers != workers
+                                  and not _pool.busy()):
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPool(max(1, workers))
+
+        return _pool
+
+
+def shutdown_pool():
+    """Stops the shared pool, if it was ever started"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
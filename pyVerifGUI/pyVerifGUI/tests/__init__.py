@@ -0,0 +1,12 @@
+###############################################################################
+# @file pyVerifGUI/tests/__init__.py
+# @package pyVerifGUI.tests
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the parts of pyVerifGUI that run without a GUI
+##############################################################################
@@ -0,0 +1,78 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_design_dag.py
+# @package pyVerifGUI.tests.test_design_dag
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the design hierarchy graph
+##############################################################################
+
+from pyVerifGUI.parsers.design_dag import (DAG_FILE, DesignDag, design_graph,
+                                           reachable)
+from pyVerifGUI.tasks.parse import module_tree
+
+SV_MODULES = {
+    "top": {"submodules": {"a": "u_a", "b": "u_b"}},
+    "a": {"submodules": {"c": "u_c"}},
+    "b": {"submodules": {"c": "u_c", "IBUF": "u_i"}},
+    "c": {"submodules": {}},
+}
+TREE = {"top": {"a": {"c": {}}, "b": {"c": {}, "IBUF": {}}}}
+GRAPH = {
+    "top": ["a", "b"],
+    "a": ["c"],
+    "b": ["c", "IBUF"],
+    "c": [],
+    "IBUF": [],
+}
+
+
+def test_module_tree():
+    tree = module_tree("top", SV_MODULES)
+    assert tree == TREE["top"]
+    # Every instance of a module shares its subtree
+    assert tree["a"]["c"] is tree["b"]["c"]
+
+
+def test_module_tree_recursive():
+    sv_modules = {
+        "top": {"submodules": {"node": "u_n"}},
+        "node": {"submodules": {"node": "u_n", "leaf": "u_l"}},
+        "leaf": {"submodules": {"top": "u_t"}},
+    }
+
+    # Recursive instantiations end in an empty tree
+    assert module_tree("top", sv_modules) == {
+        "node": {"node": {}, "leaf": {"top": {}}}
+    }
+
+
+def test_graph():
+    assert design_graph(TREE) == GRAPH
+    assert reachable(GRAPH, ["b", "a"]) == ["b", "c", "IBUF", "a"]
+    assert reachable(GRAPH, ["missing"]) == ["missing"]
+
+
+def test_dag(tmp_path):
+    dag = DesignDag.fromTree("top", TREE)
+    assert dag.modules == GRAPH
+    assert dag.children("b") == ["c", "IBUF"]
+    assert dag.children("IBUF") == []
+    assert dag.children("missing") == []
+    assert dag.below(["a"]) == ["a", "c"]
+
+    # Built from the parsed modules, unparsed ones instantiate nothing
+    assert DesignDag.fromModules("top", SV_MODULES).modules == GRAPH
+    assert DesignDag.fromModules("a", SV_MODULES).modules == {
+        "a": ["c"],
+        "c": []
+    }
+
+    dag.dump(tmp_path / DAG_FILE)
+    loaded = DesignDag.load(tmp_path / DAG_FILE)
+    assert loaded.top == "top"
+    assert loaded.modules == GRAPH
@@ -0,0 +1,90 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_design_index.py
+# @package pyVerifGUI.tests.test_design_index
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of module lookup and search in a parsed design
+##############################################################################
+
+from pyVerifGUI.parsers.design_dag import DesignDag
+from pyVerifGUI.parsers.design_index import DesignIndex
+
+SV_MODULES = {
+    "top": {"path": "rtl/top.sv"},
+    "a": {"path": "rtl/a.sv"},
+    "b": {"path": "rtl/b.sv"},
+    "c": {"path": "lib/c.sv"},
+}
+# c is instantiated under a and b, IBUF wasn't parsed
+DAG = DesignDag("top", {
+    "top": ["a", "b"],
+    "a": ["c"],
+    "b": ["c", "IBUF"],
+    "c": [],
+    "IBUF": [],
+})
+
+
+def test_lookup():
+    index = DesignIndex(DAG, SV_MODULES)
+
+    assert index.definition("c") == {"path": "lib/c.sv"}
+    assert index.definition("IBUF") is None
+    assert index.parents["c"] == ["a", "b"]
+    assert index.parents["top"] == []
+    # Submodules come before the modules instantiating them
+    assert index.order == ["c", "a", "IBUF", "b", "top"]
+
+
+def test_instances():
+    index = DesignIndex(DAG, SV_MODULES)
+
+    assert {name: index.instanceCount(name) for name in DAG.modules} == {
+        "top": 1,
+        "a": 1,
+        "b": 1,
+        "c": 2,
+        "IBUF": 1,
+    }
+    assert index.instanceCount("missing") == 0
+    assert list(index.instancePaths("c")) == [["top", "a", "c"],
+                                             ["top", "b", "c"]]
+    assert list(index.instancePaths("top")) == [["top"]]
+    assert list(index.instancePaths("missing")) == []
+
+
+def test_recursive():
+    index = DesignIndex(
+        DesignDag("top", {
+            "top": ["node"],
+            "node": ["node", "leaf"],
+            "leaf": [],
+        }))
+
+    assert index.order == ["leaf", "node", "top"]
+    assert index.instanceCount("node") == 1
+    assert index.instanceCount("leaf") == 1
+    assert list(index.instancePaths("leaf")) == [["top", "node", "leaf"]]
+
+
+def test_search():
+    index = DesignIndex(
+        DesignDag("top", {
+            "top": ["FIFO_ctrl", "axi_fifo", "sync_fifo", "fast_io"],
+            "fifo": [],
+        }))
+
+    # Prefixes first, then names containing the text, then its characters
+    assert index.search("fifo") == [
+        "fifo", "FIFO_ctrl", "axi_fifo", "sync_fifo"
+    ]
+    assert index.search("fo") == ["axi_fifo", "fifo", "FIFO_ctrl",
+                                  "sync_fifo", "fast_io"]
+    assert index.search("fifo", limit=2) == ["fifo", "FIFO_ctrl"]
+    assert index.search("") == []
+    assert index.search("zz") == []
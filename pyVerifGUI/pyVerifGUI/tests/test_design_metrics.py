@@ -0,0 +1,78 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_design_metrics.py
+# @package pyVerifGUI.tests.test_design_metrics
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the per-module design metrics
+##############################################################################
+
+from pyVerifGUI.parsers.design_dag import DesignDag
+from pyVerifGUI.parsers.design_index import DesignIndex
+from pyVerifGUI.parsers.design_metrics import DesignMetrics, ModuleMetrics
+
+SV_MODULES = {
+    "top": {"path": "rtl/top.sv"},
+    "a": {"path": "rtl/a.sv"},
+    "b": {"path": "rtl/b.sv"},
+    "c": {"path": "lib/c.sv"},
+}
+# c is instantiated under a and b, IBUF wasn't parsed
+DAG = DesignDag("top", {
+    "top": ["a", "b"],
+    "a": ["c"],
+    "b": ["c", "IBUF"],
+    "c": [],
+    "IBUF": [],
+})
+
+
+def test_metrics():
+    metrics = DesignMetrics(DesignIndex(DAG, SV_MODULES))
+
+    # Subtree sizes count the instances of the expanded hierarchy
+    assert metrics.module("top") == ModuleMetrics("top", 1, 6, 2, 0, 2, 4)
+    assert metrics.module("a") == ModuleMetrics("a", 1, 2, 1, 1, 1, 2)
+    assert metrics.module("b") == ModuleMetrics("b", 1, 3, 1, 1, 2, 2)
+    assert metrics.module("c") == ModuleMetrics("c", 2, 1, 0, 2, 0, 1)
+    # Unparsed modules have no files
+    assert metrics.module("IBUF") == ModuleMetrics("IBUF", 1, 1, 0, 1, 0, 0)
+    assert metrics.module("missing") is None
+
+
+def test_files():
+    metrics = DesignMetrics(DesignIndex(DAG, SV_MODULES))
+
+    assert sorted(metrics.subtreeFiles("b")) == ["lib/c.sv", "rtl/b.sv"]
+    assert sorted(metrics.subtreeFiles("top")) == [
+        "lib/c.sv", "rtl/a.sv", "rtl/b.sv", "rtl/top.sv"
+    ]
+    assert metrics.subtreeFiles("IBUF") == []
+    assert metrics.subtreeFiles("missing") == []
+
+
+def test_largest():
+    metrics = DesignMetrics(DesignIndex(DAG, SV_MODULES))
+
+    assert [m.name for m in metrics.largest(2)] == ["top", "b"]
+    assert len(metrics.largest(10)) == 5
+
+
+def test_recursive():
+    metrics = DesignMetrics(
+        DesignIndex(
+            DesignDag("top", {
+                "top": ["node"],
+                "node": ["node", "leaf"],
+                "leaf": [],
+            })))
+
+    # The recursive instantiation is left out of the subtree
+    assert metrics.module("node").subtree_size == 2
+    assert metrics.module("node").depth == 1
+    assert metrics.module("node").fan_in == 2
+    assert metrics.module("top").subtree_size == 3
@@ -0,0 +1,122 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_design_store.py
+# @package pyVerifGUI.tests.test_design_store
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the queryable design database
+##############################################################################
+
+import pytest
+
+from pyVerifGUI.db import DesignStore, design_store_path
+from pyVerifGUI.db.design import (DesignInstance, DesignModule, DesignParam,
+                                  DesignPort, port_width)
+
+SV_MODULES = {
+    "axi_fifo": {
+        "path": "rtl/axi_fifo.sv",
+        "parameters": [["", "", "", "", "DEPTH", "", "16"]],
+        "ports": [
+            ["input", "logic", "", "", "clk", ""],
+            ["input", "logic", "", "[31:0]", "axi_wdata", ""],
+            ["output", "logic", "", "[WIDTH-1:0]", "axi_rdata", ""],
+        ],
+        "submodules": {"fifo": "u_fifo"},
+    },
+    "fifo": {
+        "path": "rtl/fifo.sv",
+        "parameters": [["", "", "", "[7:0]", "WIDTH", "", "8"]],
+        "ports": [["input", "wire", "", "[1:0][7:0]", "data", ""]],
+        "submodules": {},
+    },
+    "top": {
+        "path": "rtl/top.sv",
+        "submodules": {"axi_fifo": "u_axi", "fifo": "u_Fifo", "IBUF": None},
+    },
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DesignStore(design_store_path(tmp_path))
+    store.replaceDesign(SV_MODULES)
+    yield store
+    store.close()
+
+
+def test_port_width():
+    assert port_width("") == 1
+    assert port_width(None) == 1
+    assert port_width("[7:0]") == 8
+    assert port_width("[0:7]") == 8
+    assert port_width(" [1:0] [7:0] ") == 16
+    assert port_width("[WIDTH-1:0]") is None
+    assert port_width("[7:0] x") is None
+
+
+def test_modules(store):
+    assert store.modules() == [
+        DesignModule("axi_fifo", "rtl/axi_fifo.sv"),
+        DesignModule("fifo", "rtl/fifo.sv"),
+        DesignModule("top", "rtl/top.sv"),
+    ]
+    assert [m.name for m in store.modules("*fifo*")] == ["axi_fifo", "fifo"]
+    # Globs are case sensitive
+    assert store.modules("FIFO") == []
+    assert store.modules("t?p") == [DesignModule("top", "rtl/top.sv")]
+
+
+def test_ports(store):
+    assert store.ports(name="axi_*") == [
+        DesignPort("axi_fifo", "axi_wdata", "input", "logic", "[31:0]", 32),
+        DesignPort("axi_fifo", "axi_rdata", "output", "logic", "[WIDTH-1:0]",
+                   None),
+    ]
+    assert store.ports(name="axi_*", direction="input") == [
+        DesignPort("axi_fifo", "axi_wdata", "input", "logic", "[31:0]", 32)
+    ]
+    assert store.ports("fifo") == [
+        DesignPort("fifo", "data", "input", "wire", "[1:0][7:0]", 16)
+    ]
+    assert store.modulesWithPort("*") == ["axi_fifo", "fifo"]
+    assert store.modulesWithPort("clk", "output") == []
+
+
+def test_params(store):
+    assert store.params() == [
+        DesignParam("axi_fifo", "DEPTH", "", "16"),
+        DesignParam("fifo", "WIDTH", "[7:0]", "8"),
+    ]
+    assert store.params(name="W*") == [
+        DesignParam("fifo", "WIDTH", "[7:0]", "8")
+    ]
+
+
+def test_instances(store):
+    assert store.instances("fifo") == [
+        DesignInstance("axi_fifo", "fifo", "u_fifo"),
+        DesignInstance("top", "fifo", "u_Fifo"),
+    ]
+    # Instances without a name still match any name
+    assert store.instances(parent="top") == [
+        DesignInstance("top", "IBUF", None),
+        DesignInstance("top", "axi_fifo", "u_axi"),
+        DesignInstance("top", "fifo", "u_Fifo"),
+    ]
+    assert store.instances(name="u_f*") == [
+        DesignInstance("axi_fifo", "fifo", "u_fifo")
+    ]
+
+
+def test_replace(store):
+    store.replaceDesign({"fifo": None})
+
+    assert store.modules() == [DesignModule("fifo", None)]
+    assert store.ports() == []
+    assert store.params() == []
+    assert store.instances() == []
@@ -0,0 +1,91 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_diff.py
+# @package pyVerifGUI.tests.test_diff
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of diffing the messages of two builds
+##############################################################################
+
+from pyVerifGUI.gui.models import MessageTable
+from pyVerifGUI.gui.models.diff import (DiffRecord, canonical_fields,
+                                        diff_messages)
+
+
+def message(row: int, text: str = "Signal is not used", **fields) -> dict:
+    message = {
+        "file": "rtl/a.sv",
+        "row": row,
+        "column": 1,
+        "type": "UNUSED",
+        "text": text,
+        "text_hash": row,
+        "legitimate": False,
+    }
+    message.update(fields)
+    return message
+
+
+CURRENT = [message(1), message(2, "changed"), message(3), message(3)]
+COMPARE = [message(1), message(2), message(4), message(1, diffType="add")]
+
+
+def rows(records):
+    return [(record["row"], record["text"]) for record in records]
+
+
+def test_diff():
+    diff = diff_messages(CURRENT, COMPARE)
+
+    assert diff.unchanged == [CURRENT[0]]
+    assert rows(diff.added) == [(2, "changed"), (3, "Signal is not used"),
+                                (3, "Signal is not used")]
+    assert rows(diff.removed) == [(2, "Signal is not used"),
+                                  (4, "Signal is not used")]
+    assert all(record["diffType"] == "add" for record in diff.added)
+    assert all(record["diffType"] == "remove" for record in diff.removed)
+    # Messages aren't modified
+    assert "diffType" not in CURRENT[1]
+    assert diff.added[0].message is CURRENT[1]
+
+
+def test_diff_key():
+    diff = diff_messages(CURRENT, COMPARE, key=lambda m: m["row"])
+
+    assert diff.unchanged == CURRENT[:2]
+    assert rows(diff.added) == [(3, "Signal is not used")] * 2
+    assert rows(diff.removed) == [(4, "Signal is not used")]
+
+
+def test_diff_tables():
+    # Tables are compared on the same fields as the messages they hold
+    current = MessageTable.fromMessages(CURRENT)
+    compare = MessageTable.fromMessages(COMPARE)
+    diff = diff_messages(current, compare)
+
+    assert diff.unchanged == [current[0]]
+    assert rows(diff.added) == rows(diff_messages(CURRENT, COMPARE).added)
+    assert rows(diff.removed) == rows(diff_messages(CURRENT, COMPARE).removed)
+
+
+def test_canonical_fields():
+    assert canonical_fields([message(1, id=4, diffType="add")],
+                            [message(2, owner="me")]) == [
+                                "column", "file", "legitimate", "owner", "row",
+                                "text", "text_hash", "type"
+                            ]
+
+
+def test_record():
+    record = DiffRecord("remove", message(1))
+
+    assert record["diffType"] == "remove"
+    assert record.get("diffType") == "remove"
+    assert record["row"] == 1
+    assert record.get("owner", "nobody") == "nobody"
+    assert "diffType" in record
+    assert "owner" not in record
@@ -0,0 +1,174 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_lint.py
+# @package pyVerifGUI.tests.test_lint
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of splitting the design into lint shards, and of what their
+#        cached results depend on
+##############################################################################
+
+import types
+
+import pytest
+
+from pyVerifGUI.parsers.sv_outputs import dump_sv_yaml
+from pyVerifGUI.tasks.lint import (LinterWorker, LintShard, lint_shards,
+                                   module_stub, verilator_paths)
+
+# top instantiates a, which instantiates c, and b. c is also under b.
+MODULES = {
+    "top": {"path": "../rtl/top.sv", "submodules": {"a": "u_a", "b": "u_b"}},
+    "a": {"path": "../rtl/a.sv", "submodules": {"c": "u_c"}},
+    "b": {"path": "../rtl/b.sv", "submodules": {"c": "u_c", "IBUF": "u_i"}},
+    "c": {
+        "path": "../rtl/c.sv",
+        "submodules": {},
+        "parameters": [["", "", "", "", "WIDTH", "", "8"]],
+        "ports": [["input", "logic", "", "[WIDTH-1:0]", "d", ""],
+                  ["output", "", "", "", "q", ""]],
+    },
+}
+TREE = {"a": {"c": {}}, "b": {"c": {}, "IBUF": {}}}
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Build directory of a parsed design"""
+    build = tmp_path / "build"
+    parse_path = build / "sv_top"
+    parse_path.mkdir(parents=True)
+    (tmp_path / "rtl").mkdir()
+    for name, module in MODULES.items():
+        (tmp_path / "rtl" / f"{name}.sv").write_text(
+            f"module {name};\nendmodule\n")
+
+    dump_sv_yaml(MODULES, parse_path / "sv_modules.yaml")
+    dump_sv_yaml({"top": {"tree": {"top": TREE}}},
+                 parse_path / "sv_hierarchy.yaml")
+    dump_sv_yaml({}, parse_path / "sv_packages.yaml")
+    dump_sv_yaml({}, parse_path / "sv_interfaces.yaml")
+
+    return types.SimpleNamespace(top_module="top",
+                                 build_path=build,
+                                 working_dir_path=build,
+                                 num_threads=2,
+                                 config={"lint_sharded": True})
+
+
+def test_lint_shards():
+    assert lint_shards(TREE) == ["b", "a"]
+    assert lint_shards({"a": {}, "b": {"c": {"d": {}}}}) == ["b", "a"]
+
+
+def test_module_stub():
+    assert module_stub("c", MODULES["c"]) == (
+        "module c #(\n"
+        "    parameter WIDTH = 8\n"
+        ") (\n"
+        "    input logic [WIDTH-1:0] d,\n"
+        "    output q\n"
+        ");\n"
+        "endmodule\n")
+    assert module_stub("a", MODULES["a"]) == "module a;\nendmodule\n"
+
+
+def test_plan_shards(config):
+    worker = LinterWorker("lint", config)
+    rtlfiles = config.build_path / "rtlfiles.lst"
+    shards = worker.planShards(config, rtlfiles)
+
+    assert [shard.top for shard in shards] == ["top", "b", "a"]
+    top, b, a = shards
+
+    # The top module is linted against stubs of its subtrees, or the full
+    # design if those don't work
+    stubs = config.build_path / "lint_shards" / "top_stubs.sv"
+    assert top.files(top.file_list) == ["../rtl/top.sv", stubs.as_posix()]
+    assert top.stubs == stubs
+    assert top.fallback == rtlfiles
+    assert stubs.read_text() == (module_stub("b", MODULES["b"]) +
+                                 module_stub("a", MODULES["a"]))
+
+    assert b.files(b.file_list) == ["../rtl/b.sv", "../rtl/c.sv"]
+    assert a.files(a.file_list) == ["../rtl/a.sv", "../rtl/c.sv"]
+    assert b.stubs is None and b.fallback is None
+
+    top.useFallback()
+    assert top.file_list == rtlfiles
+    assert top.stubs is None
+
+
+def test_plan_unsplittable(config, tmp_path):
+    worker = LinterWorker("lint", config)
+    dump_sv_yaml({"top": {"tree": {"top": {}}}},
+                 config.build_path / "sv_top" / "sv_hierarchy.yaml")
+    assert worker.planShards(config, tmp_path / "rtlfiles.lst") is None
+
+    config.top_module = "missing"
+    assert worker.planShards(config, tmp_path / "rtlfiles.lst") is None
+
+
+def test_verilator_paths():
+    args = "+incdir+inc+../common -Igen -y lib  -v cells.v -Wall -y".split(" ")
+    assert verilator_paths(args) == (["inc", "../common", "gen", "lib"],
+                                     ["lib"], ["cells.v"])
+
+
+def fingerprint(config, version: str = "Verilator 4.1") -> str:
+    """Fingerprint of the b shard, as seen by a new lint run"""
+    worker = LinterWorker("lint", config)
+    shard = LintShard("b", config.build_path / "b.lst")
+    return worker.fingerprint(config, version, shard, shard.file_list)
+
+
+@pytest.fixture
+def sources(config, tmp_path):
+    """Sources of the b shard, including files and a library"""
+    rtl = tmp_path / "rtl"
+    (rtl / "inc").mkdir()
+    (rtl / "lib").mkdir()
+    (rtl / "b.sv").write_text('`include "defs.svh"\nmodule b;\nendmodule\n')
+    (rtl / "inc" / "defs.svh").write_text('`include "width.svh"\n')
+    (rtl / "inc" / "width.svh").write_text("`define W 8\n")
+    (rtl / "lib" / "cell.v").write_text("module cell;\nendmodule\n")
+    (config.build_path / "b.lst").write_text("../rtl/b.sv\n../rtl/c.sv\n")
+    config.config["verilator_args"] = "+incdir+../rtl/inc -y ../rtl/lib"
+
+    return rtl
+
+
+def test_fingerprint(config, sources):
+    first = fingerprint(config)
+    assert fingerprint(config) == first
+
+    changes = [
+        (sources / "c.sv", "module c;\nlogic x;\nendmodule\n"),
+        # Included files, also those included by an included file
+        (sources / "inc" / "width.svh", "`define W 16\n"),
+        (sources / "inc" / "defs.svh", '`include "width.svh"\n// x\n'),
+        # Library files verilator may read modules from
+        (sources / "lib" / "cell.v", "module cell;\nlogic y;\nendmodule\n"),
+    ]
+    seen = {first}
+    for path, text in changes:
+        path.write_text(text)
+        changed = fingerprint(config)
+        assert changed not in seen, path
+        seen.add(changed)
+
+    # Unrelated files don't matter
+    (sources / "top.sv").write_text("module top;\nlogic z;\nendmodule\n")
+    assert fingerprint(config) == changed
+
+
+def test_fingerprint_command(config, sources):
+    first = fingerprint(config)
+    assert fingerprint(config, "Verilator 4.2") != first
+
+    config.config["verilator_args"] += " -Wno-fatal"
+    assert fingerprint(config) != first
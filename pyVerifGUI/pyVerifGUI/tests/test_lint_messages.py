@@ -0,0 +1,131 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_lint_messages.py
+# @package pyVerifGUI.tests.test_lint_messages
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the verilator message parsers
+##############################################################################
+
+import pytest
+
+from pyVerifGUI.parsers.lint_messages import (LintRecord, legacy_hashes,
+                                              legacy_text_hash,
+                                              migrate_waiver_hash,
+                                              parse_verilator_output,
+                                              parse_verilator_stream,
+                                              text_hash)
+
+OUTPUT = """\
+%Warning-UNUSED: rtl/a.sv:3:5: Signal is not used: 'x'
+                               : ... In instance top
+    3 | logic x;
+      |       ^
+%Warning-WIDTH: rtl/b.sv:7: Operator ASSIGN expects 8 bits
+%Error: rtl/c.sv:1:1: syntax error, unexpected endmodule
+%Warning-UNUSED: rtl/a.sv:9:5: Signal is not used: 'x'
+%Error: Exiting due to 3 warning(s)
+"""
+
+RECORDS = [
+    LintRecord("rtl/a.sv", 3, 5, "UNUSED", "Signal is not used: 'x'",
+               text_hash("Signal is not used: 'x'"), False),
+    LintRecord("rtl/b.sv", 7, 0, "WIDTH", "Operator ASSIGN expects 8 bits",
+               text_hash("Operator ASSIGN expects 8 bits"), False),
+    LintRecord("rtl/c.sv", 1, 1, "Parse Error",
+               "syntax error, unexpected endmodule",
+               text_hash("syntax error, unexpected endmodule"), True),
+    LintRecord("rtl/a.sv", 9, 5, "UNUSED", "Signal is not used: 'x'",
+               text_hash("Signal is not used: 'x'"), False),
+    LintRecord(None, 0, 0, "", "Exiting due to 3 warning(s)", 0, True),
+]
+
+
+def test_stream():
+    assert list(parse_verilator_stream([OUTPUT])) == RECORDS
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_stream_pieces(size):
+    # Output read in pieces, splitting lines, parses the same
+    pieces = [OUTPUT[i:i + size] for i in range(0, len(OUTPUT), size)]
+    assert list(parse_verilator_stream(pieces, block_size=16)) == RECORDS
+
+
+def test_stream_unterminated():
+    records = list(parse_verilator_stream(["%Warning-WIDTH: a.sv:1:2: wide"]))
+    assert records == [
+        LintRecord("a.sv", 1, 2, "WIDTH", "wide", text_hash("wide"), False)
+    ]
+
+
+def test_stream_interned():
+    records = list(parse_verilator_stream(OUTPUT.splitlines(True)))
+    assert records[0].file is records[3].file
+    assert records[0].text is records[3].text
+
+
+def test_output():
+    messages, errors = parse_verilator_output(OUTPUT)
+
+    assert errors == ["Exiting due to 3 warning(s)"]
+    assert len(messages) == 4
+    assert messages[0] == {
+        "file": "rtl/a.sv",
+        "row": 3,
+        "column": 5,
+        "text": "Signal is not used: 'x'",
+        "text_hash": RECORDS[0].text_hash,
+        "type": "UNUSED",
+        "waiver": False,
+        "comment": "N/A",
+        "legitimate": False,
+        "error": False,
+    }
+    assert messages[2]["error"] is True
+
+
+def test_text_hash():
+    assert text_hash("abc") == text_hash("abc")
+    assert text_hash("abc") != text_hash("abd")
+    assert 0 <= text_hash("abc") < 1 << 64
+
+
+def waiver(text: str, text_hash: int, file: str = "rtl/a.sv") -> dict:
+    return {"file": file, "row": 3, "text": text, "text_hash": text_hash}
+
+
+@pytest.mark.parametrize("legacy", [
+    legacy_text_hash("unused"),
+    legacy_text_hash("unused") & ((1 << 64) - 1),
+])
+def test_migrate_own_text(legacy):
+    old = waiver("unused", legacy)
+    assert migrate_waiver_hash(old)
+    assert old["text_hash"] == text_hash("unused")
+
+    # Already migrated
+    assert not migrate_waiver_hash(old)
+    assert old["text_hash"] == text_hash("unused")
+
+
+def test_migrate_other_message():
+    # An updated orphan keeps the text it was written for, but the hash of
+    # the message it now waives
+    hashes = legacy_hashes([("rtl/a.sv", "new text"), ("rtl/b.sv", "other")])
+    old = waiver("old text", legacy_text_hash("new text"))
+    assert migrate_waiver_hash(old, hashes)
+    assert old["text_hash"] == text_hash("new text")
+
+    folded = waiver("old text", legacy_text_hash("new text") & ((1 << 64) - 1))
+    assert migrate_waiver_hash(folded, hashes)
+    assert folded["text_hash"] == text_hash("new text")
+
+    # Hashes are only looked up in the waiver's file
+    elsewhere = waiver("old text", legacy_text_hash("other"))
+    assert not migrate_waiver_hash(elsewhere, hashes)
+    assert elsewhere["text_hash"] == legacy_text_hash("other")
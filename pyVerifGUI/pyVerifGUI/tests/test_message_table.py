@@ -0,0 +1,138 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_message_table.py
+# @package pyVerifGUI.tests.test_message_table
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of MessageTable, and of message models holding one
+##############################################################################
+
+import pytest
+
+from pyVerifGUI.gui.models import MessageTable
+from pyVerifGUI.gui.models.lint import LintMessageModel
+from pyVerifGUI.gui.models.table import HASH_MASK
+
+
+def message(file: str, row: int, text_hash: int, **fields) -> dict:
+    message = {
+        "file": file,
+        "row": row,
+        "column": 1,
+        "type": "UNUSED",
+        "text": f"Signal is not used {row}",
+        "text_hash": text_hash,
+    }
+    message.update(fields)
+    return message
+
+
+def waiver(file: str, row: int, text_hash: int) -> dict:
+    return {
+        "file": file,
+        "row": row,
+        "type": "UNUSED",
+        "text": f"Signal is not used {row}",
+        "text_hash": text_hash,
+        "author": "someone",
+        "date": "2020-01-01",
+        "reason": "unused",
+    }
+
+
+@pytest.fixture
+def table():
+    return MessageTable.fromMessages([
+        message("rtl/a.sv", 3, 1, legitimate=True),
+        message("rtl/a.sv", 7, 2, comment="ignored", owner="me"),
+        message("rtl/b.sv", 1, (1 << 127) | 3, error=True),
+    ])
+
+
+def test_values(table):
+    assert len(table) == 3
+    assert dict(table[0].items()) == {
+        "id": 1,
+        "file": "rtl/a.sv",
+        "row": 3,
+        "column": 1,
+        "text": "Signal is not used 3",
+        "text_hash": 1,
+        "type": "UNUSED",
+        "waiver": False,
+        "legitimate": True,
+        "error": False,
+    }
+    # Comments aren't kept, other unknown fields are
+    assert "comment" not in table[1]
+    assert table[1]["owner"] == "me"
+    assert table[2]["error"] is True
+    # Long (MD5) hashes are folded to 64 bits
+    assert table[2]["text_hash"] == 3 & HASH_MASK
+    # Each path is stored once
+    assert table.strings.count("rtl/a.sv") == 1
+
+
+def test_views(table):
+    assert table[1] is table[1]
+    assert table[-1] is table[2]
+    assert list(table) == [table[0], table[1], table[2]]
+
+
+def test_set_value(table):
+    row = table[0]
+    row.update({"legitimate": False, "error": True, "reason": "x"})
+    assert row["legitimate"] is False
+    assert row["error"] is True
+    assert row["reason"] == "x"
+    assert table[1]["error"] is False
+
+    with pytest.raises(KeyError):
+        row["file"] = "rtl/c.sv"
+    with pytest.raises(KeyError):
+        row["missing"]
+    assert row.get("missing", 1) == 1
+
+
+def test_key_tuples(table):
+    assert table.keyTuples(["file", "row", "owner"]) == [
+        ("rtl/a.sv", 3, None),
+        ("rtl/a.sv", 7, "me"),
+        ("rtl/b.sv", 1, None),
+    ]
+
+
+def test_append_to_model(table):
+    # Messages streamed in after a table was loaded into a model
+    model = LintMessageModel(table, [waiver("rtl/c.sv", 5, 9)])
+    assert len(model.orphans) == 1
+
+    waived = message("rtl/c.sv", 5, 9)
+    unwaived = message("rtl/c.sv", 6, 10)
+    model.appendMessages([waived, unwaived])
+
+    assert len(model.all_messages) == 5
+    assert model.all_messages[0] is table[0]
+    assert model.all_messages[3] is waived
+    assert list(model.waived_messages) == [waived]
+    assert len(model.unwaived_messages) == 4
+    assert len(model.orphans) == 0
+    assert model.rowOf(table[2]) == 2
+    assert model.rowOf(unwaived) == 4
+
+
+def test_waive_in_model(table):
+    # Waiving moves rows between partitions, all held as the table's rows
+    model = LintMessageModel(table, [])
+    model.selectMessages("unwaived")
+    model.addWaivers([waiver("rtl/a.sv", 7, 2)])
+
+    assert list(model.waived_messages) == [table[1]]
+    assert list(model.unwaived_messages) == [table[0], table[2]]
+
+    model.removeWaivers(list(model.waivers))
+    assert list(model.unwaived_messages) == [table[0], table[1], table[2]]
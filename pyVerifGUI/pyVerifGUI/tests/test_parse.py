@@ -0,0 +1,166 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_parse.py
+# @package pyVerifGUI.tests.test_parse
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of handling the parser outputs
+##############################################################################
+
+from pyVerifGUI.tasks.parse import (dependency_files, design_files,
+                                    merge_outputs, split_outputs)
+
+# Parser outputs of a.sv, holding module a and package p, of b.svh and of x.sv
+SV_CFG = {
+    "sv_modules": {
+        "a": {"path": "src/a.sv", "submodules": {"b": "u_b"}},
+        "x": {"path": "other/x.sv", "submodules": {}},
+    },
+    "sv_interfaces": {},
+    "sv_packages": {"p": {"path": "src/a.sv"}},
+    "sv_files": {
+        "a.sv": {"src/a.sv": True},
+        "b.svh": {"src/b.svh": False},
+        "x.sv": {"other/x.sv": True},
+    },
+}
+
+
+def test_split(tmp_path):
+    sources = {
+        (tmp_path / "src" / "a.sv").resolve(): "rtl/a.sv",
+        (tmp_path / "src" / "b.svh").resolve(): "rtl/b.svh",
+    }
+    split = split_outputs(SV_CFG, tmp_path, sources)
+
+    # Files that weren't parsed are dropped, paths are the known ones
+    assert split == {
+        "rtl/a.sv": {
+            "modules": {"a": {"path": "rtl/a.sv", "submodules": {"b": "u_b"}}},
+            "interfaces": {},
+            "packages": {"p": {"path": "rtl/a.sv"}},
+            "files": {"rtl/a.sv": True},
+        },
+        "rtl/b.svh": {
+            "modules": {},
+            "interfaces": {},
+            "packages": {},
+            "files": {"rtl/b.svh": False},
+        },
+    }
+
+
+def test_merge(tmp_path):
+    sources = {
+        (tmp_path / "src" / "a.sv").resolve(): "rtl/a.sv",
+        (tmp_path / "src" / "b.svh").resolve(): "rtl/b.svh",
+        (tmp_path / "other" / "x.sv").resolve(): "lib/x.sv",
+    }
+    split = split_outputs(SV_CFG, tmp_path, sources)
+    merged = merge_outputs(split[path] for path in sorted(split))
+
+    assert merged == {
+        "sv_modules": {
+            "a": {"path": "rtl/a.sv", "submodules": {"b": "u_b"}},
+            "x": {"path": "lib/x.sv", "submodules": {}},
+        },
+        "sv_interfaces": {},
+        "sv_packages": {"p": {"path": "rtl/a.sv"}},
+        # Files are included if they declare a module
+        "sv_files": {
+            "a.sv": {"rtl/a.sv": True},
+            "b.svh": {"rtl/b.svh": False},
+            "x.sv": {"lib/x.sv": True},
+        },
+    }
+
+
+def test_merge_same_name():
+    merged = merge_outputs([
+        {"modules": {"a": {"path": "one/a.sv"}}, "files": {"one/a.sv": True}},
+        {"packages": {"p": {"path": "two/a.sv"}}, "files": {"two/a.sv": True}},
+    ])
+
+    assert merged["sv_files"] == {
+        "a.sv": {"one/a.sv": True, "two/a.sv": False}
+    }
+    assert merged["sv_packages"] == {"p": {"path": "two/a.sv"}}
+
+
+def write(path, text: str) -> str:
+    path.write_text(text)
+    return path.name
+
+
+def test_dependency_files(tmp_path):
+    # Parsed in this order, each file after what it depends on
+    files = [
+        write(tmp_path / "bus_if.sv", "interface bus_if;\n"
+              "  cfg_pkg::addr_t addr;\nendinterface\n"),
+        write(tmp_path / "cfg_pkg.sv", "package cfg_pkg;\n"
+              "  typedef base_pkg::word_t addr_t;\nendpackage\n"),
+        write(tmp_path / "base_pkg.sv", "package base_pkg;\n"
+              "  typedef logic [31:0] word_t;\nendpackage\n"),
+        write(tmp_path / "mux_if.sv", "interface mux_if;\n"
+              "  bus_if b();\nendinterface\n"),
+    ]
+    sv_cfg = {
+        "sv_packages": {
+            "cfg_pkg": {"path": files[1]},
+            "base_pkg": {"path": files[2]},
+        },
+        "sv_interfaces": {
+            "mux_if": {"path": files[3]},
+            "bus_if": {"path": files[0]},
+        },
+    }
+
+    assert dependency_files(sv_cfg, tmp_path) == [
+        "base_pkg.sv", "cfg_pkg.sv", "bus_if.sv", "mux_if.sv"
+    ]
+
+
+def test_dependency_cycle(tmp_path):
+    # Circular references keep the parsed order
+    files = [
+        write(tmp_path / "b_pkg.sv", "package b_pkg;\n"
+              "  localparam X = a_pkg::Y;\nendpackage\n"),
+        write(tmp_path / "a_pkg.sv", "package a_pkg;\n"
+              "  localparam Y = b_pkg::Z;\nendpackage\n"),
+        write(tmp_path / "c_pkg.sv", "package c_pkg;\n"
+              "  localparam W = a_pkg::Y;\nendpackage\n"),
+    ]
+    sv_cfg = {
+        "sv_packages": {
+            "b_pkg": {"path": files[0]},
+            "a_pkg": {"path": files[1]},
+            "c_pkg": {"path": files[2]},
+            # Unreadable files depend on nothing
+            "gone_pkg": {"path": "gone.sv"},
+        }
+    }
+
+    # Cycles are only broken once nothing else is ready
+    assert dependency_files(sv_cfg, tmp_path) == [
+        "gone.sv", "b_pkg.sv", "a_pkg.sv", "c_pkg.sv"
+    ]
+
+
+def test_design_files():
+    sv_cfg = {
+        "sv_modules": {
+            "top": {"path": "rtl/top.sv"},
+            "a": {"path": "rtl/a.sv"},
+            "b": {"path": "rtl/a.sv"},
+        },
+    }
+
+    # Dependencies first, each file once, external modules left out
+    assert design_files(["top", "a", "IBUF", "b"], sv_cfg,
+                        ["rtl/pkg.sv"]) == [
+                            "rtl/pkg.sv", "rtl/top.sv", "rtl/a.sv"
+                        ]
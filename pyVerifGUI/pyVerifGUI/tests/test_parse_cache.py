@@ -0,0 +1,48 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_parse_cache.py
+# @package pyVerifGUI.tests.test_parse_cache
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the parse cache
+##############################################################################
+
+import pytest
+
+from pyVerifGUI.db import ParseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ParseCache(tmp_path / "cache.db")
+    yield cache
+    cache.close()
+
+
+def test_save_load(cache):
+    cache.save({"rtl/a.sv": ("1", {"sv_modules": {"a": {}}})})
+    cache.save({"rtl/a.sv": ("2", {"sv_modules": {"b": {}}})})
+
+    assert cache.keys() == {"rtl/a.sv": "2"}
+    assert cache.load(["rtl/a.sv", "rtl/b.sv"]) == {
+        "rtl/a.sv": {"sv_modules": {"b": {}}}
+    }
+
+    cache.prune(["rtl/a.sv"])
+    assert cache.keys() == {}
+
+
+def test_has_files_in(cache, tmp_path):
+    rtl = tmp_path / "rtl"
+    cache.save({str(rtl / "sub" / "a.sv"): ("1", {})})
+
+    assert cache.hasFilesIn([tmp_path / "other", rtl])
+    assert cache.hasFilesIn([rtl / "sub"])
+    # Only whole directory names match
+    assert not cache.hasFilesIn([tmp_path / "rt"])
+    assert not cache.hasFilesIn([tmp_path / "rtl_old"])
+    assert not cache.hasFilesIn([])
@@ -0,0 +1,108 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_process_pool.py
+# @package pyVerifGUI.tests.test_process_pool
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the process pool, and of the jobs run in it
+##############################################################################
+
+from concurrent.futures.process import BrokenProcessPool
+import os
+import sys
+
+import pytest
+
+from pyVerifGUI.plugin_utils import import_plugins
+from pyVerifGUI.tasks import process_pool as pool_module
+from pyVerifGUI.tasks.base import task_names
+from pyVerifGUI.tasks.jobs import lint_job
+from pyVerifGUI.tasks.process_pool import ProcessPool, process_pool
+
+# Stands in for verilator, reporting two warnings
+FAKE_VERILATOR = r"""
+import sys
+sys.stderr.write("%Warning-UNUSED: rtl/a.sv:3:5: Signal is not used: 'x'\n")
+sys.stderr.write("    3 | logic x;\n")
+sys.stderr.write("%Warning-WIDTH: rtl/b.sv:7:1: Operator ASSIGN expects 8 bits\n")
+sys.stderr.write("%Error: Exiting due to 2 warning(s)\n")
+sys.exit(1)
+"""
+
+
+@pytest.fixture
+def pool():
+    pool = ProcessPool(1)
+    yield pool
+    pool.shutdown()
+
+
+def test_lint_job_runs_in_spawned_pool(pool, tmp_path):
+    progress = []
+    future = pool.submit(lint_job, [sys.executable, "-c", FAKE_VERILATOR],
+                         str(tmp_path),
+                         progress=progress.append)
+    returncode, records, errors, _, stderr = future.result(timeout=60)
+
+    assert returncode == 1
+    assert [(record.file, record.row, record.type) for record in records] == [
+        ("rtl/a.sv", 3, "UNUSED"),
+        ("rtl/b.sv", 7, "WIDTH"),
+    ]
+    assert "Exiting due to 2 warning(s)" in stderr
+
+    kinds = [kind for kind, _ in progress]
+    assert kinds[0] == "pid"
+    reported = [
+        message["file"] for kind, messages in progress if kind == "messages"
+        for message in messages
+    ]
+    assert reported == ["rtl/a.sv", "rtl/b.sv"]
+
+
+def test_lint_job_of_plugin_loaded_task_runs_in_pool(pool, tmp_path):
+    # The GUI loads tasks as plugins, under their bare module names
+    tasks_dir = os.path.dirname(pool_module.__file__)
+    tasks = import_plugins([tasks_dir],
+                           lambda obj: getattr(obj, "_is_task", False))
+    lint = sys.modules[next(task for task in tasks
+                            if task._name == task_names.lint).__module__]
+
+    future = pool.submit(lint.lint_job,
+                         [sys.executable, "-c", FAKE_VERILATOR],
+                         str(tmp_path))
+    assert future.result(timeout=60)[0] == 1
+
+
+def test_lint_job_leaves_out_stub_messages(pool, tmp_path):
+    script = ("import sys\nsys.stderr.write(\"%Warning-UNUSED: "
+              "lint_shards/top_stubs.sv:1:1: Signal is not used: 'x'\\n\")")
+    progress = []
+    future = pool.submit(lint_job, [sys.executable, "-c", script],
+                         str(tmp_path),
+                         "top_stubs.sv",
+                         progress=progress.append)
+    _, records, _, _, _ = future.result(timeout=60)
+
+    # Kept to detect stubs that don't work, but never reported
+    assert len(records) == 1
+    assert not [item for kind, item in progress if kind == "messages"]
+
+
+def test_broken_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(pool_module, "_pool", None)
+    broken = process_pool(1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result(timeout=60)
+        assert broken.broken
+
+        pool = process_pool(1)
+        assert pool is not broken
+        assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
+    finally:
+        pool_module.shutdown_pool()
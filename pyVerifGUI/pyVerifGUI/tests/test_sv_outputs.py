@@ -0,0 +1,58 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_sv_outputs.py
+# @package pyVerifGUI.tests.test_sv_outputs
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of the cached loading of parser outputs
+##############################################################################
+
+import pickle
+
+import pytest
+
+from pyVerifGUI.parsers.sv_outputs import (dump_sv_yaml, load_sv_yaml,
+                                           sidecar_path)
+
+MODULES = {"top": {"path": "rtl/top.sv", "submodules": {"alu": "u_alu"}}}
+
+
+def test_sidecar(tmp_path):
+    path = tmp_path / "sv_modules.yaml"
+    dump_sv_yaml(MODULES, path)
+    assert sidecar_path(path).exists()
+    assert load_sv_yaml(path) == MODULES
+
+    # A changed YAML file is loaded again, and its sidecar rewritten
+    path.write_text("top: {path: rtl/other.sv}\n")
+    assert load_sv_yaml(path) == {"top": {"path": "rtl/other.sv"}}
+    sidecar_path(path).unlink()
+    path.write_text("{}\n")
+    assert load_sv_yaml(path) == {}
+    assert sidecar_path(path).exists()
+
+
+@pytest.mark.parametrize("contents", [
+    b"",
+    b"not a pickle",
+    pickle.dumps("not a tuple"),
+    b"cmissing_module\nThing\n.",
+])
+def test_damaged_sidecar(tmp_path, contents):
+    path = tmp_path / "sv_modules.yaml"
+    dump_sv_yaml(MODULES, path)
+    sidecar_path(path).write_bytes(contents)
+
+    assert load_sv_yaml(path) == MODULES
+    # Rebuilt, so the next load uses it
+    with open(str(sidecar_path(path)), "rb") as f:
+        assert pickle.load(f)[1] == MODULES
+
+
+def test_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_sv_yaml(tmp_path / "sv_modules.yaml")
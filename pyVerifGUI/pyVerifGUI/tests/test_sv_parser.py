@@ -0,0 +1,96 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_sv_parser.py
+# @package pyVerifGUI.tests.test_sv_parser
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of in-process parsing with rSVParser
+##############################################################################
+
+import types
+
+from pyVerifGUI.parsers import sv_parser
+from pyVerifGUI.parsers.sv_parser import parse_design, parser_options
+
+
+def fake_parser(outputs: dict):
+    """Stands in for the rSVParser module, recording what it is given"""
+    calls = []
+
+    def parse(project_name, includes, **options):
+        calls.append((project_name, includes, options))
+        return outputs
+
+    return types.SimpleNamespace(parse=parse), calls
+
+
+def test_parser_options():
+    options = parser_options([
+        "--pp-includes", "inc", "--extension=svh", "", "-I", "lib", "-r",
+        "--skip-v"
+    ])
+    assert options == {
+        "includes": ["lib"],
+        "pp_includes": ["inc"],
+        "extensions": ["svh"],
+        "skip_v": True,
+    }
+
+
+def test_parser_options_unknown():
+    # Left to the command line tool
+    assert parser_options(["--define", "X"]) is None
+    assert parser_options(["--pp-includes"]) is None
+
+
+def test_parse_design(monkeypatch, tmp_path):
+    outputs = {
+        "sv_modules": {
+            "top": {
+                "path": "top.sv",
+                "ports": [("input", "logic", "", "", "clk", "")],
+                "parameters": [],
+            },
+        },
+        "sv_interfaces": {},
+        "sv_packages": {},
+        "sv_files": {"top.sv": {"top.sv": True}},
+        "sv_hierarchy": {},
+        "errors": [],
+        "warnings": ["can't read x.sv"],
+    }
+    parser, calls = fake_parser(outputs)
+    monkeypatch.setattr(sv_parser, "rSVParser", parser)
+
+    options = parser_options(["--pp-includes", "inc"])
+    options["top_module"] = True
+    returncode, stderr, sv_cfg = parse_design("top", ["rtl"], options,
+                                              tmp_path)
+
+    assert returncode == 0
+    assert stderr == "can't read x.sv\n"
+    assert calls[0][1] == [str(tmp_path / "rtl")]
+    assert calls[0][2]["pp_includes"] == [str(tmp_path / "inc")]
+    assert calls[0][2]["top_module"] is True
+    assert set(sv_cfg) == set(sv_parser.PARSER_OUTPUTS)
+    assert sv_cfg["sv_modules"]["top"]["ports"] == [
+        ["input", "logic", "", "", "clk", ""]
+    ]
+
+
+def test_parse_design_errors(monkeypatch, tmp_path):
+    parser, _ = fake_parser({
+        "errors": ["Parse error in top.sv:1:1\n"],
+        "warnings": []
+    })
+    monkeypatch.setattr(sv_parser, "rSVParser", parser)
+
+    returncode, stderr, sv_cfg = parse_design("top", [], parser_options([]),
+                                              tmp_path)
+    assert returncode == -1
+    assert stderr == "Parse error in top.sv:1:1\n"
+    assert sv_cfg is None
@@ -0,0 +1,192 @@
+###############################################################################
+# @file pyVerifGUI/tests/test_waivers.py
+# @package pyVerifGUI.tests.test_waivers
+# @author David Lenfesty
+# @copyright Copyright (c) 2020. Eidetic Communications Inc.
+#            All rights reserved
+# @license  Licensed under the BSD 3-Clause license.
+#           This license message must appear in all versions of this code including
+#           modified versions.
+#
+# @brief Tests of matching messages against waivers
+##############################################################################
+
+import pytest
+
+from pyVerifGUI.gui.models.lint import LintMessageModel
+from pyVerifGUI.gui.models.waivers import (RuleMatcher, WaiverIndex,
+                                           message_key)
+
+
+def message(file: str, row: int, text_hash: int) -> dict:
+    return {
+        "file": file,
+        "row": row,
+        "column": 1,
+        "type": "UNUSED",
+        "text": f"Signal is not used {row}",
+        "text_hash": text_hash,
+        "legitimate": False,
+    }
+
+
+def waiver(file: str, row: int, text_hash: int, reason: str = "") -> dict:
+    return {
+        "file": file,
+        "row": row,
+        "type": "UNUSED",
+        "text": f"Signal is not used {row}",
+        "text_hash": text_hash,
+        "author": "someone",
+        "date": "2020-01-01",
+        "reason": reason,
+    }
+
+
+def test_message_key():
+    # MD5-sized hashes match their 64 bit fold
+    assert message_key(message("a.sv", 1, (1 << 100) | 5)) == message_key(
+        waiver("a.sv", 1, 5))
+    assert message_key(message("a.sv", 1, 5)) != message_key(
+        waiver("a.sv", 2, 5))
+
+
+def test_index():
+    a, b = message("a.sv", 1, 1), message("a.sv", 2, 2)
+    waived, orphan = waiver("a.sv", 1, 1), waiver("b.sv", 1, 1)
+    index = WaiverIndex()
+    index.build([a, b], [waived, orphan])
+
+    assert index.isWaived(a)
+    assert not index.isWaived(b)
+    assert index.findWaiver(a) is waived
+    assert index.findWaiver(b) is None
+    assert not index.isOrphan(waived)
+    assert index.isOrphan(orphan)
+    assert index.matchingMessages(waived) == [a]
+
+
+def test_index_waivers():
+    a, duplicate = message("a.sv", 1, 1), message("a.sv", 1, 1)
+    first, second = waiver("a.sv", 1, 1), waiver("a.sv", 1, 1)
+    index = WaiverIndex()
+    index.build([a, duplicate], [])
+
+    # Newly waived messages are only reported by the first matching waiver
+    assert index.addWaiver(first) == [a, duplicate]
+    assert index.addWaiver(second) == []
+    assert index.removeWaiver(first) == []
+    assert index.findWaiver(a) is second
+    assert index.removeWaiver(second) == [a, duplicate]
+    assert not index.isWaived(a)
+    # Unknown waivers are ignored
+    assert index.removeWaiver(first) == []
+
+
+def test_index_messages():
+    orphan = waiver("a.sv", 1, 1)
+    index = WaiverIndex()
+    index.build([], [orphan])
+
+    # Waivers stop being orphans with their first message
+    assert index.addMessage(message("a.sv", 1, 1)) == [orphan]
+    assert index.addMessage(message("a.sv", 1, 1)) == []
+    assert not index.isOrphan(orphan)
+
+
+@pytest.fixture
+def messages():
+    return [message("a.sv", row, row) for row in range(1, 5)]
+
+
+@pytest.fixture
+def model(messages):
+    return LintMessageModel(messages, [
+        waiver("a.sv", 2, 2),
+        waiver("gone.sv", 1, 1),
+    ])
+
+
+def test_model_partitions(model, messages):
+    assert list(model.waived_messages) == [messages[1]]
+    assert list(model.unwaived_messages) == [
+        messages[0], messages[2], messages[3]
+    ]
+    assert [w["file"] for w in model.orphans] == ["gone.sv"]
+
+
+@pytest.mark.parametrize("selection", ["all", "unwaived", "orphans"])
+def test_model_add_remove(model, messages, selection):
+    model.selectMessages(selection)
+    added = [waiver("a.sv", 4, 4), waiver("other.sv", 9, 9)]
+    model.addWaivers(added)
+
+    assert list(model.waived_messages) == [messages[1], messages[3]]
+    assert list(model.unwaived_messages) == [messages[0], messages[2]]
+    assert [w["file"] for w in model.orphans] == ["gone.sv", "other.sv"]
+    assert list(model.waivers)[-2:] == added
+    assert model.findWaiver(messages[3]) is added[0]
+
+    model.removeWaivers(added + [model.orphans[0]])
+
+    assert list(model.waived_messages) == [messages[1]]
+    assert list(model.unwaived_messages) == [
+        messages[0], messages[2], messages[3]
+    ]
+    assert len(model.orphans) == 0
+    assert len(model.waivers) == 1
+
+
+def test_model_update(model, messages):
+    old = model.waivers[0]
+    new = waiver("a.sv", 3, 3, "moved")
+    other = model.waivers[1]
+    model.updateWaivers(updated=[(old, new), (other, waiver("a.sv", 1, 1))])
+
+    # Updated waivers keep their position
+    assert model.waivers[0] is new
+    assert list(model.waived_messages) == [messages[0], messages[2]]
+    assert list(model.unwaived_messages) == [messages[1], messages[3]]
+    assert len(model.orphans) == 0
+
+    # A waiver updated to match nothing becomes an orphan
+    model.updateWaiver(new, waiver("gone.sv", 3, 3))
+    assert list(model.orphans) == [model.waivers[0]]
+    assert list(model.waived_messages) == [messages[0]]
+
+
+def test_rules():
+    rules = RuleMatcher([
+        {"type": "UNUSED*", "file": "*/third_party/*"},
+        {"module": "axi_*", "text": r"used \d"},
+        {"text": "["},
+        {"reason": "no patterns"},
+    ], {"rtl/bus.sv": ["axi_bridge", "fifo"]})
+
+    # Invalid rules are reported rather than used
+    assert len(rules) == 2
+    assert len(rules.errors) == 2
+    assert rules.uses_modules
+
+    vendored = message("ip/third_party/x.sv", 1, 1)
+    assert rules.match(vendored) is rules.rules[0]
+    assert rules.match(dict(vendored, type="WIDTH")) is None
+    assert rules.match(message("rtl/bus.sv", 3, 3)) is rules.rules[1]
+    assert rules.match(dict(message("rtl/bus.sv", 3, 3), text="x")) is None
+    assert rules.match(message("rtl/other.sv", 3, 3)) is None
+
+
+def test_model_rules(messages):
+    rules = RuleMatcher([{"file": "a.sv", "text": "used [13]$"}])
+    model = LintMessageModel(messages, [waiver("a.sv", 3, 3)], rules)
+
+    assert list(model.waived_messages) == [messages[0], messages[2]]
+    assert model.findRule(messages[0]) is rules.rules[0]
+    assert model.findRule(messages[1]) is None
+
+    # Messages waived by a rule stay waived without their waiver
+    model.removeWaivers(list(model.waivers))
+    assert list(model.waived_messages) == [messages[0], messages[2]]
+    model.addWaivers([waiver("a.sv", 1, 1)])
+    assert list(model.waived_messages) == [messages[0], messages[2]]
+    assert len(model.orphans) == 0
@@ -0,0 +1,335 @@
+//-----------------------------------------------------------------------------
+// File: src/lib.rs
+// Author: David Lenfesty
+// Copyright (c) 2020. Eidetic Communications Inc.
+// All rights reserved.
+// Licensed under the BSD 3-Clause license.
+// This license message must appear in all versions of this code including
+// modified versions.
+//----------------------------------------------------------------------------
+//! # rSVParser
+//! Drop in replacement for pySVParser.
+//!
+//! Generates a series of files in sv_* pattern, specific to Eideticom
+//! VerifTools needs.
+//!
+//! Parsing itself is done by `parse()`, which the command line tool wraps.
+//! With the `python` feature, it is also exposed as a Python module, so
+//! VerifTools can parse without going through the files.
+//!
+//! ## Left to Do
+//! TODO: interfaces aren't fully fleshed out
+//!
+//! TODO: add support for CLI-provided `define values
+//!
+//! TODO: Better error handling. Lots of places that could easily panic
+//! with no info provided.
+
+// not ideal, but eh
+#![allow(non_snake_case)]
+
+use std::collections::HashMap;
+use std::path::PathBuf;
+use std::fs::File;
+use std::io::Read;
+
+use sv_parser::{parse_sv, unwrap_node, Locate, RefNode};
+use serde::Serialize;
+use serde_yaml;
+use structopt::StructOpt;
+use includes::glob_files;
+
+pub mod out;
+mod modules;
+mod interfaces;
+mod packages;
+mod hierarchy;
+mod ports;
+mod includes;
+
+#[cfg(feature = "python")]
+mod python;
+
+#[cfg(test)]
+mod tests;
+
+use out::{SvHierarchy, SvInterface, SvModule, SvPackage};
+
+/// Static version string for CLI
+const VERSION: &'static str = env!("CARGO_PKG_VERSION");
+
+/// CLI Options
+#[derive(Debug, StructOpt)]
+#[structopt(name = "rSVParser", about = "Rust-based SystemVerilog parser utility.", version = VERSION)]
+struct Opt {
+    /// Name of project (will be used in top level directory name)
+    pub project_name: String,
+
+    /// Redo operations (i.e. delete old work)
+    #[structopt(short, long)]
+    pub redo: bool,
+
+    /// Use project name as top module
+    #[structopt(long = "--top_module")]
+    pub top_module: bool,
+
+    /// Includes the directory and all subdirectories in parsing
+    #[structopt(short = "-I", long = "--include")]
+    pub includes: Vec<String>,
+
+    /// Include directories to pass only to parser preprocessor
+    #[structopt(long)]
+    pub pp_includes: Vec<PathBuf>,
+
+    /// Only pass manually specified include directories (with --pp-includes) to parser preprocessor
+    #[structopt(long)]
+    pub manual_pp_includes: bool,
+
+    /// Skip parsing files with "sv" extensions
+    #[structopt(long)]
+    pub skip_sv: bool,
+
+    /// Skip parsing files with "v" extensions
+    #[structopt(long)]
+    pub skip_v: bool,
+
+    /// Specify another file extension to parse as SystemVerilog
+    #[structopt(long = "--extension")]
+    pub extensions: Vec<String>,
+}
+
+/// What to parse. Fields match the CLI options of the same names.
+#[derive(Debug, Default, Clone)]
+pub struct ParseOptions {
+    pub project_name: String,
+    pub top_module: bool,
+    pub includes: Vec<String>,
+    pub pp_includes: Vec<PathBuf>,
+    pub manual_pp_includes: bool,
+    pub skip_sv: bool,
+    pub skip_v: bool,
+    pub extensions: Vec<String>,
+    /// Print progress to stdout, as the CLI does
+    pub verbose: bool,
+}
+
+/// Everything found in a design. The CLI writes each sv_* field to the
+/// YAML file of the same name.
+#[derive(Debug, Default, Serialize)]
+pub struct ParseOutputs {
+    pub sv_modules: HashMap<String, SvModule>,
+    pub sv_interfaces: HashMap<String, SvInterface>,
+    pub sv_packages: HashMap<String, SvPackage>,
+    pub sv_files: HashMap<String, HashMap<String, bool>>,
+    pub sv_hierarchy: HashMap<String, SvHierarchy>,
+    /// Parse errors, pointing at the offending line. Files with errors are
+    /// left out of the outputs.
+    pub errors: Vec<String>,
+    /// Other problems reading files, which don't fail the parse
+    pub warnings: Vec<String>,
+}
+
+/// Parses every file in the included paths.
+pub fn parse(opt: &ParseOptions) -> std::io::Result<ParseOutputs> {
+    // Construct list of allowed extensions
+    let mut extensions = Vec::new();
+    if !opt.skip_sv {
+        extensions.push(String::from("sv"));
+    }
+    if !opt.skip_v {
+        extensions.push(String::from("v"));
+    }
+    extensions.extend(opt.extensions.iter().cloned());
+
+    let mut globs = glob_files(&opt.includes, &extensions, !opt.manual_pp_includes)?;
+    globs.includes.extend(opt.pp_includes.iter().cloned());
+
+    let mut outputs = ParseOutputs::default();
+    for file in &globs.files {
+        // Build up sv_files
+        // XXX I'm sure there's a cleaner way to do this
+        let path = String::from(file.to_str().unwrap());
+        let mut f = HashMap::new();
+        // XXX lots of clones going on here
+        f.insert(path.clone(), false);
+        let filename = file.file_name().unwrap().to_str().unwrap();
+        outputs.sv_files.insert(String::from(filename),f);
+
+        // Parse files
+        let result = parse_sv(&file, &HashMap::new(), &globs.includes, false);
+
+        match result {
+            Ok((syntax_tree, _)) => {
+                if opt.verbose {
+                    println!("Parsing file {}...", path);
+                }
+
+                for module in modules::parse_tree(&syntax_tree, &path) {
+                    if opt.verbose {
+                        println!("- Found module {}", module.name);
+                    }
+                    outputs.sv_modules.insert(module.name.clone(), module);
+                }
+                for interface in interfaces::parse_tree(&syntax_tree, &path) {
+                    if opt.verbose {
+                        println!("- Found interface {}", interface.name);
+                    }
+                    outputs.sv_interfaces.insert(interface.name.clone(), interface);
+                }
+                for package in packages::parse_tree(&syntax_tree, &path) {
+                    if opt.verbose {
+                        println!("- Found package {}", package.name);
+                    }
+                    outputs.sv_packages.insert(package.name.clone(), package);
+                }
+            },
+            Err(sv_parser::Error::Parse(Some((file, location)))) => {
+                if opt.verbose {
+                    println!("- parse error");
+                }
+                outputs.errors.push(parse_error_message(file, location)?);
+            },
+            Err(e) => {
+                outputs.warnings.push(format!("{}", e));
+            },
+        }
+    }
+
+    let top_module = match opt.top_module {
+        true => {
+            if opt.verbose {
+                println!("Top module specified!");
+            }
+            Some(&opt.project_name)
+        },
+        false => None,
+    };
+    if opt.verbose {
+        println!("Building module hierarchy...");
+    }
+    outputs.sv_hierarchy = hierarchy::build(&outputs.sv_modules, top_module);
+
+    // Set whether files have been included or not
+    match top_module {
+        Some(_) => {
+            for module in outputs.sv_modules.values() {
+                let name = String::from(PathBuf::from(&module.path).file_name()
+                                                                           .unwrap()
+                                                                           .to_str()
+                                                                           .unwrap());
+                let name = String::from(name);
+                let file = outputs.sv_files.get_mut(&name).unwrap();
+                *file.get_mut(&module.path).unwrap() = true;
+            }
+        }
+        None => (),
+    }
+
+    return Ok(outputs);
+}
+
+/// Runs the command line tool, returning its exit code.
+///
+/// Outputs are written to `sv_<project name>` in the current directory.
+pub fn run_cli<I: IntoIterator<Item = String>>(args: I) -> Result<i32, std::io::Error> {
+    let opt = Opt::from_iter(args);
+
+    // Output directory path
+    let base_path = PathBuf::from(format!("sv_{}", opt.project_name));
+    std::fs::create_dir_all(&base_path).unwrap();
+    backup_files(&base_path);
+
+    let outputs = parse(&ParseOptions {
+        project_name: opt.project_name,
+        top_module: opt.top_module,
+        includes: opt.includes,
+        pp_includes: opt.pp_includes,
+        manual_pp_includes: opt.manual_pp_includes,
+        skip_sv: opt.skip_sv,
+        skip_v: opt.skip_v,
+        extensions: opt.extensions,
+        verbose: true,
+    })?;
+    for warning in &outputs.warnings {
+        eprintln!("{}", warning);
+    }
+    for error in &outputs.errors {
+        eprint!("{}", error);
+    }
+
+    // Write outputs to filesystem
+    serde_yaml::to_writer(&File::create(base_path.join("sv_modules.yaml")).unwrap(), &outputs.sv_modules).unwrap();
+    serde_yaml::to_writer(&File::create(base_path.join("sv_interfaces.yaml")).unwrap(), &outputs.sv_interfaces).unwrap();
+    serde_yaml::to_writer(&File::create(base_path.join("sv_packages.yaml")).unwrap(), &outputs.sv_packages).unwrap();
+    serde_yaml::to_writer(&File::create(base_path.join("sv_files.yaml")).unwrap(), &outputs.sv_files).unwrap();
+    serde_yaml::to_writer(&File::create(base_path.join("sv_hierarchy.yaml")).unwrap(), &outputs.sv_hierarchy).unwrap();
+
+    if !outputs.errors.is_empty() {
+        return Ok(-1);
+    }
+    return Ok(0);
+}
+
+/// Pulls identifier value from any node.
+fn get_identifier(node: RefNode) -> Option<Locate> {
+    match unwrap_node!(node, SimpleIdentifier, EscapedIdentifier) {
+        Some(RefNode::SimpleIdentifier(x)) => {
+            Some(x.nodes.0)
+        }
+        Some(RefNode::EscapedIdentifier(x)) => {
+            Some(x.nodes.0)
+        }
+        _ => None,
+    }
+}
+
+/// Saves copies of files from old parse runs before overwriting
+fn backup_files(base_path: &PathBuf) {
+    for file in ["sv_modules.yaml", "sv_packages.yaml", "sv_interfaces.yaml", "sv_files.yaml", "sv_hierarchy.yaml"].iter() {
+        let mut old_path = base_path.clone();
+        old_path.push(file);
+        let mut bak_path = base_path.clone();
+        bak_path.push(String::from(*file) + ".bak");
+
+        // Errors can simply be ignored
+        // Actual fs errors will be caught later
+        // XXX if we caught errors here we would avoid running when we know
+        // we can't access the file system
+        let _ = std::fs::rename(old_path, bak_path);
+    }
+}
+
+/// Describes the lines specified by parse errors.
+///
+/// XXX there's probably a crate that just does this, but better.
+fn parse_error_message(file: PathBuf, location: usize) -> Result<String, std::io::Error> {
+    let mut pos: usize = 0;
+    let mut line = 0;
+    let mut last_linefeed = 0;
+    let mut f = std::fs::File::open(&file)?;
+    let mut contents = String::new();
+    let file_size = f.read_to_string(&mut contents)?;
+    if file_size < pos {
+        panic!();
+    }
+
+    while pos < location {
+        if contents.as_bytes()[pos] == '\n' as u8 {
+            line += 1;
+            last_linefeed = pos;
+        }
+        pos += 1;
+    }
+    let column = pos - last_linefeed;
+    let mut line_len = 1;
+    while contents.as_bytes()[last_linefeed + line_len] != '\n' as u8 {
+        line_len += 1;
+    }
+
+    let text = &contents[last_linefeed+1..last_linefeed+line_len];
+    let mut message = format!("Parse error in {}:{}:{}\n", file.to_string_lossy(), line, column);
+    message += &format!("| {}\n", text);
+    message += &format!("{}^\n", " ".repeat(column + 2));
+
+    return Ok(message);
+}
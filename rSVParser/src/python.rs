@@ -0,0 +1,84 @@
+//-----------------------------------------------------------------------------
+// File: src/python.rs
+// Author: David Lenfesty
+// Copyright (c) 2020. Eidetic Communications Inc.
+// All rights reserved.
+// Licensed under the BSD 3-Clause license.
+// This license message must appear in all versions of this code including
+// modified versions.
+//----------------------------------------------------------------------------
+//! Python module, built with the `python` feature.
+//!
+//! `parse()` returns the outputs the command line tool writes to its sv_*
+//! files, as dicts. `main()` runs the command line tool itself, and is
+//! installed as the `rSVParser` script.
+use std::path::PathBuf;
+
+use pyo3::exceptions::{PyOSError, PyRuntimeError};
+use pyo3::prelude::*;
+use pythonize::pythonize;
+
+use crate::ParseOptions;
+
+/// Stack of the thread parsing is done in. sv-parser recurses deeply, and
+/// threads started from Python can have small stacks.
+const PARSE_STACK_SIZE: usize = 64 * 1024 * 1024;
+
+/// Parses every file in the included paths, see the CLI options of the
+/// same names.
+///
+/// Returns a dict of sv_modules, sv_interfaces, sv_packages, sv_files and
+/// sv_hierarchy, along with the parse errors and other warnings. The GIL is
+/// released while parsing.
+#[pyfunction]
+#[pyo3(signature = (project_name, includes, top_module = false, pp_includes = Vec::new(),
+                    manual_pp_includes = false, skip_sv = false, skip_v = false,
+                    extensions = Vec::new()))]
+fn parse(py: Python<'_>, project_name: String, includes: Vec<String>, top_module: bool,
+         pp_includes: Vec<PathBuf>, manual_pp_includes: bool, skip_sv: bool, skip_v: bool,
+         extensions: Vec<String>) -> PyResult<PyObject> {
+    let options = ParseOptions {
+        project_name: project_name,
+        top_module: top_module,
+        includes: includes,
+        pp_includes: pp_includes,
+        manual_pp_includes: manual_pp_includes,
+        skip_sv: skip_sv,
+        skip_v: skip_v,
+        extensions: extensions,
+        verbose: false,
+    };
+
+    let result = py.allow_threads(move || {
+        std::thread::Builder::new()
+            .name(String::from("rSVParser"))
+            .stack_size(PARSE_STACK_SIZE)
+            .spawn(move || crate::parse(&options))
+            .map(|parser| parser.join())
+    });
+
+    let outputs = match result {
+        Ok(Ok(Ok(outputs))) => outputs,
+        Ok(Ok(Err(e))) => return Err(PyOSError::new_err(e.to_string())),
+        // Panics stay in the parsing thread, rather than unwinding into Python
+        Ok(Err(_)) => return Err(PyRuntimeError::new_err("rSVParser failed while parsing")),
+        Err(e) => return Err(PyOSError::new_err(e.to_string())),
+    };
+
+    Ok(pythonize(py, &outputs)?)
+}
+
+/// Runs the command line tool with sys.argv, returning its exit code.
+#[pyfunction]
+fn main(py: Python<'_>) -> PyResult<i32> {
+    let args: Vec<String> = py.import("sys")?.getattr("argv")?.extract()?;
+    crate::run_cli(args).map_err(|e| PyOSError::new_err(e.to_string()))
+}
+
+#[pymodule]
+fn rSVParser(_py: Python<'_>, m: &PyModule) -> PyResult<()> {
+    m.add_function(wrap_pyfunction!(parse, m)?)?;
+    m.add_function(wrap_pyfunction!(main, m)?)?;
+    m.add("__version__", crate::VERSION)?;
+    Ok(())
+}
@@ -1,6 +1,7 @@
 use std::path::PathBuf;
 
 use super::includes::glob_files;
+use super::{parse, ParseOptions};
 
 mod common {
     pub fn full_recursion() -> Vec<String> {
@@ -64,3 +65,19 @@ fn include_folders() {
     assert!(results.includes.contains(&PathBuf::from("example/rtl/unitblocks")));
     assert_eq!(results.includes.len(), 2);
 }
+
+#[test]
+/// Tests that parsing for a top module finds it, and marks the files declaring modules as included
+fn parse_top_module() {
+    let outputs = parse(&ParseOptions {
+        project_name: String::from("alu"),
+        top_module: true,
+        includes: common::full_recursion(),
+        ..Default::default()
+    }).unwrap();
+
+    assert!(outputs.sv_modules.contains_key("alu"));
+    assert!(outputs.sv_hierarchy.contains_key("alu"));
+    assert_eq!(outputs.sv_files["alu.sv"]["example/rtl/alu.sv"], true);
+    assert_eq!(outputs.sv_files["dummy_test.sv"].len(), 1);
+}